@@ -0,0 +1,86 @@
+"""Long-paragraph throughput with and without length-aware chunking.
+
+Translates a .txt file of multi-thousand-word paragraphs through DocumentJob,
+once with chunking off (max_tokens 0) and once per given limit. Offline the
+fake backend charges word_delay per squared word of every segment, which is
+how attention cost grows; pass --backend ctranslate2 --pair en_de to measure
+an installed model instead.
+
+    python -m benchmarks.bench_chunking --paragraphs 5 --words 3000 --limits 100,200,400
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.corpus import _sentence
+from resource.backends import create_backend
+from resource.chunking import chunk_segments
+from resource.jobs import DocumentJob
+
+
+def make_long_txt(path, paragraphs, words, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for index in range(paragraphs):
+            sentences = []
+            count = 0
+            while count < words:
+                sentence = _sentence(rng)
+                sentences.append(sentence)
+                count += len(sentence.split())
+            f.write((" ".join(sentences)) + ("\n" if index < paragraphs - 1 else ""))
+
+
+def measure(path, backend, max_tokens, repeats):
+    times = []
+    out_path = path + f".{max_tokens}.out.txt"
+    for _ in range(repeats):
+        start = time.perf_counter()
+        DocumentJob(path, out_path, backend, max_tokens=max_tokens).run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=5)
+    parser.add_argument("--words", type=int, default=3000, help="words per paragraph")
+    parser.add_argument("--limits", default="100,200,400", help="comma separated max_tokens values")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--backend", default="fake", choices=["fake", "argos", "ctranslate2"])
+    parser.add_argument("--pair", default="en_xx", help="language pair for a real backend")
+    parser.add_argument("--word-delay", type=float, default=2e-8,
+                        help="fake backend cost per squared word of a segment")
+    args = parser.parse_args(argv)
+
+    from_code, to_code = args.pair.split("_", 1)
+    options = {"word_delay": args.word_delay} if args.backend == "fake" else {}
+    if args.backend != "fake":
+        import resource.config  # points Argos Translate at the application's models directory
+    backend = create_backend(args.backend, from_code, to_code, **options)
+    backend.load()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "long.txt")
+        make_long_txt(path, args.paragraphs, args.words)
+        with open(path, encoding="utf-8") as f:
+            segments = f.read().split("\n")
+        words = sum(len(segment.split()) for segment in segments)
+
+        print(f"{args.paragraphs} paragraphs, {words} words, backend {args.backend}\n")
+        print(f"{'max tokens':<12}{'chunks':>8}{'median s':>12}{'words/s':>12}{'speedup':>10}")
+        baseline = None
+        for limit in [0] + [int(value) for value in args.limits.split(",") if value]:
+            chunks, _ = chunk_segments(segments, limit)
+            seconds = measure(path, backend, limit, args.repeats)
+            baseline = baseline or seconds
+            label = "off" if limit == 0 else str(limit)
+            print(f"{label:<12}{len(chunks):>8}{seconds:>12.3f}{words / seconds:>12.0f}{baseline / seconds:>9.1f}x")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Translation memory: load time, lookup latency and hit rate on revised sentences.
+
+Fills a memory with synthetic sentences, then looks up three kinds of query:
+sentences stored verbatim, stored sentences with one word replaced (a revised
+contract clause) and unseen sentences.
+
+    python -m benchmarks.bench_memory --entries 200000 --queries 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.corpus import _sentence
+from resource.memory import TranslationMemory
+
+
+def revise(sentence, rng):
+    words = sentence.split()
+    words[rng.randrange(len(words))] = rng.choice(["twelve", "supplier", "hereby", "notice", "annual"])
+    return " ".join(words)
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    sentences = list(dict.fromkeys(_sentence(rng) for _ in range(args.entries)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "memory.jsonl")
+        start = time.perf_counter()
+        memory = TranslationMemory(path)
+        for sentence in sentences:
+            memory.add("en", "xx", sentence, sentence[::-1])
+        memory.flush()
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = TranslationMemory(path)
+        loaded.refresh()
+        load_s = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1e6
+
+        print(f"{len(loaded)} entries, {size_mb:.1f} MB on disk, built in {build_s:.1f} s, loaded in {load_s:.2f} s\n")
+        print(f"{'query':<10}{'hit rate':>10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        kinds = {
+            "exact": [rng.choice(sentences) for _ in range(args.queries)],
+            "revised": [revise(rng.choice(sentences), rng) for _ in range(args.queries)],
+            "unseen": [_sentence(random.Random(10 ** 9 + i)) for i in range(args.queries)],
+        }
+        for kind, queries in kinds.items():
+            timings = []
+            hits = 0
+            for query in queries:
+                start = time.perf_counter()
+                score, _ = loaded.lookup("en", "xx", query, args.threshold)
+                timings.append((time.perf_counter() - start) * 1000)
+                hits += score > 0
+            print(f"{kind:<10}{hits / len(queries):>10.1%}{statistics.mean(timings):>10.3f}"
+                  f"{percentile(timings, 0.5):>10.3f}{percentile(timings, 0.99):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
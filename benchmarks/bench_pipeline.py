@@ -0,0 +1,157 @@
+"""Benchmark the parse -> translate -> write pipeline on synthetic documents.
+
+Runs fully offline: translation is done by the deterministic FakeBackend, so the
+numbers measure the document handling in resource/ and nothing else. Files go
+through DocumentJob, or FanOutJob with --targets above 1, as in the engine.
+Reported per stage is its busy time: the Pipeline's stage counters for a
+DocumentJob, the trace spans for a FanOutJob; "job" is the whole run.
+
+    python -m benchmarks.bench_pipeline --sizes small,medium --repeats 5 [--targets 3]
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.corpus import SIZES, build_corpus
+from resource.backends import FakeBackend
+from resource.jobs import DocumentJob, FanOutJob
+from resource.tracing import Tracer
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def run_job(path, targets):
+    """Translate path once, returns ({stage: busy seconds}, {queue: (mean depth, max depth)})"""
+    stem, extension = os.path.splitext(path)
+    start = time.perf_counter()
+    if targets == 1:
+        job = DocumentJob(path, f"{stem}.out{extension}", FakeBackend("en", "xx"))
+        job.run()
+        stages = {stats.name: stats.busy for stats in job.pipeline.stages}
+        queues = {stats.name: (stats.mean_depth, stats.max_depth) for stats in job.pipeline.queues}
+    else:
+        tracer = Tracer("bench", enabled=True)
+        outputs = [(f"{stem}.out{index}{extension}", FakeBackend("en", f"x{index}")) for index in range(targets)]
+        FanOutJob(path, outputs, tracer, max_workers=targets).run()
+        stages = {}
+        for event in tracer.events:
+            if event["ph"] == "X":
+                stages[event["name"]] = stages.get(event["name"], 0.0) + event["dur"] / 1e6
+        queues = {}
+    stages["job"] = time.perf_counter() - start
+    return stages, queues
+
+
+def bench_file(name, path, repeats, targets):
+    samples = {}
+    depths = {}
+    for _ in range(repeats):
+        stages, queues = run_job(path, targets)
+        for stage, seconds in stages.items():
+            samples.setdefault(stage, []).append(seconds)
+        for queue, depth in queues.items():
+            depths.setdefault(queue, []).append(depth)
+
+    # Memory is measured in a separate pass so tracemalloc does not skew the timings
+    tracemalloc.start()
+    run_job(path, targets)
+    total_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    stages = {
+        stage: {
+            "min_s": min(values),
+            "median_s": statistics.median(values),
+            # Stages overlap, only the whole job has a peak of its own
+            "peak_kib": round(total_peak / 1024, 1) if stage == "job" else None,
+        }
+        for stage, values in samples.items()
+    }
+    return {
+        "corpus": name,
+        "bytes": os.path.getsize(path),
+        "targets": targets,
+        "stages": stages,
+        "queues": {
+            queue: {"mean_depth": statistics.median(mean for mean, _ in values), "max_depth": max(m for _, m in values)}
+            for queue, values in depths.items()
+        },
+        "total_median_s": stages["job"]["median_s"],
+        "peak_kib": round(total_peak / 1024, 1),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(RESULTS_DIR), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_table(results):
+    print(f"{'corpus':<14}{'stage':<12}{'median ms':>12}{'min ms':>12}{'peak KiB':>12}")
+    for result in results:
+        for stage, data in result["stages"].items():
+            peak = "" if data["peak_kib"] is None else f"{data['peak_kib']:.1f}"
+            print(f"{result['corpus']:<14}{stage:<12}{data['median_s'] * 1000:>12.2f}"
+                  f"{data['min_s'] * 1000:>12.2f}{peak:>12}")
+        for queue, data in result["queues"].items():
+            print(f"{result['corpus']:<14}queue {queue}: mean depth {data['mean_depth']:.1f}, max {data['max_depth']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma separated: " + ", ".join(SIZES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--targets", type=int, default=1, help="target languages, above 1 runs a FanOutJob")
+    parser.add_argument("--label", default=None, help="result file name, defaults to the git revision")
+    parser.add_argument("--output", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    sizes = [s for s in args.sizes.split(",") if s]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    revision = git_revision()
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        corpus = build_corpus(corpus_dir, sizes, args.seed)
+        results = [bench_file(name, path, args.repeats, args.targets) for name, path in corpus.items()]
+
+    report = {
+        "meta": {
+            "revision": revision,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": args.repeats,
+            "seed": args.seed,
+            "targets": args.targets,
+        },
+        "results": results,
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    out_path = os.path.join(args.output, f"{args.label or revision}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_table(results)
+    print(f"\nResults written to {out_path}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
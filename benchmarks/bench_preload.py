@@ -0,0 +1,85 @@
+"""Cold versus warm first-file latency: what preloading the selected model saves.
+
+Every run starts a fresh engine process. The cold run hands it a file right
+away, so the job pays for the model load; the warm run preloads the model
+first and drops the file after a think time, the way a user picks a package
+and then a file. Reported are the time to the first translated batch and to
+the finished file.
+
+    python -m benchmarks.bench_preload --load-delay 2
+    python -m benchmarks.bench_preload --backend ctranslate2 --pair en_de
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.corpus import _sentence
+from resource.engine import EngineProcess
+
+
+def first_file(engine, job):
+    """(seconds to the first progress report, seconds to the finished file)"""
+    start = time.perf_counter()
+    first = []
+
+    def on_progress(done, total):
+        if not first:
+            first.append(time.perf_counter() - start)
+
+    result, success = engine.run_job(job, on_progress)
+    if not success:
+        raise RuntimeError(result)
+    total = time.perf_counter() - start
+    return (first[0] if first else total), total
+
+
+def run_once(job, spec, think):
+    engine = EngineProcess()
+    try:
+        if spec is not None:
+            engine.preload([spec])
+            time.sleep(think)
+        else:
+            engine.ensure_started()
+        return first_file(engine, job)
+    finally:
+        engine.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="fake")
+    parser.add_argument("--pair", default="en_xx")
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--load-delay", type=float, default=2.0, help="model load time imitated by the fake backend")
+    parser.add_argument("--think", type=float, default=5.0, help="seconds between selecting the package and dropping a file")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from_code, to_code = args.pair.split("_")
+    options = {"load_delay": args.load_delay, "segment_delay": 0.002} if args.backend == "fake" else {}
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "first.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(_sentence(rng) for _ in range(args.segments)))
+        spec = {"from_code": from_code, "to_code": to_code, "backend": args.backend, "backend_options": options}
+        job = dict(spec, input_path=path, save_path=os.path.join(directory, "first_out.txt"), trace=False)
+
+        print(f"{args.backend} {args.pair}, {args.segments} segments, {args.think:.1f} s think time\n")
+        print(f"{'run':<8}{'first batch s':>15}{'file s':>10}")
+        medians = {}
+        for name, preload in (("cold", None), ("warm", spec)):
+            runs = [run_once(job, preload, args.think) for _ in range(args.repeats)]
+            medians[name] = [statistics.median(values) for values in zip(*runs)]
+            print(f"{name:<8}{medians[name][0]:>15.3f}{medians[name][1]:>10.3f}")
+        saved = medians["cold"][0] - medians["warm"][0]
+        print(f"\npreloading saves {saved:.3f} s on the first batch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Memory of whole-document segment storage: a list of strings against a SegmentTable.
+
+Builds a large synthetic .txt (one short paragraph per line), then reports
+the traced memory of holding its segments as a list and as a SegmentTable,
+and the peak traced memory and wall time of a FanOutJob over the file, which
+keeps the whole document while its targets are translated.
+
+    python -m benchmarks.bench_segments --segments 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import _sentence
+from resource.backends import FakeBackend
+from resource.jobs import FanOutJob
+from resource.segments import SegmentTable
+
+
+def make_big_txt(path, segments, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(f"{_sentence(rng)} Item {index}." for index in range(segments)))
+
+
+def traced(build):
+    """(result, bytes still allocated by build, peak bytes while building)"""
+    tracemalloc.start()
+    try:
+        result = build()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=1000000)
+    parser.add_argument("--targets", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "big.txt")
+        make_big_txt(path, args.segments)
+        size = os.path.getsize(path)
+        print(f"{args.segments} segments, {size / 1e6:.1f} MB of text\n")
+
+        def read_list():
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read().split("\n")
+
+        def read_table():
+            with open(path, "r", encoding="utf-8") as f:
+                return SegmentTable(line.rstrip("\n") for line in f)
+
+        print(f"{'storage':<16}{'held MB':>10}{'bytes/segment':>15}")
+        for name, build in (("list of str", read_list), ("SegmentTable", read_table)):
+            segments, current, _ = traced(build)
+            print(f"{name:<16}{current / 1e6:>10.1f}{(current - size) / len(segments):>15.1f}")
+            del segments
+
+        targets = [(os.path.join(directory, f"out_{index}.txt"), FakeBackend("en", f"x{index}"))
+                   for index in range(args.targets)]
+        start = time.perf_counter()
+        _, _, peak = traced(lambda: FanOutJob(path, targets, batch_segments=256).run())
+        print(f"\nFanOutJob with {args.targets} target(s): peak {peak / 1e6:.1f} MB traced, "
+              f"{time.perf_counter() - start:.1f} s (tracing slows it down)")
+
+
+if __name__ == "__main__":
+    main()
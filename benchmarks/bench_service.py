@@ -0,0 +1,86 @@
+"""Offline load test for the HTTP translation service.
+
+Starts resource.service in-process with the fake backend (a fixed per-call
+cost imitates model overhead) and hammers /translate from client threads,
+once without a batching window and once with one.
+
+    python -m benchmarks.bench_service --clients 16 --requests 50
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.request
+
+from resource.service import TranslationService, make_server
+
+
+def post(url, payload, token):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def run_load(window_ms, clients, requests, call_delay, segment_delay):
+    service = TranslationService("fake", window_ms / 1000, max_batch=256,
+                                 call_delay=call_delay, segment_delay=segment_delay)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    latencies = []
+    lock = threading.Lock()
+
+    def client(index):
+        for i in range(requests):
+            start = time.perf_counter()
+            post(url + "/translate", {"from": "en", "to": "xx", "text": f"client {index} sentence {i}"}, server.token)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with urllib.request.urlopen(url + "/stats") as response:
+        stats = json.loads(response.read())
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+    latencies.sort()
+    return {
+        "window_ms": window_ms,
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "mean_batch": stats["batchers"]["en_xx"]["mean_batch"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--windows", default="0,5,20", help="batching windows to compare, in ms")
+    parser.add_argument("--call-delay", type=float, default=0.005, help="simulated cost per model call, s")
+    parser.add_argument("--segment-delay", type=float, default=0.0002, help="simulated cost per segment, s")
+    args = parser.parse_args(argv)
+
+    print(f"{'window ms':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'batch':>8}")
+    for window in (float(w) for w in args.windows.split(",")):
+        result = run_load(window, args.clients, args.requests, args.call_delay, args.segment_delay)
+        print(f"{result['window_ms']:>10.1f}{result['requests_per_s']:>10.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['mean_batch']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Measure cold start of the GUI: time to first window and import time per module.
+
+Every run starts a fresh interpreter with -X importtime, imports the window module, builds
+the MainWindow and reports once the event loop has shown it.
+
+    python -m benchmarks.bench_startup --repeats 5 --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_pipeline import RESULTS_DIR, git_revision
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY = "startup-ready "
+
+
+def child():
+    """Runs inside the measured interpreter"""
+    start = time.perf_counter()
+    sys.path.insert(0, REPO_DIR)
+    from resource.window import MainWindow
+    imported = time.perf_counter()
+
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    window = MainWindow()
+    window.show()
+
+    def shown():
+        print(READY + json.dumps({"import_s": imported - start, "window_s": time.perf_counter() - start}), flush=True)
+        window.close()
+        app.quit()
+    QTimer.singleShot(0, shown)
+    app.exec()
+
+
+def parse_importtime(stderr):
+    """{top-level package: seconds} from -X importtime output.
+
+    Self times are summed per package, so each package is charged for its own
+    modules only and the numbers add up to the total import time.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, _, name = line[len("import time:"):].split("|")
+            seconds = int(self_us) / 1e6
+        except ValueError:
+            continue
+        package = name.strip().split(".")[0]
+        modules[package] = modules.get(package, 0.0) + seconds
+    return modules
+
+
+def run_once():
+    env = dict(os.environ)
+    if sys.platform.startswith("linux") and not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    launched = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "benchmarks.bench_startup", "--child"],
+        cwd=REPO_DIR, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - launched
+
+    ready = next((line for line in process.stdout.splitlines() if line.startswith(READY)), None)
+    if ready is None:
+        raise RuntimeError(f"Startup failed:\n{process.stderr[-2000:]}")
+    result = json.loads(ready[len(READY):])
+    result["process_s"] = wall
+    result["modules"] = parse_importtime(process.stderr)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="modules shown in the import table")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="exit with status 1 when the median time to first window is above this")
+    parser.add_argument("--label", default=None, help="result file name, defaults to startup-<git revision>")
+    parser.add_argument("--output", default=RESULTS_DIR)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child()
+        return None
+
+    runs = [run_once() for _ in range(args.repeats)]
+    modules = {}
+    for run in runs:
+        for name, seconds in run["modules"].items():
+            modules.setdefault(name, []).append(seconds)
+    report = {
+        "meta": {"revision": git_revision(), "python": sys.version.split()[0], "repeats": args.repeats},
+        "first_window_median_s": statistics.median(run["window_s"] for run in runs),
+        "process_median_s": statistics.median(run["process_s"] for run in runs),
+        "import_main_median_s": statistics.median(run["import_s"] for run in runs),
+        "modules_median_s": {name: statistics.median(values) for name, values in modules.items()},
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    out_path = os.path.join(args.output, f"{args.label or 'startup-' + report['meta']['revision']}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"first window      {report['first_window_median_s'] * 1000:>10.1f} ms (in process)")
+    print(f"launch to window  {report['process_median_s'] * 1000:>10.1f} ms (incl. interpreter)")
+    print(f"import main       {report['import_main_median_s'] * 1000:>10.1f} ms\n")
+    print(f"{'module':<28}{'import ms':>12}")
+    ranked = sorted(report["modules_median_s"].items(), key=lambda item: -item[1])
+    for name, seconds in ranked[:args.top]:
+        print(f"{name:<28}{seconds * 1000:>12.1f}")
+    print(f"\nResults written to {out_path}")
+
+    if args.budget_ms is not None and report["first_window_median_s"] * 1000 > args.budget_ms:
+        print(f"Over the startup budget of {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Two-pass decoding against a single beam pass and plain greedy decoding.
+
+Translates the same synthetic sentences with the CTranslate2 backend of an
+installed package: once with the full beam, once greedily, and with the
+two-pass strategy at several confidence thresholds. Reported are the time,
+the share of sentences the second pass decoded again, and how many outputs
+equal the full-beam ones.
+
+    python -m benchmarks.bench_two_pass --pair en_de --beam 4 --thresholds 30 50 70
+"""
+import argparse
+import random
+import time
+
+from benchmarks.corpus import _sentence
+from resource.backends import CTranslate2Backend
+
+
+def timed(backend, texts, **options):
+    start = time.perf_counter()
+    results = backend.translate_batch(texts, **options)
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pair", default="en_de")
+    parser.add_argument("--segments", type=int, default=500)
+    parser.add_argument("--beam", type=int, default=4)
+    parser.add_argument("--thresholds", type=int, nargs="+", default=[30, 50, 70],
+                        help="mean token probabilities in percent")
+    args = parser.parse_args(argv)
+
+    # Importing the config points Argos Translate at the application's models directory
+    import resource.config
+
+    from_code, to_code = args.pair.split("_")
+    rng = random.Random(0)
+    texts = [_sentence(rng) for _ in range(args.segments)]
+
+    def backend(**options):
+        result = CTranslate2Backend(from_code, to_code, beam_size=args.beam, **options)
+        result.warm_up()
+        return result
+
+    reference, beam_seconds = timed(backend(), texts)
+    _, greedy_seconds = timed(backend(), texts, beam_size=1)
+
+    print(f"{args.pair}, {args.segments} segments, refinement beam {args.beam}\n")
+    print(f"{'run':<16}{'s':>8}{'segments/s':>12}{'refined':>10}{'= beam':>9}")
+    print(f"{'beam':<16}{beam_seconds:>8.2f}{args.segments / beam_seconds:>12.1f}{'':>10}{'100%':>9}")
+    print(f"{'greedy':<16}{greedy_seconds:>8.2f}{args.segments / greedy_seconds:>12.1f}")
+    for threshold in args.thresholds:
+        two_pass = backend(refine_beam=args.beam, refine_threshold=threshold / 100)
+        sentences_before, refined_before = two_pass.decode_counts()
+        results, seconds = timed(two_pass, texts)
+        sentences, refined = two_pass.decode_counts()
+        rate = (refined - refined_before) / max(sentences - sentences_before, 1)
+        agreement = sum(a == b for a, b in zip(results, reference)) / len(texts)
+        print(f"{f'two-pass {threshold}%':<16}{seconds:>8.2f}{args.segments / seconds:>12.1f}"
+              f"{rate:>10.1%}{agreement:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare two benchmark result files stage by stage.
+
+    python -m benchmarks.compare base.json head.json [--threshold 0.10]
+
+Exits with status 1 when any stage median got slower than the threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return report["meta"], {r["corpus"]: r for r in report["results"]}
+
+
+def compare(base, head, threshold):
+    regressions = []
+    rows = []
+    for corpus, head_result in head.items():
+        base_result = base.get(corpus)
+        if not base_result:
+            continue
+        for stage, data in head_result["stages"].items():
+            old = base_result["stages"].get(stage)
+            if not old or not old["median_s"]:
+                continue
+            change = data["median_s"] / old["median_s"] - 1
+            rows.append((corpus, stage, old["median_s"], data["median_s"], change,
+                         old["peak_kib"], data["peak_kib"]))
+            if change > threshold:
+                regressions.append((corpus, stage, change))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    args = parser.parse_args(argv)
+
+    base_meta, base = load(args.base)
+    head_meta, head = load(args.head)
+    rows, regressions = compare(base, head, args.threshold)
+
+    print(f"base: {base_meta['revision']}  head: {head_meta['revision']}\n")
+    print(f"{'corpus':<14}{'stage':<12}{'base ms':>10}{'head ms':>10}{'change':>9}{'base KiB':>11}{'head KiB':>11}")
+    for corpus, stage, old, new, change, old_kib, new_kib in rows:
+        flag = " !" if change > args.threshold else ""
+        old_kib, new_kib = ("" if kib is None else f"{kib:.1f}" for kib in (old_kib, new_kib))
+        print(f"{corpus:<14}{stage:<12}{old * 1000:>10.2f}{new * 1000:>10.2f}{change:>+9.1%}"
+              f"{old_kib:>11}{new_kib:>11}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
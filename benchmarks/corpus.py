@@ -0,0 +1,94 @@
+"""Deterministic synthetic corpora for the benchmarks"""
+import os
+import random
+import struct
+import zlib
+from io import BytesIO
+
+WORDS = (
+    "the translation model reads every paragraph of the document and writes "
+    "a new file next to it while keeping tables images hyperlinks and styles "
+    "intact so that reviewers can compare both versions side by side without "
+    "losing any formatting numbers dates or names that appear in the source"
+).split()
+
+# name -> (paragraphs, runs per paragraph, tables, images)
+SIZES = {
+    "small": (50, 3, 2, 2),
+    "medium": (500, 4, 10, 10),
+    "large": (5000, 4, 50, 50),
+}
+
+
+def _sentence(rng, min_words=6, max_words=24):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng, sentences=(1, 5)):
+    return " ".join(_sentence(rng) for _ in range(rng.randint(*sentences)))
+
+
+def _png(width=32, height=32, seed=0):
+    """Build a small solid-colour PNG without any imaging library"""
+    rng = random.Random(seed)
+    pixel = bytes(rng.randrange(256) for _ in range(3))
+    raw = b"".join(b"\x00" + pixel * width for _ in range(height))
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+def make_txt(path, paragraphs, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(_paragraph(rng) for _ in range(paragraphs)))
+    return path
+
+
+def make_docx(path, paragraphs, runs, tables, images, seed=0):
+    from docx import Document
+    from docx.shared import Pt
+
+    rng = random.Random(seed)
+    doc = Document()
+    doc.add_heading("Synthetic benchmark document", level=1)
+
+    # Spread tables and images evenly through the body
+    table_every = max(1, paragraphs // tables) if tables else 0
+    image_every = max(1, paragraphs // images) if images else 0
+    picture = _png(seed=seed)
+
+    for i in range(paragraphs):
+        para = doc.add_paragraph()
+        for r in range(runs):
+            run = para.add_run(_sentence(rng, 3, 10) + " ")
+            run.bold = r % 3 == 1
+            run.italic = r % 4 == 2
+        if image_every and i % image_every == image_every - 1:
+            para.add_run().add_picture(BytesIO(picture), width=Pt(24))
+        if table_every and i % table_every == table_every - 1:
+            table = doc.add_table(rows=3, cols=3)
+            for cell in table._cells:
+                cell.text = _sentence(rng, 2, 6)
+
+    doc.save(path)
+    return path
+
+
+def build_corpus(directory, sizes=None, seed=0):
+    """Generate .txt and .docx files for the requested sizes, return {name: path}"""
+    os.makedirs(directory, exist_ok=True)
+    corpus = {}
+    for size in sizes or SIZES:
+        paragraphs, runs, tables, images = SIZES[size]
+        txt_path = os.path.join(directory, f"{size}.txt")
+        docx_path = os.path.join(directory, f"{size}.docx")
+        corpus[f"txt-{size}"] = make_txt(txt_path, paragraphs, seed)
+        corpus[f"docx-{size}"] = make_docx(docx_path, paragraphs, runs, tables, images, seed)
+    return corpus
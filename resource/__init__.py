@@ -1 +0,0 @@
-from .config import *
\ No newline at end of file
@@ -1,24 +1,43 @@
 from PyQt6.QtCore import QThread, pyqtSignal, QCoreApplication
-from resource.config import cfg
-import argostranslate.package
-import argostranslate.translate
+from resource.config import cfg, save_package_pairs
+from resource.tracing import Tracer
+from resource.devices import cuda_device_count
 import os
+import glob
+import shutil
+from pathlib import Path
 
 class PackageDownloaderThread(QThread):
     download_finished = pyqtSignal(str)
     download_start = pyqtSignal(str)
 
-    def __init__(self, from_code: str, to_code: str):
-        super().__init__()
+    def __init__(self, from_code: str, to_code: str, parent=None):
+        super().__init__(parent)
         self.from_code = from_code
         self.to_code = to_code
         self._stopped = False
 
     def run(self):
+        tracer = Tracer(f"download {self.from_code}_{self.to_code}", enabled=cfg.get(cfg.traceEnabled))
         try:
+            with tracer.span("job"):
+                self._run(tracer)
+        finally:
+            tracer.finish()
+
+    def _run(self, tracer):
+        try:
+            import argostranslate.package
+            with tracer.span("installed check"):
+                installed = is_package_installed(self.from_code, self.to_code)
+            if installed:
+                self.download_finished.emit("installed")
+                return
+
             self.download_start.emit("start")
 
-            available_packages = argostranslate.package.get_available_packages()
+            with tracer.span("package index"):
+                available_packages = argostranslate.package.get_available_packages()
 
             package = next(
                 (p for p in available_packages
@@ -30,9 +49,11 @@ class PackageDownloaderThread(QThread):
                 self.download_finished.emit(f"error: Package {self.from_code}→{self.to_code} not found")
                 return
 
-            package_path = package.download()
+            with tracer.span("download"):
+                package_path = package.download()
 
-            argostranslate.package.install_from_path(package_path)
+            with tracer.span("install"):
+                argostranslate.package.install_from_path(package_path)
 
             if self._stopped:
                 self.download_finished.emit("cancelled")
@@ -43,12 +64,125 @@ class PackageDownloaderThread(QThread):
             self.download_finished.emit(f"error: {str(e)}")
 
     def stop(self):
+        """Stop reporting to the GUI; a running download finishes in the background"""
         self._stopped = True
-        self.quit()
-        self.wait()
+        for signal in (self.download_start, self.download_finished):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass
 
-def package_downloader(main_window, from_lang: str, to_lang: str):
-    """Check if package is installed and download if needed"""
+
+class DeviceProbeThread(QThread):
+    """Counts CUDA devices once, off the GUI thread and after the window is shown"""
+    probed = pyqtSignal(int)
+
+    def run(self):
+        self.probed.emit(cuda_device_count())
+
+
+class PackageIndexThread(QThread):
+    """Fetches the Argos package index and caches its language pairs for the next start"""
+    refreshed = pyqtSignal(list)
+
+    def run(self):
+        try:
+            import argostranslate.package
+            from argostranslate import settings
+            argostranslate.package.update_package_index()
+            # get_available_packages fetches again on a missing index, offline that never ends
+            if not os.path.exists(settings.local_package_index):
+                return
+            pairs = []
+            for package in argostranslate.package.get_available_packages():
+                pair = f"{package.from_code}_{package.to_code}"
+                # Pairs are split on '_', so a code containing one cannot be offered
+                if package.type == "translate" and pair.count('_') == 1 and pair not in pairs:
+                    pairs.append(pair)
+            if pairs:
+                save_package_pairs(pairs)
+                self.refreshed.emit(pairs)
+        except Exception as e:
+            print(f"Error refreshing package index: {str(e)}")
+
+
+class PackageScanThread(QThread):
+    """Finds which language pairs have an installed package directory"""
+    scanned = pyqtSignal(list)
+
+    def __init__(self, packages_dir, language_pairs, tracer, parent=None):
+        super().__init__(parent)
+        self.packages_dir = packages_dir
+        self.language_pairs = language_pairs
+        self.tracer = tracer
+
+    def run(self):
+        available = []
+        with self.tracer.span("glob packages", pairs=len(self.language_pairs)):
+            for language_pair in self.language_pairs:
+                package_patterns = [
+                    os.path.join(self.packages_dir, f"translate-{language_pair}-*"),
+                    os.path.join(self.packages_dir, f"{language_pair}")
+                ]
+                # Check if any pattern exists
+                if any(Path(p).is_dir() for pattern in package_patterns for p in glob.glob(pattern)):
+                    available.append(language_pair)
+        self.scanned.emit(available)
+
+
+class PackageRemoverThread(QThread):
+    """Deletes package directories and the downloaded .argosmodel file"""
+    removed = pyqtSignal(bool, str)
+
+    def __init__(self, package_patterns, model_file, parent=None):
+        super().__init__(parent)
+        self.package_patterns = package_patterns
+        self.model_file = model_file
+
+    def run(self):
+        try:
+            # Remove matching package directories
+            removed_dirs = False
+            for pattern in self.package_patterns:
+                for dir_path in glob.glob(pattern):
+                    if os.path.isdir(dir_path):
+                        shutil.rmtree(dir_path)
+                        removed_dirs = True
+
+            # Remove model file if exists
+            removed_file = False
+            if os.path.exists(self.model_file):
+                os.remove(self.model_file)
+                removed_file = True
+
+            self.removed.emit(removed_dirs or removed_file, "")
+        except Exception as e:
+            self.removed.emit(False, str(e))
+
+
+class BundleInstallThread(QThread):
+    """Installs every .argosmodel bundle of a directory, reports once all are done"""
+    installed = pyqtSignal(list, str)
+
+    def __init__(self, directory, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+
+    def run(self):
+        from resource.bundles import install_bundles
+        tracer = Tracer("install bundles", enabled=cfg.get(cfg.traceEnabled))
+        try:
+            with tracer.span("job"):
+                results = install_bundles(self.directory, tracer=tracer)
+            self.installed.emit(results, "")
+        except Exception as e:
+            self.installed.emit([], str(e))
+        finally:
+            tracer.finish()
+
+
+def is_package_installed(from_lang: str, to_lang: str):
+    import argostranslate.translate
     installed_languages = argostranslate.translate.get_installed_languages()
 
     # Check if translation is already available
@@ -58,21 +192,22 @@ def package_downloader(main_window, from_lang: str, to_lang: str):
     if from_lang_obj and to_lang_obj:
         try:
             if from_lang_obj.get_translation(to_lang_obj):
-                return True  # Package already installed
+                return True
         except:
             pass
+    return False
 
-    # Start download thread if needed
+def package_downloader(main_window, from_lang: str, to_lang: str):
+    """Check if package is installed and download if needed, both off the GUI thread"""
     if hasattr(main_window, 'package_thread') and main_window.package_thread.isRunning():
         main_window.package_thread.stop()
 
-    main_window.package_thread = PackageDownloaderThread(from_lang, to_lang)
+    # Parented to the window so a superseded thread stays alive until it finishes
+    main_window.package_thread = PackageDownloaderThread(from_lang, to_lang, parent=main_window)
     main_window.package_thread.download_start.connect(main_window.on_package_download_finished)
     main_window.package_thread.download_finished.connect(main_window.on_package_download_finished)
     main_window.package_thread.start()
 
-    return False
-
 def update_package(main_window):
     language_pair = cfg.get(cfg.package).value
     content=QCoreApplication.translate("MainWindow", "Delete currently selected Argos Translate package. Currently selected: <b>{}</b>").format(cfg.get(cfg.package).value)
@@ -89,3 +224,5 @@ def update_package(main_window):
 def update_device(main_window):
     device = cfg.get(cfg.device).value
     os.environ["ARGOS_DEVICE_TYPE"] = f"{device}"
+    # Loaded models are rebuilt in the engine and swapped in between batches
+    main_window.file_translator.reconfigure()
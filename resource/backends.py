@@ -0,0 +1,427 @@
+import math
+import os
+import re
+import threading
+import time
+from resource.tracing import NULL_TRACER
+
+# Sentence boundaries for engines that do not bring their own splitter
+SENTENCE_RE = re.compile(r'(?<=[.!?。！？])\s+')
+
+# Translated once after loading, so lazily built models and tokenizers are ready before the first file
+WARM_UP_TEXTS = ["Hello, world. This is a short sentence."]
+
+
+class BackendError(Exception):
+    """Raised when a backend cannot serve the requested language pair"""
+
+
+class TranslationBackend:
+    """Translates batches of single-paragraph segments for one language pair"""
+
+    name = ""
+    tracer = NULL_TRACER
+    # Options that only change how the model runs; the engine rebuilds a loaded backend to apply them
+    compute_options = ()
+
+    def __init__(self, from_code, to_code, **options):
+        self.from_code = from_code
+        self.to_code = to_code
+        self.options = options
+        self.loaded = False
+
+    def load(self):
+        """Load the model, calling it again is a no-op"""
+        self.loaded = True
+
+    def translate_batch(self, texts):
+        """Return the translation of every text, in order"""
+        raise NotImplementedError
+
+    def translate_quick(self, texts):
+        """Cheaper decode for segments a close translation-memory match vouches for.
+
+        Engines without a decoding knob translate as usual.
+        """
+        return self.translate_batch(texts)
+
+    def translate(self, text):
+        return self.translate_batch([text])[0]
+
+    def warm_up(self):
+        """Load the model and decode one dummy batch"""
+        self.load()
+        self.translate_batch(WARM_UP_TEXTS)
+
+    def model_bytes(self):
+        """Approximate memory of the loaded model, 0 when unknown"""
+        return 0
+
+    def decode_counts(self):
+        """(sentences decoded, sentences decoded again by a two-pass refinement) since the model was created"""
+        return 0, 0
+
+    def close(self):
+        self.loaded = False
+
+
+def find_package(from_code, to_code):
+    """The installed Argos package for the pair, or None"""
+    import argostranslate.package
+
+    return next(
+        (p for p in argostranslate.package.get_installed_packages()
+         if p.from_code == from_code and p.to_code == to_code),
+        None
+    )
+
+
+def package_model_bytes(from_code, to_code):
+    """Size of the CTranslate2 model of an installed package, close to what it takes in memory"""
+    package = find_package(from_code, to_code)
+    if package is None:
+        return 0
+    model_dir = os.path.join(str(package.package_path), "model")
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(model_dir) for name in names)
+
+
+class ArgosBackend(TranslationBackend):
+    """The regular argostranslate path: stanza sentence splitting + CTranslate2 model.
+
+    argostranslate keeps one module-global translation per package and builds
+    its CTranslate2 model once, on whatever device was set at the time. This
+    backend builds its own model from the package instead, on its own device,
+    so a rebuilt backend really moves to the new device and close() frees it.
+    Pairs without a direct package pivot through English, like Argos does.
+    """
+
+    name = "argos"
+    # Argos decodes with its own settings and only lets the device be chosen
+    compute_options = ("device",)
+    PIVOT_CODE = "en"
+
+    def __init__(self, from_code, to_code, **options):
+        super().__init__(from_code, to_code, **options)
+        self.translation = None
+        self.steps = []
+
+    def load(self):
+        if self.loaded:
+            return
+        import argostranslate.settings
+        import argostranslate.translate
+        import ctranslate2
+
+        device = self.options.get("device") or os.environ.get("ARGOS_DEVICE_TYPE", "cpu")
+        # Stanza sentence splitting reads the device from the settings
+        argostranslate.settings.device = device
+
+        with self.tracer.span("package lookup"):
+            packages = [find_package(self.from_code, self.to_code)]
+            if packages[0] is None:
+                packages = [find_package(self.from_code, self.PIVOT_CODE), find_package(self.PIVOT_CODE, self.to_code)]
+        if any(package is None for package in packages):
+            raise BackendError("Required language package not installed")
+
+        with self.tracer.span("model load"):
+            steps = []
+            for package in packages:
+                step = argostranslate.translate.PackageTranslation(
+                    argostranslate.translate.Language(package.from_code, package.from_name),
+                    argostranslate.translate.Language(package.to_code, package.to_name),
+                    package
+                )
+                step.translator = ctranslate2.Translator(str(package.package_path / "model"), device=device)
+                steps.append(step)
+        self.steps = steps
+        self.translation = steps[0] if len(steps) == 1 else argostranslate.translate.CompositeTranslation(*steps)
+        self.loaded = True
+
+    def translate_batch(self, texts):
+        self.load()
+        with self.tracer.span("decode", segments=len(texts)):
+            return [self.translation.translate(text) if text.strip() else text for text in texts]
+
+    def model_bytes(self):
+        return package_model_bytes(self.from_code, self.to_code)
+
+    def close(self):
+        # Dropping the references lets CTranslate2 free the model memory
+        for step in self.steps:
+            step.translator = None
+        self.steps = []
+        self.translation = None
+        self.loaded = False
+
+
+class CTranslate2Backend(TranslationBackend):
+    """Drives the CTranslate2 model of an installed Argos package directly.
+
+    Every sentence of every segment goes through a single translate_batch call,
+    so max_batch_size, beam_size, batch_type and asynchronous mode are honoured.
+
+    With refine_beam set, decoding takes two passes: every sentence is decoded
+    greedily with its score, and only the sentences whose mean token
+    probability is below refine_threshold are decoded again with refine_beam.
+    """
+
+    name = "ctranslate2"
+    compute_options = ("device", "compute_type", "intra_threads")
+
+    defaults = {
+        "beam_size": 4,
+        "max_batch_size": 32,
+        "batch_type": "examples",
+        "asynchronous": False,
+        "compute_type": "auto",
+        "inter_threads": 1,
+        "intra_threads": 0,
+        # Two-pass decoding, 0 decodes every sentence with beam_size
+        "refine_beam": 0,
+        "refine_threshold": 0.5,
+    }
+
+    def __init__(self, from_code, to_code, **options):
+        super().__init__(from_code, to_code, **{**self.defaults, **options})
+        self.translator = None
+        self.tokenizer = None
+        self.target_prefix = ""
+        self._counts_lock = threading.Lock()
+        self.sentences = 0
+        self.refined = 0
+
+    def find_package(self):
+        package = find_package(self.from_code, self.to_code)
+        if package is None:
+            raise BackendError("Required language package not installed")
+        return package
+
+    def load(self):
+        if self.loaded:
+            return
+        import ctranslate2
+        import sentencepiece
+
+        with self.tracer.span("package lookup"):
+            package = self.find_package()
+        model_dir = os.path.join(str(package.package_path), "model")
+        sp_model = os.path.join(str(package.package_path), "sentencepiece.model")
+        if not os.path.isdir(model_dir) or not os.path.exists(sp_model):
+            raise BackendError(f"Package {self.from_code}→{self.to_code} has no CTranslate2 model")
+
+        with self.tracer.span("model load"):
+            self.translator = ctranslate2.Translator(
+                model_dir,
+                device=self.options.get("device") or os.environ.get("ARGOS_DEVICE_TYPE", "cpu"),
+                compute_type=self.options["compute_type"],
+                inter_threads=self.options["inter_threads"],
+                intra_threads=self.options["intra_threads"],
+            )
+            self.tokenizer = sentencepiece.SentencePieceProcessor(model_file=sp_model)
+        self.target_prefix = package.target_prefix
+        self.loaded = True
+
+    def translate_batch(self, texts, beam_size=None):
+        self.load()
+
+        # Flatten segments into sentences, remembering which segment owns which
+        owners = []
+        tokenized = []
+        for index, text in enumerate(texts):
+            for sentence in SENTENCE_RE.split(text.strip()):
+                if sentence:
+                    owners.append(index)
+                    tokenized.append(self.tokenizer.encode(sentence, out_type=str))
+
+        with self.tracer.span("decode", sentences=len(tokenized)):
+            results = self.translate_tokens(tokenized, beam_size) if tokenized else []
+
+        parts = [[] for _ in texts]
+        for index, tokens in zip(owners, results):
+            parts[index].append(self.detokenize(tokens))
+        return [" ".join(p) if p else text for p, text in zip(parts, texts)]
+
+    def translate_quick(self, texts):
+        # Greedy search: a fraction of the cost of the configured beam
+        return self.translate_batch(texts, beam_size=1)
+
+    def translate_tokens(self, tokenized, beam_size=None):
+        """Run translate_batch on tokenized sentences, return the best hypothesis tokens"""
+        if beam_size is None and self.options["refine_beam"]:
+            return self.translate_two_pass(tokenized)
+        with self._counts_lock:
+            self.sentences += len(tokenized)
+        return [r.hypotheses[0] for r in self.decode(tokenized, beam_size or self.options["beam_size"])]
+
+    def translate_two_pass(self, tokenized):
+        """Greedy draft of every sentence, the ones the model is unsure of are decoded again with refine_beam"""
+        # With a length penalty of 1 the score is the mean log-probability of the hypothesis tokens
+        with self.tracer.span("draft", sentences=len(tokenized)):
+            drafts = self.decode(tokenized, 1, length_penalty=1.0, return_scores=True)
+        threshold = math.log(self.options["refine_threshold"])
+        unsure = [index for index, result in enumerate(drafts) if result.scores[0] < threshold]
+        hypotheses = [result.hypotheses[0] for result in drafts]
+        if unsure:
+            with self.tracer.span("refine", sentences=len(unsure)):
+                refined = self.decode([tokenized[index] for index in unsure], self.options["refine_beam"])
+            for index, result in zip(unsure, refined):
+                hypotheses[index] = result.hypotheses[0]
+        with self._counts_lock:
+            self.sentences += len(tokenized)
+            self.refined += len(unsure)
+        return hypotheses
+
+    def decode(self, tokenized, beam_size, length_penalty=0.2, return_scores=False):
+        target_prefix = [[self.target_prefix]] * len(tokenized) if self.target_prefix else None
+        results = self.translator.translate_batch(
+            tokenized,
+            target_prefix=target_prefix,
+            replace_unknowns=True,
+            max_batch_size=self.options["max_batch_size"],
+            batch_type=self.options["batch_type"],
+            beam_size=beam_size,
+            length_penalty=length_penalty,
+            return_scores=return_scores,
+            asynchronous=self.options["asynchronous"],
+        )
+        if self.options["asynchronous"]:
+            results = [r.result() for r in results]
+        return results
+
+    def detokenize(self, tokens):
+        value = self.tokenizer.decode(tokens)
+        if self.target_prefix and value.startswith(self.target_prefix):
+            value = value[len(self.target_prefix):]
+        return value[1:] if value.startswith(" ") else value
+
+    def model_bytes(self):
+        return package_model_bytes(self.from_code, self.to_code)
+
+    def decode_counts(self):
+        with self._counts_lock:
+            return self.sentences, self.refined
+
+    def close(self):
+        # Dropping the references lets CTranslate2 free the model memory
+        self.translator = None
+        self.tokenizer = None
+        self.loaded = False
+
+
+class FakeBackend(TranslationBackend):
+    """Deterministic model-free backend for benchmarks and offline testing.
+
+    Reverses every word so output differs from input while keeping its shape.
+    An optional per-call and per-segment delay imitates decoding cost, and
+    word_delay (seconds per squared word count of each segment) imitates the
+    cost of attention growing with input length. load_delay and model_bytes
+    imitate loading a model of that size.
+    """
+
+    name = "fake"
+    compute_options = ("device", "compute_type", "intra_threads")
+
+    def __init__(self, from_code="en", to_code="xx", **options):
+        super().__init__(from_code, to_code, **options)
+        self.load_delay = options.get("load_delay", 0.0)
+        self.model_size = options.get("model_bytes", 0)
+        self.call_delay = options.get("call_delay", 0.0)
+        self.segment_delay = options.get("segment_delay", 0.0)
+        self.word_delay = options.get("word_delay", 0.0)
+        self.calls = 0
+
+    def load(self):
+        if not self.loaded and self.load_delay:
+            time.sleep(self.load_delay)
+        self.loaded = True
+
+    def model_bytes(self):
+        return self.model_size
+
+    def translate_batch(self, texts):
+        self.load()
+        self.calls += 1
+        delay = self.call_delay + self.segment_delay * len(texts)
+        if self.word_delay:
+            delay += self.word_delay * sum(len(text.split()) ** 2 for text in texts)
+        if delay:
+            time.sleep(delay)
+        return [" ".join(word[::-1] for word in text.split(" ")) for text in texts]
+
+
+class SwappableBackend(TranslationBackend):
+    """Stable handle on a backend that can be replaced while jobs are using it.
+
+    swap() takes effect at the next batch: a batch already inside the old
+    backend finishes there, and the old backend is closed once its last
+    batch has returned.
+    """
+
+    def __init__(self, backend, compute):
+        super().__init__(backend.from_code, backend.to_code, **backend.options)
+        self.backend = backend
+        # Compute options the current backend was built with, and the ones being built, if any
+        self.compute = compute
+        self.pending = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._batches = {}
+
+    def load(self):
+        with self._load_lock:
+            self.backend.load()
+
+    def _run(self, method, texts):
+        with self._lock:
+            backend = self.backend
+            self._batches[backend] = self._batches.get(backend, 0) + 1
+        backend.tracer = self.tracer
+        try:
+            if not backend.loaded:
+                # A job and the interactive thread may hit an unloaded model together, it is loaded once
+                with self._load_lock:
+                    backend.load()
+            return getattr(backend, method)(texts)
+        finally:
+            # Decided under the lock, so either this batch or swap() closes a retired backend, never both
+            with self._lock:
+                self._batches[backend] -= 1
+                drained = not self._batches[backend]
+                if drained:
+                    del self._batches[backend]
+                retired = drained and backend is not self.backend
+            if retired:
+                backend.close()
+
+    def translate_batch(self, texts):
+        return self._run("translate_batch", texts)
+
+    def translate_quick(self, texts):
+        return self._run("translate_quick", texts)
+
+    def model_bytes(self):
+        return self.backend.model_bytes()
+
+    def swap(self, backend, compute):
+        with self._lock:
+            old = self.backend
+            self.backend = backend
+            self.compute = compute
+            idle = old not in self._batches
+        if idle:
+            old.close()
+
+    def close(self):
+        self.backend.close()
+
+
+BACKENDS = {backend.name: backend for backend in (ArgosBackend, CTranslate2Backend, FakeBackend)}
+
+
+def create_backend(name, from_code, to_code, **options):
+    """Instantiate the backend registered under name"""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise BackendError(f"Unknown translation backend: {name}")
+    return backend_class(from_code, to_code, **options)
@@ -0,0 +1,191 @@
+"""Offline bulk install of .argosmodel bundles, independent of Qt.
+
+argostranslate.package.install_from_path takes a global lock and extracts
+one archive at a time. Here the bundles of a directory are checked (one
+package directory with metadata.json, no paths leaving it) and then
+extracted in parallel; zlib decompression, CRC checks and file writes release
+the GIL, so a thread pool keeps several cores busy. A package already
+installed at the same version is skipped. Each bundle is extracted next to
+the packages and renamed into place once every member passed its CRC check,
+so a damaged or interrupted install never leaves a half-extracted package.
+
+    python main.py --install-bundles <directory> [--workers 4] [--force]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from resource.tracing import NULL_TRACER
+
+BUNDLE_EXTENSION = ".argosmodel"
+INSTALL_WORKERS = min(4, os.cpu_count() or 1)
+
+Bundle = namedtuple("Bundle", "path directory code version")
+# status is "installed", "skipped" or "failed"
+InstallResult = namedtuple("InstallResult", "path code status detail")
+
+
+class BundleError(Exception):
+    pass
+
+
+def packages_directory():
+    """Where Argos Translate looks for installed packages, set up by resource.config"""
+    return os.environ["ARGOS_PACKAGES_DIR"]
+
+
+def find_bundles(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(BUNDLE_EXTENSION) and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def package_code(metadata):
+    return f"{metadata.get('from_code')}_{metadata.get('to_code')}"
+
+
+def verify_bundle(path):
+    """Check the archive layout and read its metadata, returns a Bundle or raises BundleError.
+
+    Member CRCs are checked while extracting, decompressing everything twice would double the install time.
+    """
+    try:
+        with zipfile.ZipFile(path, "r") as zipf:
+            names = zipf.namelist()
+            roots = {name.split("/", 1)[0] for name in names}
+            if len(roots) != 1:
+                raise BundleError("Archive must contain exactly one package directory")
+            directory = roots.pop()
+            for name in names:
+                if name.startswith("/") or ".." in name.split("/"):
+                    raise BundleError(f"Unsafe path in archive: {name}")
+            try:
+                metadata = json.loads(zipf.read(f"{directory}/metadata.json"))
+            except KeyError:
+                raise BundleError("No metadata.json in the package")
+    except (zipfile.BadZipFile, OSError, ValueError) as e:
+        raise BundleError(f"Not a valid Argos model: {str(e)}")
+    return Bundle(path, directory, package_code(metadata), str(metadata.get("package_version", "")))
+
+
+def installed_packages(packages_dir):
+    """{"from_to": (directory name, package_version)} of the installed packages"""
+    installed = {}
+    for name in os.listdir(packages_dir):
+        try:
+            with open(os.path.join(packages_dir, name, "metadata.json"), "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            continue
+        installed[package_code(metadata)] = (name, str(metadata.get("package_version", "")))
+    return installed
+
+
+def extract_bundle(bundle, packages_dir, replaces=None):
+    """Extract into a temporary directory next to the packages, then swap it in for the old version"""
+    staging = tempfile.mkdtemp(prefix=f".{bundle.directory}.", suffix=".part", dir=packages_dir)
+    try:
+        with zipfile.ZipFile(bundle.path, "r") as zipf:
+            zipf.extractall(staging)
+        for name in {bundle.directory, replaces} - {None}:
+            if os.path.isdir(os.path.join(packages_dir, name)):
+                shutil.rmtree(os.path.join(packages_dir, name))
+        os.replace(os.path.join(staging, bundle.directory), os.path.join(packages_dir, bundle.directory))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def install_bundles(directory, packages_dir=None, max_workers=INSTALL_WORKERS, force=False, tracer=NULL_TRACER,
+                    on_result=None):
+    """Install every .argosmodel in directory, returns an InstallResult per bundle in file order"""
+    packages_dir = packages_dir or packages_directory()
+    os.makedirs(packages_dir, exist_ok=True)
+    paths = find_bundles(directory)
+    on_result = on_result or (lambda result: None)
+
+    def verify(path):
+        try:
+            return verify_bundle(path), None
+        except BundleError as e:
+            return None, str(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        with tracer.span("verify", bundles=len(paths)):
+            verified = list(pool.map(verify, paths))
+
+        with tracer.span("installed check"):
+            installed = installed_packages(packages_dir)
+        results = {}
+        to_extract = []
+        claimed = {}
+        for path, (bundle, error) in zip(paths, verified):
+            if bundle is None:
+                results[path] = InstallResult(path, None, "failed", error)
+            elif bundle.code in claimed:
+                results[path] = InstallResult(path, bundle.code, "skipped",
+                                              f"Same package as {os.path.basename(claimed[bundle.code])}")
+            elif not force and installed.get(bundle.code, (None, None))[1] == bundle.version:
+                results[path] = InstallResult(path, bundle.code, "skipped", f"Version {bundle.version} is installed")
+            else:
+                claimed[bundle.code] = path
+                to_extract.append(bundle)
+        for result in results.values():
+            on_result(result)
+
+        def extract(bundle):
+            try:
+                with tracer.span("extract", code=bundle.code):
+                    extract_bundle(bundle, packages_dir, installed.get(bundle.code, (None, None))[0])
+                result = InstallResult(bundle.path, bundle.code, "installed", f"Version {bundle.version}")
+            except (OSError, zipfile.BadZipFile) as e:
+                result = InstallResult(bundle.path, bundle.code, "failed", str(e))
+            on_result(result)
+            return result
+
+        for result in pool.map(extract, to_extract):
+            results[result.path] = result
+    return [results[path] for path in paths]
+
+
+def summarize(results):
+    counts = {status: sum(result.status == status for result in results) for status in ("installed", "skipped", "failed")}
+    return f"{counts['installed']} installed, {counts['skipped']} skipped, {counts['failed']} failed"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Install every .argosmodel bundle of a directory")
+    parser.add_argument("--install-bundles", dest="directory", required=True, metavar="DIRECTORY")
+    parser.add_argument("--workers", type=int, default=INSTALL_WORKERS, help="bundles verified and extracted at once")
+    parser.add_argument("--force", action="store_true", help="reinstall packages already at the same version")
+    args = parser.parse_args(argv)
+
+    # Importing the config sets up the application's packages directory
+    import resource.config
+    from resource.tracing import Tracer
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} is not a directory")
+    tracer = Tracer("install bundles", enabled=resource.config.cfg.get(resource.config.cfg.traceEnabled))
+
+    def report(result):
+        print(f"{result.status:<10}{os.path.basename(result.path)}: {result.detail}")
+
+    try:
+        with tracer.span("job"):
+            results = install_bundles(args.directory, max_workers=args.workers, force=args.force, tracer=tracer,
+                                      on_result=report)
+    finally:
+        tracer.finish()
+    print(summarize(results))
+    return 1 if any(result.status == "failed" for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Splitting of over-long segments before they reach the model.
+
+Decoding cost grows faster than linearly with input length and models cut
+inputs off at their maximum length, so a paragraph of a few thousand words is
+both slow and at risk of losing its tail. Segments above a token limit are cut
+at sentence boundaries, then at clause boundaries, then between words, and the
+pieces are packed back into chunks of at most that limit. The chunks of all
+segments are translated as one batch and joined with the whitespace that
+separated them in the source.
+"""
+import re
+
+# Default limit per chunk, comfortably below the 512-1024 token inputs Argos models accept
+MAX_SEGMENT_TOKENS = 200
+
+# SentencePiece averages roughly four characters per token on Latin scripts
+CHARS_PER_TOKEN = 4
+
+SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+|(?<=[。！？])\s*')
+CLAUSE_BREAK_RE = re.compile(r'(?<=[,;:])\s+|(?<=[，；：、])\s*|\s+(?=[—–]\s)')
+WORD_BREAK_RE = re.compile(r'\s+')
+
+
+def estimate_tokens(text):
+    """Cheap upper-bound guess of the model tokens in text, no tokenizer needed"""
+    return max(len(text.split()), len(text) // CHARS_PER_TOKEN)
+
+
+def _cut(text, pattern):
+    """Split text after each match of pattern, every piece keeps its trailing separator"""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        if match.end() > start and match.start() > start:
+            pieces.append(text[start:match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _units(text, max_tokens):
+    """Pieces no longer than max_tokens, cut at the coarsest boundary that works"""
+    for sentence in _cut(text, SENTENCE_BREAK_RE):
+        if estimate_tokens(sentence) <= max_tokens:
+            yield sentence
+            continue
+        for clause in _cut(sentence, CLAUSE_BREAK_RE):
+            if estimate_tokens(clause) <= max_tokens:
+                yield clause
+                continue
+            for word in _cut(clause, WORD_BREAK_RE):
+                # A run without any whitespace is cut blindly
+                step = max_tokens * CHARS_PER_TOKEN
+                for start in range(0, len(word), step):
+                    yield word[start:start + step]
+
+
+def split_segment(text, max_tokens=MAX_SEGMENT_TOKENS):
+    """Chunks of text with at most max_tokens each; concatenated they give back text"""
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks = []
+    current = ""
+    for unit in _units(text, max_tokens):
+        if current and estimate_tokens(current + unit) > max_tokens:
+            chunks.append(current)
+            current = ""
+        current += unit
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_segments(segments, max_tokens=MAX_SEGMENT_TOKENS, into=None):
+    """Flatten segments into chunks for the model.
+
+    Returns (chunks, layout). A layout entry is None for a segment sent as it
+    is, otherwise (leading whitespace, whitespace after each chunk) so that
+    join_chunks can rebuild the segment around the translated chunks. Chunks
+    are appended to into (e.g. a SegmentTable) when given, to a new list
+    otherwise.
+    """
+    chunks = [] if into is None else into
+    layout = []
+    for text in segments:
+        pieces = split_segment(text, max_tokens)
+        if len(pieces) == 1:
+            chunks.append(text)
+            layout.append(None)
+            continue
+
+        lead = text[:len(text) - len(text.lstrip())]
+        separators = []
+        for piece in pieces:
+            stripped = piece.strip()
+            if not stripped:
+                continue
+            chunks.append(stripped)
+            separators.append(piece[len(piece.rstrip()):])
+        layout.append((lead, separators))
+    return chunks, layout
+
+
+def join_chunks(translations, layout, into=None):
+    """Inverse of chunk_segments: one translated string per original segment"""
+    joined = [] if into is None else into
+    position = 0
+    for entry in layout:
+        if entry is None:
+            joined.append(translations[position])
+            position += 1
+            continue
+        lead, separators = entry
+        parts = translations[position:position + len(separators)]
+        position += len(separators)
+        joined.append(lead + "".join(part + separator for part, separator in zip(parts, separators)))
+    return joined
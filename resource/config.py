@@ -1,10 +1,10 @@
 from enum import Enum
+import json
 import os, sys
 from pathlib import Path
-from ctranslate2 import get_cuda_device_count
 from PyQt6.QtCore import QLocale
-from qfluentwidgets import (qconfig, QConfig, OptionsConfigItem, Theme,
-                            OptionsValidator, EnumSerializer, ConfigSerializer)
+from qfluentwidgets import (qconfig, QConfig, ConfigItem, OptionsConfigItem, RangeConfigItem, Theme,
+                            OptionsValidator, RangeValidator, BoolValidator, EnumSerializer, ConfigSerializer)
 
 
 class ArgosPathManager:
@@ -29,7 +29,6 @@ class ArgosPathManager:
             "XDG_CACHE_HOME": str(Path(ARGOS_PACKAGES_DIR) / "cache"),
             "ARGOS_PACKAGES_DIR": str(Path(ARGOS_PACKAGES_DIR) / "data" / "argos-translate" / "packages"),
             "ARGOS_TRANSLATE_DATA_DIR": str(Path(ARGOS_PACKAGES_DIR) / "data"),
-            "ARGOS_DEVICE_TYPE": "cuda" if get_cuda_device_count() != 0 else "cpu"
         })
 
         # Create directories
@@ -41,7 +40,7 @@ class ArgosPathManager:
 # Initialize Argos paths BEFORE any Argos Translate imports
 ArgosPathManager.initialize()
 
-from argostranslate import argospm
+from resource.output import OUTPUT_POLICIES
 
 class Language(Enum):
     """ Language enumeration """
@@ -79,14 +78,53 @@ class DeviceSerializer(ConfigSerializer):
         return device
 
 
-available_packages = argospm.get_available_packages()
+PACKAGE_INDEX_PATH = os.path.join("config", "package_index.json")
+
+# Packages of the Argos package index at the time of writing, used until the index has been
+# fetched once; after that the pairs come from the copy cached in PACKAGE_INDEX_PATH.
+FALLBACK_PACKAGE_PAIRS = (
+    "sq_en", "ar_en", "az_en", "eu_en", "bn_en", "bg_en", "ca_en", "zt_en", "zh_en", "cs_en",
+    "da_en", "nl_en", "en_sq", "en_ar", "en_az", "en_eu", "en_bn", "en_bg", "en_ca", "en_zh",
+    "en_zt", "en_cs", "en_da", "en_nl", "en_eo", "en_et", "en_fi", "en_fr", "en_gl", "en_de",
+    "en_el", "en_he", "en_hi", "en_hu", "en_id", "en_ga", "en_it", "en_ja", "en_ko", "en_lv",
+    "en_lt", "en_ms", "en_nb", "en_fa", "en_pl", "en_pt", "en_pb", "en_ro", "en_ru", "en_sk",
+    "en_sl", "en_es", "en_sv", "en_tl", "en_th", "en_tr", "en_uk", "en_ur", "eo_en", "et_en",
+    "fi_en", "fr_en", "gl_en", "de_en", "el_en", "he_en", "hi_en", "hu_en", "id_en", "ga_en",
+    "it_en", "ja_en", "ko_en", "lv_en", "lt_en", "ms_en", "nb_en", "fa_en", "pl_en", "pb_en",
+    "pt_en", "pt_es", "ro_en", "ru_en", "sk_en", "sl_en", "es_en", "es_pt", "sv_en", "tl_en",
+    "th_en", "tr_en", "uk_en", "ur_en"
+)
+
+
+def load_package_pairs(path=PACKAGE_INDEX_PATH):
+    """Language pairs of the cached package index, the fallback list when there is no usable cache"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            pairs = json.load(f)
+    except (OSError, ValueError):
+        return FALLBACK_PACKAGE_PAIRS
+    pairs = tuple(pair for pair in pairs if isinstance(pair, str) and pair.count('_') == 1)
+    return pairs or FALLBACK_PACKAGE_PAIRS
+
+
+def save_package_pairs(pairs, path=PACKAGE_INDEX_PATH):
+    """Cache the pairs of a freshly fetched index for the next start"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(list(pairs), f)
+    os.replace(temp_path, path)
+
+
+# The enum is fixed for the session, a refreshed index takes effect on the next start
+PACKAGE_PAIRS = load_package_pairs()
 
 TranslationPackage = Enum(
     'TranslationPackage',
     {
         **{"NONE": "None"},
-        **{f"{pkg.from_code.upper()}_TO_{pkg.to_code.upper()}": f"{pkg.from_code}_{pkg.to_code}"
-           for pkg in available_packages}
+        **{f"{from_code.upper()}_TO_{to_code.upper()}": f"{from_code}_{to_code}"
+           for from_code, to_code in (pair.split('_') for pair in PACKAGE_PAIRS)}
     }
 )
 
@@ -102,10 +140,8 @@ class TranslationPackageSerializer(ConfigSerializer):
     def deserialize(self, value: str):
         if value == "None":
             return TranslationPackage.NONE
-        package = self.package_map.get(value)
-        if package is None:
-            raise ValueError(f"Invalid translation package: {value}")
-        return package
+        # A pair the refreshed index no longer offers falls back to no package
+        return self.package_map.get(value, TranslationPackage.NONE)
 
 class Config(QConfig):
     language = OptionsConfigItem(
@@ -118,6 +154,43 @@ class Config(QConfig):
         "Settings", "DpiScale", "Auto", OptionsValidator([1, 1.25, 1.5, 1.75, 2, "Auto"]), restart=True)
     package = OptionsConfigItem(
         "Translation", "package", TranslationPackage.NONE, OptionsValidator(TranslationPackage), TranslationPackageSerializer(), restart=False)
+    backend = OptionsConfigItem(
+        "Translation", "backend", "argos", OptionsValidator(["argos", "ctranslate2"]), restart=False)
+    beamSize = RangeConfigItem("Translation", "beamSize", 4, RangeValidator(1, 10))
+    refineBeam = RangeConfigItem("Translation", "refineBeam", 0, RangeValidator(0, 10))
+    refineThreshold = RangeConfigItem("Translation", "refineThreshold", 50, RangeValidator(1, 99))
+    computeThreads = RangeConfigItem("Translation", "threads", 0, RangeValidator(0, 32))
+    computeType = OptionsConfigItem(
+        "Translation", "computeType", "auto", OptionsValidator(["auto", "int8", "int8_float16", "float16", "float32"]),
+        restart=False)
+    maxBatchSize = RangeConfigItem("Translation", "maxBatchSize", 32, RangeValidator(1, 256))
+    maxSegmentTokens = RangeConfigItem("Translation", "maxSegmentTokens", 200, RangeValidator(0, 1000))
+    mergeCues = ConfigItem("Subtitles", "mergeCues", False, BoolValidator())
+    dataFields = ConfigItem("Data", "fields", "")
+    fanOutPackages = ConfigItem("Translation", "fanOutPackages", [])
+    fanOutWorkers = RangeConfigItem("Translation", "fanOutWorkers", 2, RangeValidator(1, 8))
+    memoryEnabled = ConfigItem("Memory", "enabled", False, BoolValidator())
+    memoryThreshold = RangeConfigItem("Memory", "threshold", 90, RangeValidator(50, 100))
+    memoryFuzzyAction = OptionsConfigItem(
+        "Memory", "fuzzyAction", "reuse", OptionsValidator(["reuse", "retranslate"]), restart=False)
+    preloadModels = ConfigItem("Preload", "enabled", True, BoolValidator())
+    preloadBudget = RangeConfigItem("Preload", "budgetMb", 1024, RangeValidator(0, 16384))
+    recentPackages = ConfigItem("Preload", "recent", [])
+    governorThreads = RangeConfigItem("Governor", "maxThreads", 0, RangeValidator(0, 64))
+    governorNiceness = RangeConfigItem("Governor", "niceness", 0, RangeValidator(0, 19))
+    governorMemory = RangeConfigItem("Governor", "memoryMb", 0, RangeValidator(0, 32768))
+    outputPolicy = OptionsConfigItem(
+        "Output", "policy", "ask", OptionsValidator(OUTPUT_POLICIES), restart=False)
+    outputFolder = ConfigItem("Output", "folder", "")
+    watchEnabled = ConfigItem("Watch", "enabled", False, BoolValidator())
+    watchFolder = ConfigItem("Watch", "folder", "")
+    watchOutput = ConfigItem("Watch", "output", "")
+    incremental = ConfigItem("Output", "incremental", True, BoolValidator())
+    livePreview = ConfigItem("Preview", "enabled", True, BoolValidator())
+    previewSegments = RangeConfigItem("Preview", "segments", 500, RangeValidator(50, 5000))
+    traceEnabled = ConfigItem("Diagnostics", "traceEnabled", False, BoolValidator())
+    stallMonitor = ConfigItem("Diagnostics", "stallMonitor", False, BoolValidator(), restart=True)
+    stallThreshold = RangeConfigItem("Diagnostics", "stallThreshold", 200, RangeValidator(50, 5000))
 
 
 cfg = Config()
@@ -0,0 +1,22 @@
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def cuda_device_count():
+    """Number of CUDA devices, probed once per process; importing ctranslate2 is the slow part"""
+    try:
+        from ctranslate2 import get_cuda_device_count
+        return get_cuda_device_count()
+    except Exception as e:
+        print(f"Error probing CUDA devices: {str(e)}")
+        return 0
+
+
+def default_device():
+    return "cuda" if cuda_device_count() != 0 else "cpu"
+
+
+def ensure_device_env():
+    """Pick the Argos device from the probe unless the user already chose one"""
+    os.environ.setdefault("ARGOS_DEVICE_TYPE", default_device())
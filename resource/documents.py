@@ -0,0 +1,110 @@
+from array import array
+
+from resource.segments import SegmentTable
+
+# Run contents that must never be handed to the translator
+SKIP_TAGS = (
+    '<w:hyperlink',  # Hyperlinks
+    '<w:instrText',  # Field codes
+    '<w:fldChar',    # Field characters
+    '<w:drawing',    # Drawings
+    '<w:pict',       # Pictures
+    '<m:oMath',      # Math formulas
+    '<w:footnote',   # Footnotes
+    '<w:endnote',    # Endnotes
+    '<m:sup',        # Superscript
+    '<m:sub',        # subscript
+    '<m:frac',       # a fraction
+    '<m:msup',       # mathematical superscript
+    '<a:blip',       # bitmap image
+    '<a:shape',      # a shape
+    '<a:groupShape', # a group of shapes
+    '<a:line',       # a line shape
+)
+
+
+def load_docx(path):
+    """Parse a .docx file into a python-docx Document"""
+    # Imported on first use, python-docx and lxml are not needed to show the window
+    from docx import Document
+    return Document(path)
+
+
+def is_non_text_run(run):
+    """Returns True if the run contains drawing or hyperlink content"""
+    xml = run._element.xml
+    return any(tag in xml for tag in SKIP_TAGS)
+
+
+def is_translatable_run(run):
+    """More accurate detection of translatable runs"""
+    if not run.text.strip():
+        return False
+    return not is_non_text_run(run)
+
+
+def has_translatable_text(para):
+    # Allow paragraphs that have at least one text run
+    return any(run.text.strip() for run in para.runs if not is_non_text_run(run))
+
+
+def apply_translation(paragraphs, translated_lines):
+    """Replace the text runs of each paragraph with its translated line"""
+    for para, trans_line in zip(paragraphs, translated_lines):
+        if not para.runs or not trans_line:
+            continue
+
+        # Separate translatable runs from hyperlinks, images, etc.
+        translatable_runs = [run for run in para.runs if is_translatable_run(run)]
+
+        # If we have translatable runs, replace their text with translation
+        if translatable_runs:
+            # Clear all translatable runs first
+            for run in translatable_runs:
+                run.text = ""
+
+            # Put all translated text in the first translatable run;
+            # non-translatable runs keep their original position and content
+            translatable_runs[0].text = trans_line
+
+
+def plan_runs(doc, locations):
+    """Classify runs once for the paragraphs at locations (indexes into doc.paragraphs).
+
+    Returns flat arrays: translatable runs per paragraph, the index of each
+    such run within its paragraph and its original text. No paragraph or run
+    proxies are kept alive between writes.
+    """
+    paragraphs = doc.paragraphs
+    counts = array('I')
+    indexes = array('I')
+    originals = SegmentTable()
+    for location in locations:
+        count = 0
+        for index, run in enumerate(paragraphs[location].runs):
+            if is_translatable_run(run):
+                indexes.append(index)
+                originals.append(run.text)
+                count += 1
+        counts.append(count)
+    return counts, indexes, originals
+
+
+def apply_planned_translation(doc, locations, plan, translated_lines):
+    """Same result as apply_translation, but can be applied to one tree again and again"""
+    counts, indexes, originals = plan
+    paragraphs = doc.paragraphs
+    position = 0
+    for location, count, trans_line in zip(locations, counts, translated_lines):
+        if count:
+            runs = paragraphs[location].runs
+            planned = [runs[index] for index in indexes[position:position + count]]
+            if trans_line:
+                for run in planned:
+                    run.text = ""
+                planned[0].text = trans_line
+            else:
+                # An empty translation keeps the source text, as on a fresh tree
+                for run, text in zip(planned, originals[position:position + count]):
+                    run.text = text
+        position += count
@@ -0,0 +1,570 @@
+"""Translation engine running in a long-lived child process.
+
+The GUI keeps its interpreter (and GIL) to itself: parsing, run
+classification and decoding all happen in the child. The parent talks to it
+over two one-way pipes: commands go down, progress and results come back.
+Interactive sentences are translated on a thread of their own, next to a
+running file job instead of after it.
+Killing or recycling the child is the only reliable way to give model memory
+back to the OS, and also the way to cancel a decode that never returns.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from resource.backends import BACKENDS, SwappableBackend, create_backend, BackendError
+from resource.chunking import MAX_SEGMENT_TOKENS
+from resource.devices import ensure_device_env
+from resource.jobs import DocumentJob, FanOutJob, JobError
+from resource.manifest import ManifestBackend
+from resource.governor import ResourceGovernor, apply_process_limits
+from resource.interactive import SentenceCache
+from resource.memory import TranslationMemory, MemoryBackend
+from resource.preview import PreviewRelay
+from resource.tracing import Tracer
+
+# Jobs served by one child before it is replaced, freeing all model memory
+RECYCLE_AFTER_JOBS = 10
+
+
+def _serve_commands(commands, pending, interactive, cancel, reconfigure):
+    """Child-side reader: cancel and reconfigure requests are handled at once, sentences go to
+    the interactive thread, the rest is queued"""
+    while True:
+        try:
+            message = commands.recv()
+        except (EOFError, OSError):
+            pending.put(("shutdown",))
+            return
+        if message[0] == "cancel":
+            cancel.set()
+        elif message[0] == "reconfigure":
+            reconfigure(message[1])
+        elif message[0] == "sentences":
+            interactive.put(message)
+        else:
+            pending.put(message)
+            if message[0] == "shutdown":
+                return
+
+
+def _compute_options(name, compute):
+    """The part of the device, thread and quantization settings the backend understands"""
+    supported = getattr(BACKENDS.get(name), "compute_options", ())
+    return {key: value for key, value in compute.items() if key in supported}
+
+
+class BackendRebuilder:
+    """Applies new compute settings to loaded backends without stopping the jobs that use them.
+
+    Replacements are built and loaded one at a time on a background thread,
+    then swapped in; a running job picks them up at its next batch.
+    """
+
+    def __init__(self, backends):
+        self.backends = backends
+        # Held while a replacement is built, one at a time
+        self._lock = threading.Lock()
+        # Held briefly around every read and write of backend.pending, which the command thread
+        # sets while a rebuild thread checks and clears it
+        self._pending_lock = threading.Lock()
+
+    def reconfigure(self, compute):
+        for key, backend in list(self.backends.items()):
+            self.rebuild(key, backend, _compute_options(key[0], compute))
+
+    def rebuild(self, key, backend, compute):
+        with self._pending_lock:
+            if compute == backend.compute:
+                # Back to the current settings, a replacement still being built is dropped
+                backend.pending = None
+                return
+            if compute == backend.pending:
+                return
+            backend.pending = compute
+        threading.Thread(target=self._rebuild, args=(key, backend, compute), daemon=True).start()
+
+    def _is_pending(self, backend, compute):
+        with self._pending_lock:
+            return backend.pending == compute
+
+    def _rebuild(self, key, backend, compute):
+        name, from_code, to_code, options = key
+        with self._lock:
+            if not self._is_pending(backend, compute):
+                # A newer reconfiguration superseded this one
+                return
+            replacement = create_backend(name, from_code, to_code, **dict(options), **compute)
+            try:
+                # A backend nobody has used yet is replaced as is, it loads on its first batch
+                if backend.backend.loaded:
+                    replacement.warm_up()
+            except Exception as e:
+                print(f"Error applying {compute} to {name} {from_code}→{to_code}: {str(e)}")
+                replacement = None
+            with self._pending_lock:
+                # Cleared only if no newer setting arrived meanwhile, that one has its own thread
+                current = backend.pending == compute
+                if current:
+                    backend.pending = None
+                    if replacement is not None:
+                        backend.swap(replacement, compute)
+            if not current and replacement is not None:
+                replacement.close()
+
+
+def _backend_key(job, to_code):
+    return job["backend"], job["from_code"], to_code, tuple(sorted(job["backend_options"].items()))
+
+
+def _get_backend(job, to_code, backends, memories=None, rebuilder=None):
+    key = _backend_key(job, to_code)
+    compute = _compute_options(job["backend"], job.get("compute", {}))
+    if key not in backends:
+        # The interactive thread may be creating the same backend, only one of them is kept
+        backends.setdefault(key, SwappableBackend(
+            create_backend(job["backend"], job["from_code"], to_code, **job["backend_options"], **compute), compute
+        ))
+    elif rebuilder is not None:
+        # Settings changed while the engine was idle: the job starts and the new model joins between batches
+        rebuilder.rebuild(key, backends[key], compute)
+    settings = job.get("memory")
+    if not settings or memories is None:
+        return backends[key]
+
+    # The memory index stays loaded between jobs, only new lines of its file are read
+    path = settings["path"]
+    if path not in memories:
+        memories[path] = TranslationMemory(path)
+    memories[path].refresh()
+    return MemoryBackend(backends[key], memories[path], settings["threshold"], settings["action"])
+
+
+def _apply_limits(job, tracer=None):
+    """Apply job["governor"] caps to this process; returns the memory governor of the job, if any"""
+    limits = job.get("governor") or {}
+    apply_process_limits(limits.get("max_threads", 0), limits.get("niceness", 0))
+    if not limits.get("max_memory") or tracer is None:
+        return None
+    return ResourceGovernor(limits["max_memory"], tracer)
+
+
+def _fan_out_workers(job):
+    """Targets decoding at once, fewer when that would use more threads than the cap"""
+    workers = job.get("max_workers", 2)
+    max_threads = (job.get("governor") or {}).get("max_threads", 0)
+    if not max_threads:
+        return workers
+    per_target = (job.get("compute") or {}).get("intra_threads") or max_threads
+    return max(1, min(workers, max_threads // per_target))
+
+
+def _preload(spec, budget, backends, rebuilder):
+    """Load and warm up the model of a job-like spec, unless it would take the loaded models over budget"""
+    _apply_limits(spec)
+    backend = _get_backend(spec, spec["to_code"], backends, rebuilder=rebuilder)
+    if backend.backend.loaded:
+        return
+    tracer = Tracer(f"preload {spec['from_code']}_{spec['to_code']}", enabled=spec.get("trace", False))
+    try:
+        if budget:
+            with tracer.span("model size"):
+                loaded = sum(other.model_bytes() for other in backends.values() if other.backend.loaded)
+                size = backend.model_bytes()
+            if loaded + size > budget:
+                tracer.note(f"skipped: {size / 2**20:.0f} MB would exceed the budget, "
+                            f"{loaded / 2**20:.0f} of {budget / 2**20:.0f} MB already loaded")
+                return
+        backend.tracer = tracer
+        with tracer.span("warm up", backend=spec["backend"]):
+            backend.warm_up()
+    except Exception as e:
+        print(f"Error preloading {spec['from_code']}→{spec['to_code']}: {str(e)}")
+    finally:
+        tracer.finish()
+
+
+def _translate_sentences(spec, sentences, backends, caches, rebuilder):
+    """Interactive translation: sentences already translated for this model come from its cache"""
+    _apply_limits(spec)
+    backend = _get_backend(spec, spec["to_code"], backends, rebuilder=rebuilder)
+    cache = caches.setdefault(_backend_key(spec, spec["to_code"]), SentenceCache())
+    return cache.translate(backend, sentences)
+
+
+def _serve_sentences(interactive, send, backends, caches, rebuilder):
+    """Child-side interactive thread, answers "sentences" requests while the main loop runs a job"""
+    while True:
+        message = interactive.get()
+        try:
+            send(("translated", _translate_sentences(message[1], message[2], backends, caches, rebuilder), ""))
+        except Exception as e:
+            send(("translated", [], str(e)))
+
+
+def _with_manifest(job, backend, save_path):
+    """Unchanged segments of a revised document come from the manifest of the previous output"""
+    if not job.get("incremental"):
+        return backend
+    return ManifestBackend(backend, save_path)
+
+
+def _finish_backends(targets, written, tracer):
+    """Report and persist what the wrappers collected; manifests only for outputs that were written"""
+    for save_path, backend in targets:
+        while backend is not None:
+            if isinstance(backend, ManifestBackend):
+                tracer.note(backend.summary())
+                if save_path in written:
+                    backend.save()
+            elif isinstance(backend, MemoryBackend):
+                tracer.note(backend.summary())
+                backend.memory.flush()
+            backend = getattr(backend, "backend", None)
+
+
+def _model_backend(backend):
+    """The backend that runs the model, under the manifest, memory and swap wrappers"""
+    while getattr(backend, "backend", None) is not None:
+        backend = backend.backend
+    return backend
+
+
+def _decode_snapshot(job, backends):
+    """Decode counts of the job's models before it starts, None unless two-pass decoding is on"""
+    if not (job.get("backend_options") or {}).get("refine_beam"):
+        return None
+    # Targets with the same language pair share one model
+    models = {_model_backend(backend) for backend in backends}
+    return time.perf_counter(), {model: model.decode_counts() for model in models}
+
+
+def _two_pass_summary(snapshot, backends):
+    """Share of sentences the second pass decoded again, and sentences per second over the whole job"""
+    start, before = snapshot
+    sentences = refined = 0
+    for model in {_model_backend(backend) for backend in backends}:
+        # A model rebuilt during the job started counting from zero
+        sentences_before, refined_before = before.get(model, (0, 0))
+        decoded, redecoded = model.decode_counts()
+        sentences += decoded - sentences_before
+        refined += redecoded - refined_before
+    seconds = time.perf_counter() - start
+    return (f"two-pass decoding: {refined} of {sentences} sentences refined ({refined / max(sentences, 1):.1%}), "
+            f"{sentences / seconds:.1f} sentences/s")
+
+
+def _note_two_pass(snapshot, backends, tracer):
+    if snapshot:
+        tracer.report(_two_pass_summary(snapshot, backends))
+
+
+def _locked_sender(events):
+    """send(message) for the job and interactive threads; Connection.send is not thread-safe"""
+    lock = threading.Lock()
+
+    def send(message):
+        with lock:
+            events.send(message)
+
+    return send
+
+
+def _preview_relay(job, send):
+    """job["preview"] is the number of segments to preview, 0 or missing for none"""
+    if not job.get("preview"):
+        return None
+    return PreviewRelay(send, job["preview"])
+
+
+def _run_job(job, backends, cancel, send, memories=None, rebuilder=None):
+    if job.get("targets"):
+        return _run_fan_out_job(job, backends, cancel, send, memories, rebuilder)
+
+    tracer = Tracer(f"translate {os.path.basename(job['input_path'])}", enabled=job["trace"])
+    backend = _with_manifest(job, _get_backend(job, job["to_code"], backends, memories, rebuilder), job["save_path"])
+    preview = _preview_relay(job, lambda pairs: send(("preview", pairs)))
+    governor = _apply_limits(job, tracer)
+    decode_snapshot = _decode_snapshot(job, [backend])
+    completed = False
+    try:
+        with tracer.span("job", backend=job["backend"]):
+            completed = DocumentJob(
+                job["input_path"], job["save_path"], backend, tracer,
+                should_abort=cancel.is_set,
+                on_progress=lambda done, total: send(("progress", done, total)),
+                max_tokens=job.get("max_tokens", MAX_SEGMENT_TOKENS),
+                merge_cues=job.get("merge_cues", False),
+                fields=job.get("fields"),
+                on_segments=preview.add if preview else None,
+                governor=governor
+            ).run()
+    finally:
+        if preview:
+            preview.flush()
+        if governor:
+            tracer.report(governor.summary())
+        _note_two_pass(decode_snapshot, [backend], tracer)
+        _finish_backends([(job["save_path"], backend)], [job["save_path"]] if completed else [], tracer)
+        tracer.finish()
+
+    if completed:
+        return job["save_path"], True
+    return "", False
+
+
+def _run_fan_out_job(job, backends, cancel, send, memories=None, rebuilder=None):
+    """job["targets"] is a list of (to_code, save_path), all from job["from_code"]"""
+    targets = [
+        (save_path, _with_manifest(job, _get_backend(job, to_code, backends, memories, rebuilder), save_path))
+        for to_code, save_path in job["targets"]
+    ]
+
+    def on_progress(done, total):
+        send(("progress", done, total))
+
+    preview = _preview_relay(job, lambda pairs: send(("preview", pairs)))
+    tracer = Tracer(f"translate {os.path.basename(job['input_path'])}", enabled=job["trace"])
+    governor = _apply_limits(job, tracer)
+    decode_snapshot = _decode_snapshot(job, [backend for _, backend in targets])
+    results = None
+    try:
+        with tracer.span("job", backend=job["backend"], targets=len(targets)):
+            results = FanOutJob(
+                job["input_path"], targets, tracer, should_abort=cancel.is_set,
+                max_workers=_fan_out_workers(job), on_progress=on_progress,
+                max_tokens=job.get("max_tokens", MAX_SEGMENT_TOKENS),
+                merge_cues=job.get("merge_cues", False),
+                fields=job.get("fields"),
+                on_segments=preview.add if preview else None,
+                governor=governor
+            ).run()
+    finally:
+        if preview:
+            preview.flush()
+        if governor:
+            tracer.report(governor.summary())
+        _note_two_pass(decode_snapshot, [backend for _, backend in targets], tracer)
+        written = [path for path, error in (results or {}).items() if error is None]
+        _finish_backends(targets, written, tracer)
+        tracer.finish()
+
+    if results is None:
+        return "", False
+    failed = {path: error for path, error in results.items() if error}
+    if failed:
+        return "\n".join(f"{os.path.basename(path)}: {error}" for path, error in failed.items()), False
+    return ", ".join(save_path for _, save_path in job["targets"]), True
+
+
+def engine_main(commands, events):
+    """Entry point of the child process"""
+    # The GUI never probes the GPU on its startup path, the engine does it once here
+    ensure_device_env()
+    pending = queue.Queue()
+    interactive = queue.Queue()
+    cancel = threading.Event()
+    # Previews come from translate threads, progress from writers, sentences from the interactive thread
+    send = _locked_sender(events)
+    # Loaded backends, translation memories and sentence caches stay warm between jobs until the process is recycled
+    backends = {}
+    memories = {}
+    caches = {}
+    rebuilder = BackendRebuilder(backends)
+    threading.Thread(target=_serve_commands, args=(commands, pending, interactive, cancel, rebuilder.reconfigure),
+                     daemon=True).start()
+    threading.Thread(target=_serve_sentences, args=(interactive, send, backends, caches, rebuilder),
+                     daemon=True).start()
+    preloads = deque()
+    while True:
+        # Preloads only run while no job is waiting, so a job waits for one model load at most
+        if preloads and pending.empty():
+            _preload(*preloads.popleft(), backends, rebuilder)
+            continue
+        message = pending.get()
+        if message[0] == "shutdown":
+            break
+        if message[0] == "preload":
+            preloads.extend((spec, message[2]) for spec in message[1])
+            continue
+
+        cancel.clear()
+        try:
+            result, success = _run_job(message[1], backends, cancel, send, memories, rebuilder)
+        except (JobError, BackendError) as e:
+            result, success = str(e), False
+        except Exception as e:
+            result, success = f"Error during translation or saving: {str(e)}", False
+        send(("finished", result, success))
+
+    for backend in backends.values():
+        backend.close()
+
+
+class EngineProcess:
+    """Parent-side handle of the engine child process.
+
+    run_job() blocks until the job ends, so call it from a worker thread.
+    translate_sentences() may run at the same time on another one; a reader
+    thread sorts the events of the pipe into job events and interactive results.
+    cancel() and kill() may be called from any thread.
+    """
+
+    def __init__(self, recycle_after=RECYCLE_AFTER_JOBS):
+        self.recycle_after = recycle_after
+        self.jobs_done = 0
+        self.process = None
+        self._commands = None
+        self._job_events = None
+        self._translated = None
+        self._send_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._job_lock = threading.Lock()
+        self._interactive_lock = threading.Lock()
+
+    def ensure_started(self):
+        with self._start_lock:
+            if self.process is not None:
+                if self.process.is_alive():
+                    return
+                self._reset()
+            self._start()
+
+    def _start(self):
+        context = multiprocessing.get_context("spawn")
+        command_reader, command_writer = context.Pipe(duplex=False)
+        event_reader, event_writer = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=engine_main, args=(command_reader, event_writer), name="celosia-engine", daemon=True
+        )
+        self.process.start()
+        # Only the child keeps these ends, so a dead child reads as EOF here
+        command_reader.close()
+        event_writer.close()
+        self._commands = command_writer
+        self._job_events = queue.Queue()
+        self._translated = queue.Queue()
+        threading.Thread(target=self._read_events, args=(event_reader, self._job_events, self._translated),
+                         daemon=True).start()
+        self.jobs_done = 0
+
+    @staticmethod
+    def _read_events(events, job_events, translated):
+        """Parent-side reader of one child's events; None tells both sides the child is gone"""
+        while True:
+            try:
+                message = events.recv()
+            except (EOFError, OSError):
+                events.close()
+                job_events.put(None)
+                translated.put(None)
+                return
+            (translated if message[0] == "translated" else job_events).put(message)
+
+    def _send(self, message):
+        with self._send_lock:
+            if self._commands is not None:
+                self._commands.send(message)
+
+    def run_job(self, job, on_progress=None, on_preview=None):
+        """Run a job dict in the child, returns (result, success)"""
+        with self._job_lock:
+            self.ensure_started()
+            events = self._job_events
+            self._send(("job", job))
+            while True:
+                message = events.get()
+                if message is None:
+                    self._reset()
+                    return "Translation engine stopped", False
+
+                if message[0] == "progress":
+                    if on_progress:
+                        on_progress(message[1], message[2])
+                elif message[0] == "preview":
+                    if on_preview:
+                        on_preview(message[1])
+                elif message[0] == "finished":
+                    self.jobs_done += 1
+                    if self.jobs_done >= self.recycle_after:
+                        # Not in the middle of an interactive request
+                        with self._interactive_lock:
+                            self.shutdown()
+                    return message[1], message[2]
+
+    def translate_sentences(self, spec, sentences):
+        """Translate a few sentences with the model of a job-like spec, returns (translations, error).
+
+        Blocks until the sentences are translated, a running job does not hold them up.
+        """
+        with self._interactive_lock:
+            self.ensure_started()
+            translated = self._translated
+            self._send(("sentences", spec, sentences))
+            message = translated.get()
+            if message is None:
+                return [], "Translation engine stopped"
+            return message[1], message[2]
+
+    def preload(self, specs, budget=None):
+        """Load and warm up the models of job-like specs in the background, starting the engine if needed.
+
+        With a budget in bytes, models that would take everything loaded over it are skipped.
+        """
+        self.ensure_started()
+        try:
+            self._send(("preload", specs, budget))
+        except (OSError, ValueError):
+            pass
+
+    def reconfigure(self, compute):
+        """Rebuild loaded models with new device, thread and quantization settings.
+
+        Running jobs keep going and switch over between batches. A stopped
+        engine has nothing to rebuild, its next job brings the settings along.
+        """
+        if self.process is None:
+            return
+        try:
+            self._send(("reconfigure", compute))
+        except (OSError, ValueError):
+            pass
+
+    def cancel(self):
+        """Ask the running job to stop after its current batch"""
+        try:
+            self._send(("cancel",))
+        except (OSError, ValueError):
+            pass
+
+    def kill(self):
+        """Terminate the child at once, e.g. when a decode does not return"""
+        process = self.process
+        if process is not None:
+            process.terminate()
+            process.join()
+
+    def shutdown(self):
+        """Stop the child gracefully, releasing every loaded model"""
+        if self.process is None:
+            return
+        try:
+            self._send(("shutdown",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self._reset()
+
+    def _reset(self):
+        # The event pipe belongs to the reader thread, it closes it on EOF
+        with self._send_lock:
+            if self._commands is not None:
+                self._commands.close()
+            self._commands = None
+        self.process = None
@@ -0,0 +1,137 @@
+"""Caps on the CPU, threads and memory the engine process takes, independent of Qt.
+
+Threads and priority are applied to the engine process once per job. The
+memory cap is a high-watermark on the process' resident memory: above it a
+job halves its batch size and stops reading new input until the batches
+already in flight are written, instead of growing until the OS kills it.
+Below RESUME_SHARE of the watermark the batch size grows back. Every
+decision, and the summary at the end of the job, goes through Tracer.report.
+"""
+import os
+import sys
+import time
+
+from resource.tracing import NULL_TRACER
+
+MIN_BATCH_SEGMENTS = 4
+# Share of the watermark the memory must fall under before batches grow again
+RESUME_SHARE = 0.8
+PAUSE_POLL = 0.01
+
+# Windows priority classes for niceness 0, 1-9 and 10-19
+_PRIORITY_CLASSES = ((10, 0x00000040), (1, 0x00004000), (0, 0x00000020))
+
+
+def process_memory():
+    """Resident memory of this process in bytes, 0 when the platform does not tell"""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class Counters(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                    (name, ctypes.c_size_t) for name in (
+                        "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                        "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")
+                ]
+
+            counters = Counters()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return 0
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def apply_process_limits(max_threads=0, niceness=0):
+    """Thread cap and priority for the calling process; models created afterwards use the thread cap"""
+    if max_threads:
+        # Read by CTranslate2 for models Argos creates, and by PyTorch for stanza
+        for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ[name] = str(max_threads)
+        if "torch" in sys.modules:
+            sys.modules["torch"].set_num_threads(max_threads)
+    if not niceness:
+        return
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            priority = next(value for floor, value in _PRIORITY_CLASSES if niceness >= floor)
+            ctypes.windll.kernel32.SetPriorityClass(ctypes.windll.kernel32.GetCurrentProcess(), priority)
+        else:
+            # Without privileges niceness only goes up, so it is raised to the setting and never lowered
+            increment = niceness - os.nice(0)
+            if increment > 0:
+                os.nice(increment)
+    except OSError as e:
+        print(f"Error changing process priority: {str(e)}")
+
+
+class ResourceGovernor:
+    """Memory backpressure for one job: call admit() before reading each new batch"""
+
+    def __init__(self, high_watermark, tracer=NULL_TRACER, min_batch=MIN_BATCH_SEGMENTS):
+        self.high_watermark = high_watermark
+        self.tracer = tracer
+        self.min_batch = min_batch
+        self.initial_batch = None
+        self.shrinks = 0
+        self.pauses = 0
+        self.paused = 0.0
+        # Only the first pause while memory stays over the watermark is logged
+        self.pause_logged = False
+
+    def log(self, text):
+        self.tracer.report(f"governor: {text}")
+
+    def admit(self, batch_segments, in_flight=lambda: 0, stopping=lambda: False):
+        """Return the batch size for the next batch, after waiting while memory is over the watermark.
+
+        in_flight() counts batches read but not yet written; waiting only makes
+        sense while there are some, their memory is what gets released.
+        """
+        if self.initial_batch is None:
+            self.initial_batch = batch_segments
+        usage = process_memory()
+        if not usage:
+            return batch_segments
+        self.tracer.counter("memory", MB=usage / 2**20)
+
+        if usage > self.high_watermark:
+            smaller = max(self.min_batch, batch_segments // 2)
+            if smaller < batch_segments:
+                self.shrinks += 1
+                self.log(f"{usage / 2**20:.0f} MB is over the {self.high_watermark / 2**20:.0f} MB watermark, "
+                         f"batches shrink from {batch_segments} to {smaller} segments")
+                batch_segments = smaller
+
+            start = time.perf_counter()
+            waiting = False
+            while usage > self.high_watermark and in_flight() and not stopping():
+                waiting = True
+                time.sleep(PAUSE_POLL)
+                usage = process_memory()
+            if waiting:
+                waited = time.perf_counter() - start
+                self.pauses += 1
+                self.paused += waited
+                if not self.pause_logged:
+                    self.log(f"intake paused {waited * 1000:.0f} ms for batches in flight, now {usage / 2**20:.0f} MB")
+                    self.pause_logged = True
+            return batch_segments
+
+        self.pause_logged = False
+        if usage < self.high_watermark * RESUME_SHARE and batch_segments < self.initial_batch:
+            larger = min(self.initial_batch, batch_segments * 2)
+            self.log(f"{usage / 2**20:.0f} MB, batches grow from {batch_segments} to {larger} segments")
+            batch_segments = larger
+        return batch_segments
+
+    def summary(self):
+        return (f"governor: {self.shrinks} batch shrinks, intake paused {self.pauses} times "
+                f"for {self.paused * 1000:.0f} ms in total")
@@ -0,0 +1,267 @@
+"""Hot-folder watch mode: files dropped into a folder are translated into an output folder.
+
+Changes come from QFileSystemWatcher, which sits on the platform's change
+notifications (inotify, ReadDirectoryChangesW, kqueue); nothing polls the
+folder while it is quiet. Every event only restarts a debounce timer, so a
+burst of copies is handled in one scan once the folder has been quiet for
+DEBOUNCE_MS. New files are watched for writes as well and queued only after
+their size and modification time were the same in two scans, so a file that
+is still being copied is never picked up half-written.
+
+Finished files are recorded with the size and modification time they had in
+a JSON state file, together with every file written for them. A restart skips
+them; a file that changed since is translated again. The recorded outputs are
+never picked up themselves, even when they land in the watched folder.
+
+    python main.py --watch <folder> [--output <folder>] [--pair en_de] [--backend argos]
+"""
+import argparse
+import json
+import os
+import queue
+import signal
+import sys
+
+from PyQt6.QtCore import QCoreApplication, QFileSystemWatcher, QObject, QThread, QTimer, pyqtSignal
+
+from resource.jobs import SUPPORTED_EXTENSIONS
+from resource.output import AtomicWriter, default_output_path
+
+WATCH_STATE_PATH = os.path.join("config", "watch_state.json")
+DEBOUNCE_MS = 1000
+# Output folder used when none is set, inside the watched folder
+DEFAULT_OUTPUT = "translated"
+# Name prefixes of office lock files and of AtomicWriter's temporary files
+IGNORED_PREFIXES = ("~$", ".")
+
+
+def default_watch_output(folder):
+    return os.path.join(folder, DEFAULT_OUTPUT)
+
+
+def file_signature(path):
+    """(size, mtime) of path, None if it is gone or cannot be read yet"""
+    try:
+        stat = os.stat(path)
+        # Windows refuses to open a file another process is still writing
+        with open(path, 'rb'):
+            pass
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime]
+
+
+class WatchState:
+    """Finished files of watched folders: {source path: {"signature": [size, mtime], "outputs": [paths]}}"""
+
+    def __init__(self, path=WATCH_STATE_PATH):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f)
+        except (OSError, ValueError):
+            self.files = {}
+        for entry in self.files.values():
+            # State files written before fan-out kept a single output
+            if "outputs" not in entry:
+                entry["outputs"] = [entry.pop("output")] if entry.get("output") else []
+        self.outputs = {os.path.abspath(output) for entry in self.files.values() for output in entry["outputs"]}
+
+    def is_done(self, path, signature):
+        entry = self.files.get(path)
+        return entry is not None and entry["signature"] == signature
+
+    def mark_done(self, path, signature, outputs):
+        self.files[path] = {"signature": signature, "outputs": list(outputs)}
+        self.outputs.update(os.path.abspath(output) for output in outputs)
+        try:
+            with AtomicWriter(self.path) as writer:
+                with open(writer.temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.files, f, ensure_ascii=False, indent=1)
+        except OSError as e:
+            print(f"Error saving watch state: {str(e)}")
+
+
+class WatchWorker(QThread):
+    """Translates queued files one at a time, in the order they settled"""
+    done = pyqtSignal(str, list, str, bool, list)
+
+    def __init__(self, translate, output_folder, parent=None):
+        super().__init__(parent)
+        self.translate = translate
+        self.output_folder = output_folder
+        self.files = queue.Queue()
+
+    def run(self):
+        while True:
+            item = self.files.get()
+            if item is None:
+                return
+            path, signature = item
+            try:
+                result, success, outputs = self.translate(path, self.output_folder)
+            except Exception as e:
+                result, success, outputs = f"Error during translation or saving: {str(e)}", False, []
+            self.done.emit(path, signature, result, success, outputs)
+
+    def stop(self):
+        self.files.put(None)
+        self.wait()
+
+
+class HotFolder(QObject):
+    """Watches folder and translates settled files with
+    translate(input_path, output_folder) -> (result, success, output paths).
+
+    translate runs on a worker thread; queued and finished are emitted on the
+    thread the HotFolder lives on.
+    """
+    queued = pyqtSignal(str)
+    finished = pyqtSignal(str, str, bool)
+
+    def __init__(self, folder, output_folder, translate, state_path=WATCH_STATE_PATH, debounce_ms=DEBOUNCE_MS,
+                 parent=None):
+        super().__init__(parent)
+        self.folder = os.path.abspath(folder)
+        self.output_folder = os.path.abspath(output_folder or default_watch_output(folder))
+        self.state = WatchState(state_path)
+        # Files not finished yet: signature at the last scan, and what was queued or failed this session
+        self.candidates = {}
+        self.handled = {}
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_scan)
+        self.watcher.fileChanged.connect(self.schedule_scan)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self.scan)
+        self.worker = WatchWorker(translate, self.output_folder, self)
+        self.worker.done.connect(self.on_done)
+
+    def start(self):
+        os.makedirs(self.output_folder, exist_ok=True)
+        if not self.watcher.addPath(self.folder):
+            print(f"Error watching {self.folder}")
+            return False
+        self.worker.start()
+        # Files dropped while the app was closed
+        self.scan()
+        return True
+
+    def stop(self):
+        self.timer.stop()
+        paths = self.watcher.directories() + self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+        if self.worker.isRunning():
+            self.worker.stop()
+
+    def schedule_scan(self, path=None):
+        self.timer.start()
+
+    def wanted(self, path):
+        name = os.path.basename(path)
+        return (os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS
+                and not name.startswith(IGNORED_PREFIXES)
+                and path not in self.state.outputs
+                and os.path.isfile(path))
+
+    def scan(self):
+        try:
+            names = os.listdir(self.folder)
+        except OSError as e:
+            print(f"Error reading watched folder: {str(e)}")
+            return
+
+        paths = {os.path.join(self.folder, name) for name in names}
+        for path in set(self.candidates) - paths:
+            del self.candidates[path]
+        unsettled = False
+        for path in sorted(paths):
+            if not self.wanted(path):
+                continue
+            signature = file_signature(path)
+            if signature is None or self.state.is_done(path, signature) or self.handled.get(path) == signature:
+                self.candidates.pop(path, None)
+                continue
+            if self.candidates.get(path) != signature:
+                # New or still growing: look again after the next quiet period
+                if path not in self.candidates:
+                    self.watcher.addPath(path)
+                self.candidates[path] = signature
+                unsettled = True
+                continue
+
+            del self.candidates[path]
+            self.watcher.removePath(path)
+            self.handled[path] = signature
+            self.worker.files.put((path, signature))
+            print(f"Watch: queued {os.path.basename(path)}")
+            self.queued.emit(path)
+        if unsettled:
+            self.timer.start()
+
+    def on_done(self, path, signature, result, success, outputs):
+        if success:
+            self.state.mark_done(path, signature, outputs)
+            print(f"Watch: translated {os.path.basename(path)} -> {result}")
+        else:
+            print(f"Watch: {os.path.basename(path)} failed: {result}")
+        self.finished.emit(path, result, success)
+
+
+def main(argv=None):
+    """Headless watch mode: translate files dropped into a folder until interrupted"""
+    parser = argparse.ArgumentParser(description="Translate files dropped into a folder")
+    parser.add_argument("--watch", required=True, metavar="FOLDER")
+    parser.add_argument("--output", metavar="FOLDER", help=f"defaults to <FOLDER>/{DEFAULT_OUTPUT}")
+    parser.add_argument("--pair", help="language pair such as en_de, defaults to the package selected in the app")
+    parser.add_argument("--backend", choices=["argos", "ctranslate2", "fake"],
+                        help="defaults to the engine selected in the app")
+    args = parser.parse_args(argv)
+
+    # Importing the config points Argos Translate at the application's models directory
+    from resource.config import cfg
+    from resource.devices import ensure_device_env
+    from resource.engine import EngineProcess
+    from resource.jobspec import build_job, output_paths, selected_pair
+
+    pair = args.pair or selected_pair(cfg)
+    if pair == 'None' or '_' not in pair:
+        parser.error("no translation package selected, pass --pair")
+    to_code = pair.split('_')[1]
+    backend = args.backend or cfg.get(cfg.backend)
+    if backend != "fake":
+        ensure_device_env()
+
+    app = QCoreApplication(sys.argv[:1])
+    engine = EngineProcess()
+
+    def translate(path, output_folder):
+        job = build_job(cfg, path, default_output_path(path, to_code, output_folder), pair, backend)
+        # Nobody watches the preview in headless mode
+        job["preview"] = 0
+        result, success = engine.run_job(job)
+        return result, success, output_paths(job)
+
+    hot_folder = HotFolder(args.watch, args.output, translate)
+    if not hot_folder.start():
+        return 1
+    print(f"Watching {hot_folder.folder} for {pair}, translations go to {hot_folder.output_folder}")
+
+    # Qt's event loop does not run Python signal handlers, the timer hands control back for Ctrl+C
+    signal.signal(signal.SIGINT, lambda *args: app.quit())
+    interrupt_timer = QTimer()
+    interrupt_timer.timeout.connect(lambda: None)
+    interrupt_timer.start(500)
+    try:
+        app.exec()
+    finally:
+        hot_folder.stop()
+        engine.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
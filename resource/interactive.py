@@ -0,0 +1,60 @@
+"""Translate-as-you-type support, independent of Qt.
+
+The text is cut into sentences and the separators between them. Every pass
+sends all sentences to the engine, which answers the ones it has seen from a
+per-sentence cache kept next to the warm model, so typing in one sentence
+only re-translates that sentence.
+"""
+import re
+from collections import OrderedDict
+
+# A sentence ends at ., !, ? (and their CJK forms) followed by whitespace, or at a line break
+SEPARATOR_RE = re.compile(r'((?<=[.!?。！？])\s+|\s*\n\s*)')
+
+# Sentences kept per language pair and engine settings
+SENTENCE_CACHE_SIZE = 5000
+
+
+def split_sentences(text):
+    """[sentence, separator, sentence, ...], joined back together it is text again"""
+    return SEPARATOR_RE.split(text)
+
+
+def translate_pieces(pieces, translations):
+    """Put translations of the sentences (the even pieces) between the original separators"""
+    translated = list(pieces)
+    translated[::2] = translations
+    return "".join(translated)
+
+
+class SentenceCache:
+    """Least recently used sentence -> translation map"""
+
+    def __init__(self, size=SENTENCE_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def translate(self, backend, sentences):
+        """Translations of sentences, only those not in the cache reach the backend"""
+        results = list(sentences)
+        missing = []
+        for index, sentence in enumerate(sentences):
+            if not sentence.strip():
+                continue
+            if sentence in self.entries:
+                self.entries.move_to_end(sentence)
+                results[index] = self.entries[sentence]
+                self.hits += 1
+            else:
+                missing.append(index)
+
+        if missing:
+            self.misses += len(missing)
+            for index, translation in zip(missing, backend.translate_batch([sentences[i] for i in missing])):
+                results[index] = translation
+                self.entries[sentences[index]] = translation
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return results
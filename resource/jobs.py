@@ -0,0 +1,481 @@
+import os
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from resource.documents import (load_docx, has_translatable_text, apply_translation, plan_runs,
+                                apply_planned_translation)
+from resource.chunking import chunk_segments, join_chunks, MAX_SEGMENT_TOKENS
+from resource.output import AtomicWriter
+from resource.pipeline import Pipeline, QUEUE_DEPTH
+from resource.segments import SegmentTable, BLOCK_SEGMENTS
+from resource.subtitles import SUBTITLE_EXTENSIONS, read_blocks, group_cues, group_text, format_group
+from resource.tabular import DATA_EXTENSIONS, open_table, row_batches, apply_row_translations
+from resource.markup import MARKUP_EXTENSIONS, TextPiece, markup_blocks, block_texts, format_block as format_markup
+from resource.tracing import NULL_TRACER
+
+SUPPORTED_EXTENSIONS = ('.txt', '.docx') + SUBTITLE_EXTENSIONS + DATA_EXTENSIONS + MARKUP_EXTENSIONS
+
+# Segments per translate_batch call, each batch is written out before the next one
+BATCH_SEGMENTS = 64
+
+
+class JobError(Exception):
+    """A translation job failed, the message is shown to the user"""
+
+
+@contextmanager
+def _read_errors(kind):
+    """Turn a failure reading the input into a JobError; inside the pipeline it fails the job and
+    the partial output is discarded instead of renamed into place"""
+    try:
+        yield
+    except JobError:
+        raise
+    except Exception as e:
+        raise JobError(f"Error reading {kind}: {str(e)}") from e
+
+
+def write_markup(blocks, translated, escape, f):
+    """Write blocks in order, each taking as many translations as block_texts gave it"""
+    position = 0
+    for block in blocks:
+        count = len(block_texts(block))
+        f.write(format_markup(block, translated[position:position + count], escape))
+        position += count
+
+
+class DocumentJob:
+    """Parse -> translate -> write for one file, independent of Qt.
+
+    The three stages overlap: batches are parsed, translated and written by
+    a bounded Pipeline, so memory stays capped at a few batches in flight.
+    Used by the engine process behind the GUI and by the HTTP service.
+    """
+
+    def __init__(self, input_path, save_path, backend, tracer=NULL_TRACER, should_abort=None,
+                 batch_segments=BATCH_SEGMENTS, on_progress=None, queue_depth=QUEUE_DEPTH,
+                 max_tokens=MAX_SEGMENT_TOKENS, merge_cues=False, fields=None, on_segments=None, governor=None):
+        self.input_path = input_path
+        self.save_path = save_path
+        self.backend = backend
+        self.tracer = tracer
+        self.should_abort = should_abort or (lambda: False)
+        self.batch_segments = batch_segments
+        self.max_tokens = max_tokens
+        self.merge_cues = merge_cues
+        self.fields = fields
+        self.on_progress = on_progress or (lambda done, total: None)
+        # Called with (sources, translations) for every batch, in document order
+        self.on_segments = on_segments
+        self.queue_depth = queue_depth
+        # Memory backpressure: shrinks batch_segments and holds back parsing
+        self.governor = governor
+        self.extension = os.path.splitext(input_path)[1].lower()
+        self.pipeline = None
+
+    def run(self):
+        """Translate the file, returns False if the job was aborted"""
+        if not os.path.exists(self.input_path):
+            raise JobError("Input file not found")
+        if self.extension not in SUPPORTED_EXTENSIONS:
+            raise JobError("Unsupported file format")
+
+        self.backend.tracer = self.tracer
+        self.pipeline = Pipeline(depth=self.queue_depth, should_abort=self.should_abort, tracer=self.tracer,
+                                 admit=self._admit if self.governor else None)
+        self._has_content = False
+        self._written = False
+
+        # Translate batch by batch straight into a temp file next to the destination
+        with AtomicWriter(self.save_path) as output:
+            if self.extension == '.txt':
+                with open(output.temp_path, 'w', encoding='utf-8') as f:
+                    completed = self.pipeline.run(self._iter_txt(), self._translate, lambda batch: self._write_txt(batch, f))
+            elif self.extension in DATA_EXTENSIONS:
+                with open(output.temp_path, 'w', encoding='utf-8', newline='') as f:
+                    completed = self.pipeline.run(self._iter_data(), self._translate,
+                                                  lambda batch: self._write_data(batch, f))
+            elif self.extension in SUBTITLE_EXTENSIONS:
+                with open(output.temp_path, 'w', encoding='utf-8') as f:
+                    completed = self.pipeline.run(self._iter_subtitles(), self._translate,
+                                                  lambda batch: self._write_subtitles(batch, f))
+            elif self.extension in MARKUP_EXTENSIONS:
+                with open(output.temp_path, 'w', encoding='utf-8') as f:
+                    completed = self.pipeline.run(self._iter_markup(), self._translate,
+                                                  lambda batch: self._write_markup(batch, f))
+            else:
+                completed = self.pipeline.run(self._iter_docx(), self._translate, self._write_docx)
+                if completed and self._has_content:
+                    with self.tracer.span("save"):
+                        self.original_doc.save(output.temp_path)
+            self.tracer.report(self.pipeline.summary())
+
+            if not completed:
+                output.discard()
+                return False
+            if not self._has_content:
+                output.discard()
+                raise JobError("No content found to translate")
+        return True
+
+    def load_segments(self):
+        """Validate and parse the whole input into a SegmentTable, raising JobError when there is nothing to do"""
+        if not os.path.exists(self.input_path):
+            raise JobError("Input file not found")
+        if self.extension not in SUPPORTED_EXTENSIONS:
+            raise JobError("Unsupported file format")
+
+        segments = self.parse()
+        if not any(segments):
+            raise JobError("No content found to translate")
+        return segments
+
+    def parse(self):
+        if self.extension == '.txt':
+            return self._parse_txt()
+        if self.extension in SUBTITLE_EXTENSIONS:
+            return self._parse_subtitles()
+        if self.extension in MARKUP_EXTENSIONS:
+            return self._parse_markup()
+        if self.extension in DATA_EXTENSIONS:
+            raise JobError("Data files are translated as a stream, one target language at a time")
+        return self._parse_docx()
+
+    def _admit(self, in_flight):
+        self.batch_segments = self.governor.admit(self.batch_segments, in_flight, self.should_abort)
+
+    def _translate(self, batch):
+        done, total, payload, texts = batch
+        if not self._has_content:
+            if not any(texts):
+                # Nothing to translate yet, so no reason to load the model
+                return done, total, payload, texts
+            self._has_content = True
+            with self.tracer.span("backend load"):
+                self.backend.load()
+        with self.tracer.span("chunk"):
+            chunks, layout = chunk_segments(texts, self.max_tokens)
+        translated = join_chunks(self.backend.translate_batch(chunks), layout)
+        if self.on_segments:
+            self.on_segments(texts, translated)
+        return done, total, payload, translated
+
+    def _iter_txt(self):
+        """Batches of lines, read as they are needed; progress is counted in bytes"""
+        with _read_errors(".txt file"):
+            total = os.path.getsize(self.input_path)
+            done = 0
+            batch = []
+            line = '\n'
+            with open(self.input_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    done += len(line.encode('utf-8'))
+                    batch.append(line[:-1] if line.endswith('\n') else line)
+                    if len(batch) >= self.batch_segments:
+                        yield min(done, total), total, None, batch
+                        batch = []
+            # Same segments as read().split('\n'): a trailing newline ends in an empty line
+            if line.endswith('\n'):
+                batch.append('')
+            if batch:
+                yield total, total, None, batch
+
+    def _iter_docx(self):
+        """Batches of translatable paragraphs, classified as they are needed"""
+        with _read_errors(".docx file"):
+            with self.tracer.span("load docx"):
+                self.original_doc = load_docx(self.input_path)
+            paragraphs = self.original_doc.paragraphs
+            batch = []
+            for index, para in enumerate(paragraphs):
+                if has_translatable_text(para):
+                    batch.append(para)
+                if len(batch) >= self.batch_segments:
+                    yield index + 1, len(paragraphs), batch, [para.text for para in batch]
+                    batch = []
+            if batch:
+                yield len(paragraphs), len(paragraphs), batch, [para.text for para in batch]
+
+    def _iter_subtitles(self):
+        """Batches of cue groups, read as they are needed; progress is counted in bytes"""
+        with _read_errors("subtitle file"):
+            total = os.path.getsize(self.input_path)
+            done = 0
+            batch = []
+            for group in group_cues(read_blocks(self.input_path), self.merge_cues):
+                done += sum(block.size for block in group)
+                batch.append(group)
+                if len(batch) >= self.batch_segments:
+                    yield min(done, total), total, batch, [group_text(g) for g in batch]
+                    batch = []
+            if batch:
+                yield total, total, batch, [group_text(g) for g in batch]
+
+    def _iter_markup(self):
+        """Batches of HTML/Markdown blocks with about batch_segments segments; progress is counted in bytes"""
+        with _read_errors("markup file"):
+            total = os.path.getsize(self.input_path)
+            done = 0
+            blocks, self._escape = markup_blocks(self.input_path)
+            batch = []
+            texts = []
+            for block in blocks:
+                done += sum(len((piece.raw if isinstance(piece, TextPiece) else piece).encode('utf-8'))
+                            for piece in block)
+                batch.append(block)
+                texts.extend(block_texts(block))
+                if len(texts) >= self.batch_segments:
+                    yield min(done, total), total, batch, texts
+                    batch = []
+                    texts = []
+            if batch:
+                yield total, total, batch, texts
+
+    def _iter_data(self):
+        """Batches of CSV/JSONL rows with their distinct cell values; progress is counted in bytes"""
+        with _read_errors("data file"):
+            total = os.path.getsize(self.input_path)
+            self._table = open_table(self.input_path, self.fields)
+            self._write_row = None
+            for done, rows, texts in row_batches(self._table, self.batch_segments):
+                yield min(done, total), total, (rows, texts), texts
+
+    def _parse_txt(self):
+        segments = SegmentTable()
+        with _read_errors(".txt file"):
+            with self.tracer.span("parse"):
+                line = '\n'
+                with open(self.input_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        segments.append(line[:-1] if line.endswith('\n') else line)
+                # Same segments as read().split('\n'): a trailing newline ends in an empty line
+                if line.endswith('\n'):
+                    segments.append('')
+        return segments
+
+    def _parse_docx(self):
+        """Translatable paragraphs, located by their index in doc.paragraphs"""
+        segments = SegmentTable()
+        with _read_errors(".docx file"):
+            with self.tracer.span("parse"):
+                self.original_doc = load_docx(self.input_path)
+            with self.tracer.span("classify runs"):
+                for index, para in enumerate(self.original_doc.paragraphs):
+                    if has_translatable_text(para):
+                        segments.append(para.text, index)
+        return segments
+
+    def _parse_subtitles(self):
+        with _read_errors("subtitle file"):
+            with self.tracer.span("parse"):
+                self.subtitle_groups = list(group_cues(read_blocks(self.input_path), self.merge_cues))
+            return SegmentTable(group_text(group) for group in self.subtitle_groups)
+
+    def _parse_markup(self):
+        with _read_errors("markup file"):
+            with self.tracer.span("parse"):
+                blocks, self.markup_escape = markup_blocks(self.input_path)
+                self.markup_blocks = list(blocks)
+            return SegmentTable(text for block in self.markup_blocks for text in block_texts(block))
+
+    def _write_txt(self, batch, f):
+        done, total, _, translated = batch
+        if self._written:
+            f.write('\n')
+        f.write('\n'.join(translated))
+        self._written = True
+        self.on_progress(done, total)
+
+    def _write_data(self, batch, f):
+        done, total, (rows, texts), translated = batch
+        if self._write_row is None:
+            # The CSV dialect is known once the reader has started
+            self._write_row = self._table.writer(f)
+        apply_row_translations(rows, texts, translated, self._write_row)
+        self.on_progress(done, total)
+
+    def _write_subtitles(self, batch, f):
+        done, total, groups, translated = batch
+        for group, translation in zip(groups, translated):
+            f.write(format_group(group, translation))
+        self.on_progress(done, total)
+
+    def _write_markup(self, batch, f):
+        done, total, blocks, translated = batch
+        write_markup(blocks, translated, self._escape, f)
+        self.on_progress(done, total)
+
+    def _write_docx(self, batch):
+        done, total, paragraphs, translated = batch
+        apply_translation(paragraphs, translated)
+        self.on_progress(done, total)
+
+
+class FanOutJob:
+    """One source file into several target languages in a single job.
+
+    Parsing, run classification and de-duplication of the source happen once
+    and are shared by every target; each target only pays for its own
+    decoding. Up to max_workers targets decode at the same time, and every
+    finished target is written out right away.
+    """
+
+    def __init__(self, input_path, targets, tracer=NULL_TRACER, should_abort=None, max_workers=2,
+                 batch_segments=BATCH_SEGMENTS, on_progress=None, max_tokens=MAX_SEGMENT_TOKENS,
+                 merge_cues=False, fields=None, on_segments=None, governor=None):
+        # targets: list of (save_path, backend)
+        self.input_path = input_path
+        self.targets = targets
+        self.tracer = tracer
+        self.should_abort = should_abort or (lambda: False)
+        self.max_workers = max_workers
+        self.batch_segments = batch_segments
+        self.max_tokens = max_tokens
+        self.merge_cues = merge_cues
+        self.fields = fields
+        self.on_progress = on_progress or (lambda done, total: None)
+        # Only the first target is previewed
+        self.on_segments = on_segments
+        # The whole document is in memory already, so under memory pressure batches only shrink
+        self.governor = governor
+        self._progress_lock = threading.Lock()
+        # .docx targets share one tree, so patching and saving is one target at a time
+        self._write_lock = threading.Lock()
+        self._done = 0
+
+    def run(self):
+        """Translate into every target, returns {save_path: error message or None}; None if aborted"""
+        if os.path.splitext(self.input_path)[1].lower() in DATA_EXTENSIONS:
+            return self._run_streams()
+
+        source = DocumentJob(self.input_path, None, None, self.tracer, merge_cues=self.merge_cues)
+        segments = source.load_segments()
+
+        with self.tracer.span("deduplicate"):
+            firsts, positions = segments.unique()
+        with self.tracer.span("chunk"):
+            distinct = segments if len(firsts) == len(segments) else (segments[index] for index in firsts)
+            chunks, layout = chunk_segments(distinct, self.max_tokens, into=SegmentTable())
+        split = any(layout)
+        locations = segments.locations
+        plan = None
+        if source.extension == '.docx':
+            with self.tracer.span("classify runs"):
+                plan = plan_runs(source.original_doc, locations)
+        # From here on the chunks carry all the text, the source table is not kept alongside
+        del segments, firsts, distinct
+
+        total = len(chunks) * len(self.targets)
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            futures = {
+                pool.submit(self._translate_target, backend, chunks, total,
+                            self.on_segments if index == 0 else None): save_path
+                for index, (save_path, backend) in enumerate(self.targets)
+            }
+            for future in as_completed(futures):
+                save_path = futures[future]
+                try:
+                    translated_chunks = future.result()
+                    if translated_chunks is not None:
+                        translations = translated_chunks
+                        if split:
+                            translations = join_chunks(translated_chunks, layout, into=SegmentTable())
+                        del translated_chunks
+                        self._write(source, plan, locations, positions, translations, save_path)
+                    results[save_path] = None
+                except Exception as e:
+                    results[save_path] = str(e)
+
+        if self.should_abort():
+            return None
+        return results
+
+    def _run_streams(self):
+        """Data files are too large to hold in memory, so every target streams the file itself"""
+        progress = {}
+
+        def on_progress(save_path, done, total):
+            with self._progress_lock:
+                progress[save_path] = done
+                self.on_progress(sum(progress.values()), total * len(self.targets))
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            futures = {
+                pool.submit(DocumentJob(
+                    self.input_path, save_path, backend, self.tracer, self.should_abort, self.batch_segments,
+                    on_progress=lambda done, total, path=save_path: on_progress(path, done, total),
+                    max_tokens=self.max_tokens, fields=self.fields,
+                    on_segments=self.on_segments if index == 0 else None, governor=self.governor
+                ).run): save_path
+                for index, (save_path, backend) in enumerate(self.targets)
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    results[futures[future]] = None
+                except Exception as e:
+                    results[futures[future]] = str(e)
+
+        if self.should_abort():
+            return None
+        return results
+
+    def _translate_target(self, backend, chunks, total, on_segments=None):
+        backend.tracer = self.tracer
+        with self.tracer.span("backend load", to_code=backend.to_code):
+            backend.load()
+
+        translated = SegmentTable()
+        batch_segments = self.batch_segments
+        start = 0
+        while start < len(chunks):
+            if self.should_abort():
+                return None
+            if self.governor:
+                batch_segments = self.governor.admit(batch_segments)
+            batch = chunks[start:start + batch_segments]
+            start += len(batch)
+            with self.tracer.span("translate", to_code=backend.to_code, segments=len(batch)):
+                results = backend.translate_batch(batch)
+                translated.extend(results)
+            if on_segments:
+                # Distinct chunks in order of first occurrence, close enough to document order for a preview
+                on_segments(batch, results)
+            with self._progress_lock:
+                self._done += len(batch)
+                self.on_progress(self._done, total)
+        return translated
+
+    def _write(self, source, plan, locations, positions, translations, save_path):
+        """positions maps every source segment to its entry in translations, which holds distinct segments only"""
+        if len(positions) == len(translations):
+            # No repeated segments, translations are already in document order
+            translated = iter(translations)
+        else:
+            translated = (translations[position] for position in positions)
+        with self._write_lock, AtomicWriter(save_path) as output:
+            if source.extension == '.txt':
+                with self.tracer.span("save"):
+                    with open(output.temp_path, 'w', encoding='utf-8') as f:
+                        # Joined a block at a time, never the whole document at once
+                        for start in range(0, len(positions), BLOCK_SEGMENTS):
+                            if start:
+                                f.write('\n')
+                            f.write('\n'.join(islice(translated, BLOCK_SEGMENTS)))
+            elif source.extension in SUBTITLE_EXTENSIONS:
+                with self.tracer.span("save"):
+                    with open(output.temp_path, 'w', encoding='utf-8') as f:
+                        for group, translation in zip(source.subtitle_groups, translated):
+                            f.write(format_group(group, translation))
+            elif source.extension in MARKUP_EXTENSIONS:
+                with self.tracer.span("save"):
+                    with open(output.temp_path, 'w', encoding='utf-8') as f:
+                        write_markup(source.markup_blocks, list(translated), source.markup_escape, f)
+            else:
+                with self.tracer.span("reassemble"):
+                    apply_planned_translation(source.original_doc, locations, plan, translated)
+                with self.tracer.span("save"):
+                    source.original_doc.save(output.temp_path)
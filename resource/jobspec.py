@@ -0,0 +1,117 @@
+"""Engine jobs built from the settings, shared by the GUI and the headless modes.
+
+Nothing here imports Qt; cfg is the application's config object, read with cfg.get.
+lang_pair and backend override the selected package and engine.
+"""
+import os
+
+from resource.memory import MEMORY_PATH
+from resource.output import default_output_path
+
+
+def selected_pair(cfg):
+    return cfg.get(cfg.package).value
+
+
+def build_job(cfg, file_path, save_path, lang_pair=None, backend=None):
+    """Job dict for the engine, fanned out when extra target languages are configured"""
+    from_code, to_code = (lang_pair or selected_pair(cfg)).split('_')
+    backend = backend or cfg.get(cfg.backend)
+    job = {
+        "input_path": file_path,
+        "save_path": save_path,
+        "from_code": from_code,
+        "to_code": to_code,
+        "backend": backend,
+        "backend_options": backend_options(cfg, backend),
+        "compute": compute_settings(cfg),
+        "governor": governor_settings(cfg),
+        "trace": cfg.get(cfg.traceEnabled),
+        "max_tokens": cfg.get(cfg.maxSegmentTokens),
+        "merge_cues": cfg.get(cfg.mergeCues),
+        "fields": cfg.get(cfg.dataFields),
+        "incremental": cfg.get(cfg.incremental),
+        "preview": cfg.get(cfg.previewSegments) if cfg.get(cfg.livePreview) else 0,
+    }
+
+    extra_codes = fan_out_codes(cfg, from_code, to_code)
+    if extra_codes:
+        # The other outputs land next to the one the user chose
+        directory = os.path.dirname(os.path.abspath(save_path))
+        job["targets"] = [(to_code, save_path)] + [
+            (code, default_output_path(file_path, code, directory)) for code in extra_codes
+        ]
+        job["max_workers"] = cfg.get(cfg.fanOutWorkers)
+    if cfg.get(cfg.memoryEnabled):
+        job["memory"] = {
+            "path": os.path.abspath(MEMORY_PATH),
+            "threshold": cfg.get(cfg.memoryThreshold) / 100,
+            "action": cfg.get(cfg.memoryFuzzyAction),
+        }
+    return job
+
+
+def output_paths(job):
+    """Every file job writes, one per target language"""
+    if job.get("targets"):
+        return [save_path for _, save_path in job["targets"]]
+    return [job["save_path"]]
+
+
+def fan_out_codes(cfg, from_code, to_code):
+    """Extra target languages for from_code, in the order they were picked"""
+    codes = []
+    for pair in cfg.get(cfg.fanOutPackages):
+        source, target = pair.split('_', 1)
+        if source == from_code and target != to_code and target not in codes:
+            codes.append(target)
+    return codes
+
+
+def backend_options(cfg, backend=None):
+    """CTranslate2 decoding settings, ignored by the Argos backend"""
+    if (backend or cfg.get(cfg.backend)) != "ctranslate2":
+        return {}
+    return {
+        "beam_size": cfg.get(cfg.beamSize),
+        "max_batch_size": cfg.get(cfg.maxBatchSize),
+        "refine_beam": cfg.get(cfg.refineBeam),
+        "refine_threshold": cfg.get(cfg.refineThreshold) / 100,
+    }
+
+
+def preload_spec(cfg, lang_pair, backend=None):
+    """The part of a job the engine needs to load a model"""
+    from_code, to_code = lang_pair.split('_')
+    backend = backend or cfg.get(cfg.backend)
+    return {
+        "from_code": from_code,
+        "to_code": to_code,
+        "backend": backend,
+        "backend_options": backend_options(cfg, backend),
+        "compute": compute_settings(cfg),
+        "governor": governor_settings(cfg),
+        "trace": cfg.get(cfg.traceEnabled),
+    }
+
+
+def compute_settings(cfg):
+    """Device, threads and quantization; the engine applies them to loaded models as well"""
+    threads = cfg.get(cfg.computeThreads)
+    max_threads = cfg.get(cfg.governorThreads)
+    if max_threads:
+        threads = min(threads or max_threads, max_threads)
+    return {
+        "device": cfg.get(cfg.device).value,
+        "intra_threads": threads,
+        "compute_type": cfg.get(cfg.computeType),
+    }
+
+
+def governor_settings(cfg):
+    """Thread cap, priority and memory high-watermark (in bytes) of the engine process, 0 is no limit"""
+    return {
+        "max_threads": cfg.get(cfg.governorThreads),
+        "niceness": cfg.get(cfg.governorNiceness),
+        "max_memory": cfg.get(cfg.governorMemory) * 1024 * 1024,
+    }
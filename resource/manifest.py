@@ -0,0 +1,116 @@
+"""Incremental re-translation of revised documents, independent of Qt.
+
+Every finished job leaves a small manifest next to its output: the content
+hash of each segment sent to the model, with its translation. When a new
+revision of the document is translated to the same output, segments whose
+hash is in the manifest are patched in from it and only added or edited ones
+reach the model. With no edits at all the model is never loaded.
+
+Segments are keyed by content alone, not by where they are. The model
+translates each segment on its own, so its place never changes the result,
+and a paragraph inserted near the top would shift the location of everything
+after it and send the whole rest of the document to the model again.
+"""
+import hashlib
+import json
+import os
+
+from resource.backends import TranslationBackend
+from resource.output import AtomicWriter
+
+MANIFEST_VERSION = 1
+# Backend options that never change a translation, so changing them keeps the manifest valid
+RUNTIME_OPTIONS = ("device", "inter_threads", "intra_threads")
+
+
+def manifest_path(save_path):
+    save_path = os.path.abspath(save_path)
+    return os.path.join(os.path.dirname(save_path), f".{os.path.basename(save_path)}.manifest.json")
+
+
+def segment_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def _settings_key(backend):
+    """Translations are only reused when they came from the same engine and settings"""
+    options = ",".join(f"{key}={value}" for key, value in sorted(backend.options.items())
+                       if key not in RUNTIME_OPTIONS)
+    return f"{backend.name}:{backend.from_code}-{backend.to_code}:{options}"
+
+
+class ManifestBackend(TranslationBackend):
+    """Serves unchanged segments from the previous run's manifest, the rest from the wrapped backend"""
+
+    def __init__(self, backend, save_path):
+        super().__init__(backend.from_code, backend.to_code)
+        self.backend = backend
+        self.path = manifest_path(save_path)
+        self.settings = _settings_key(self._innermost(backend))
+        self.previous = self._read()
+        self.translations = {}
+        self.stats = {"unchanged": 0, "translated": 0}
+
+    @staticmethod
+    def _innermost(backend):
+        while hasattr(backend, "backend"):
+            backend = backend.backend
+        return backend
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("settings") != self.settings:
+            return {}
+        return manifest.get("segments", {})
+
+    def load(self):
+        # The model is loaded by the first segment the manifest cannot serve
+        self.loaded = True
+
+    def translate_batch(self, texts):
+        self.backend.tracer = self.tracer
+        hashes = [segment_hash(text) for text in texts]
+        results = list(texts)
+        missing = []
+        for position, (text, key) in enumerate(zip(texts, hashes)):
+            if not text.strip():
+                continue
+            if key in self.previous:
+                results[position] = self.previous[key]
+                self.stats["unchanged"] += 1
+            else:
+                missing.append(position)
+
+        if missing:
+            for position, translation in zip(missing, self.backend.translate_batch([texts[p] for p in missing])):
+                results[position] = translation
+            self.stats["translated"] += len(missing)
+
+        for text, key, translation in zip(texts, hashes, results):
+            if text.strip():
+                self.translations[key] = translation
+        return results
+
+    def removed(self):
+        return len(set(self.previous) - set(self.translations))
+
+    def summary(self):
+        return (f"manifest: {self.stats['unchanged']} segments unchanged, "
+                f"{self.stats['translated']} added or edited, {self.removed()} removed")
+
+    def save(self):
+        """Write the manifest of this run, replacing the previous one"""
+        with AtomicWriter(self.path) as output:
+            with open(output.temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": MANIFEST_VERSION,
+                    "settings": self.settings,
+                    "segments": self.translations,
+                }, f, ensure_ascii=False)
+
+    def close(self):
+        self.loaded = False
@@ -0,0 +1,430 @@
+"""HTML and Markdown segmentation that leaves the markup untouched, independent of Qt.
+
+A document is turned into blocks (a paragraph, heading, list item, table cell
+...). A block is a list of pieces: plain strings are markup and are written
+back byte for byte, TextPiece objects are text. Code (<code>, <pre>, fenced
+and indented Markdown code), <script> and <style> never become TextPieces.
+
+The model translates a block as one segment, so a sentence split by a link or
+emphasis keeps its context: markup between the first and the last TextPiece
+is replaced by numbered placeholders (<x1>, <x2> ...), and writing the block
+puts the markup back where the translation has them. Markup before and after
+the text, such as the block's own tags or a Markdown list marker, is never
+shown to the model.
+
+The model sees entities decoded; characters the source wrote as entities
+(&eacute;, &nbsp; ...) are written as the same entities again. Line breaks
+inside a block's text are kept too: the translation is broken at the spaces
+closest to the same share of the text.
+"""
+import html
+import re
+from html.parser import HTMLParser
+
+HTML_EXTENSIONS = ('.html', '.htm', '.xhtml')
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+MARKUP_EXTENSIONS = HTML_EXTENSIONS + MARKDOWN_EXTENSIONS
+
+# Elements whose content is never translated; the inline ones become a placeholder in their block's segment
+SKIP_ELEMENTS = {'code', 'pre', 'script', 'style', 'kbd', 'samp', 'var', 'textarea', 'template', 'svg', 'math'}
+INLINE_SKIP_ELEMENTS = {'code', 'kbd', 'samp', 'var'}
+
+# Elements that start a new block; inline elements (a, b, em, span ...) stay in the block
+BLOCK_ELEMENTS = {
+    'address', 'article', 'aside', 'blockquote', 'body', 'br', 'caption', 'dd', 'details', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'head',
+    'header', 'hr', 'html', 'legend', 'li', 'main', 'nav', 'ol', 'option', 'p', 'section', 'summary',
+    'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'title', 'tr', 'ul',
+} | (SKIP_ELEMENTS - INLINE_SKIP_ELEMENTS)
+
+# Void elements never get an end tag, so they do not open a skipped region
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+LETTER_RE = re.compile(r'[^\W\d_]')
+# Only ASCII whitespace is layout, a no-break space is part of the text
+WHITESPACE = " \t\n\r\f\v"
+WHITESPACE_RE = re.compile(r'[ \t\n\r\f\v]+')
+# Character references with their semicolon, the only ones Markdown decodes
+ENTITY_RE = re.compile(r'&(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[A-Za-z][A-Za-z0-9]{1,31});')
+PLACEHOLDER = "<x{}>"
+# Models sometimes change the case of a tag they copy, or add spaces or slashes inside it
+PLACEHOLDER_RE = re.compile(r'<\s*/?\s*x\s*(\d+)\s*/?\s*>', re.IGNORECASE)
+
+
+class TextPiece:
+    """Translatable text; lead and trail whitespace stay outside the model input"""
+
+    __slots__ = ("raw", "lead", "text", "trail")
+
+    def __init__(self, raw, text):
+        self.raw = raw
+        self.lead = raw[:len(raw) - len(raw.lstrip(WHITESPACE))]
+        self.trail = raw[len(raw.rstrip(WHITESPACE)):]
+        self.text = WHITESPACE_RE.sub(" ", text).strip(" ")
+
+
+def _text_or_markup(raw, text):
+    return TextPiece(raw, text) if LETTER_RE.search(text) else raw
+
+
+def _raw(pieces):
+    return "".join(piece.raw if isinstance(piece, TextPiece) else piece for piece in pieces)
+
+
+def _text_span(block):
+    """Indexes of the first and the last TextPiece of block, None when it has none"""
+    indexes = [index for index, piece in enumerate(block) if isinstance(piece, TextPiece)]
+    return (indexes[0], indexes[-1]) if indexes else None
+
+
+def _inline_items(block, first, last):
+    """TextPieces from first to last, the markup strings between two of them joined into one"""
+    items = []
+    for piece in block[first:last + 1]:
+        if isinstance(piece, TextPiece) or isinstance(items[-1], TextPiece):
+            items.append(piece)
+        else:
+            items[-1] += piece
+    return items
+
+
+def _segment(items):
+    """Model input of a block: its text with a placeholder for each run of inline markup.
+
+    Returns the segment, its number of spaces and the line breaks of the
+    source as (number of the space they became, the whitespace from the "\\n" on).
+    """
+    out = []
+    breaks = []
+    spaces = 0
+    markups = 0
+    pending = ""
+
+    def add_space(whitespace):
+        nonlocal pending
+        pending += whitespace
+
+    def add_text(text):
+        nonlocal pending, spaces
+        # Whitespace before the first text stays outside the segment
+        if pending and out:
+            spaces += 1
+            out.append(" ")
+            if "\n" in pending:
+                breaks.append((spaces, pending[pending.index("\n"):]))
+        pending = ""
+        out.append(text)
+
+    for item in items:
+        if isinstance(item, TextPiece):
+            add_space(item.lead)
+            interior = item.raw.strip(WHITESPACE)
+            words = item.text.split(" ")
+            separators = WHITESPACE_RE.findall(interior)
+            if len(separators) != len(words) - 1:
+                # Decoding changed the word count, e.g. an encoded space; the text goes in without its breaks
+                separators = [" "] * (len(words) - 1)
+            for word, separator in zip(words, [""] + separators):
+                add_space(separator)
+                add_text(word)
+            add_space(item.trail)
+        elif item.strip(WHITESPACE):
+            markups += 1
+            add_space(item[:len(item) - len(item.lstrip(WHITESPACE))])
+            add_text(PLACEHOLDER.format(markups))
+            add_space(item[len(item.rstrip(WHITESPACE)):])
+        else:
+            add_space(item)
+    return "".join(out), spaces, breaks
+
+
+def block_texts(block):
+    """The segment of block, an empty list when there is nothing to translate"""
+    span = _text_span(block)
+    return [_segment(_inline_items(block, *span))[0]] if span else []
+
+
+def _text_writer(items, escape):
+    """write(text) for the translation of a block: escape(text), except that characters the source wrote
+    as entities are written the way the source wrote them, spelling by spelling in source order"""
+    raws = [item.raw for item in items if isinstance(item, TextPiece)]
+    spellings = {}
+    for raw in raws:
+        for match in ENTITY_RE.finditer(raw):
+            character = html.unescape(match.group(0))
+            if len(character) == 1 and character != match.group(0):
+                spellings[character] = []
+    if not spellings:
+        return escape
+
+    # Literal occurrences count too, a translation that keeps the text keeps the source as it was
+    pattern = re.compile(f"{ENTITY_RE.pattern}|[{re.escape(''.join(spellings))}]")
+    for raw in raws:
+        for match in pattern.finditer(raw):
+            character = html.unescape(match.group(0))
+            if character in spellings:
+                spellings[character].append(match.group(0))
+    used = dict.fromkeys(spellings, 0)
+
+    def write(text):
+        out = []
+        start = 0
+        for index, character in enumerate(text):
+            if character in spellings:
+                written = spellings[character]
+                out += [escape(text[start:index]), written[min(used[character], len(written) - 1)]]
+                used[character] += 1
+                start = index + 1
+        out.append(escape(text[start:]))
+        return "".join(out)
+
+    return write
+
+
+def _rewrap(text, spaces, breaks):
+    """Turn the spaces of text closest to the source's line breaks, by share of all spaces, into those breaks"""
+    positions = [index for index, character in enumerate(text) if character == " "]
+    if not positions or not breaks:
+        return text
+    chosen = {}
+    previous = -1
+    for number, whitespace in breaks:
+        index = min(len(positions) - 1, max(previous + 1, round(number * len(positions) / spaces) - 1))
+        if index <= previous:
+            break
+        chosen[positions[index]] = whitespace
+        previous = index
+    return "".join(chosen.get(index, character) for index, character in enumerate(text))
+
+
+def _fill(translation, markups, write):
+    """translation with each placeholder replaced by its markup.
+
+    Placeholders the model kept in order get their markup in place. Markup
+    whose placeholder was dropped, repeated or moved is written just before the
+    next markup kept in place, or at the end, so every tag appears once and in
+    its original order, and none is left unbalanced.
+    """
+    parts = PLACEHOLDER_RE.split(translation)
+    out = []
+    text = parts[0]
+    following = 0
+    for number, part in zip(parts[1::2], parts[2::2]):
+        number = int(number)
+        if following < number <= len(markups):
+            out += [write(text), *markups[following:number]]
+            following = number
+            text = part
+        else:
+            # Placeholder left out, the words on both sides of it are joined by one space
+            text = " ".join(piece for piece in (text.rstrip(" "), part.lstrip(" ")) if piece)
+    return "".join(out + [write(text), *markups[following:]])
+
+
+def format_block(block, translations, escape):
+    """Markup verbatim, the text between the first and the last TextPiece replaced by the translation"""
+    span = _text_span(block)
+    translation = next(iter(translations), "") if span else ""
+    if not translation:
+        return _raw(block)
+    first, last = span
+    items = _inline_items(block, first, last)
+    _, spaces, breaks = _segment(items)
+    markups = [item.strip(WHITESPACE) for item in items
+               if not isinstance(item, TextPiece) and item.strip(WHITESPACE)]
+    translation = _rewrap(WHITESPACE_RE.sub(" ", translation).strip(" "), spaces, breaks)
+    return (_raw(block[:first]) + items[0].lead + _fill(translation, markups, _text_writer(items, escape))
+            + items[-1].trail + _raw(block[last + 1:]))
+
+
+# HTML
+
+class _HtmlTokenizer(HTMLParser):
+    """Records every parser event with its offset, so markup can be copied from the source"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.events = []
+
+    def _event(self, kind, tag=None, data=None):
+        self.events.append((kind, tag, data, self.getpos()))
+
+    def handle_starttag(self, tag, attrs):
+        self._event("start", tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._event("void", tag)
+
+    def handle_endtag(self, tag):
+        self._event("end", tag)
+
+    def handle_data(self, data):
+        self._event("data", data=data)
+
+    def handle_comment(self, data):
+        self._event("markup")
+
+    def handle_decl(self, decl):
+        self._event("markup")
+
+    def handle_pi(self, data):
+        self._event("markup")
+
+    def unknown_decl(self, data):
+        self._event("markup")
+
+
+def html_blocks(source):
+    """Yield the blocks of an HTML document given as a string"""
+    tokenizer = _HtmlTokenizer()
+    tokenizer.feed(source)
+    tokenizer.close()
+
+    # getpos() counts lines by "\n" only, str.splitlines would also break at \r, \f,   ...
+    line_starts = [0]
+    for line in source.split("\n"):
+        line_starts.append(line_starts[-1] + len(line) + 1)
+    offsets = [line_starts[line - 1] + column for _, _, _, (line, column) in tokenizer.events] + [len(source)]
+    if offsets[0] > 0:
+        yield [source[:offsets[0]]]
+
+    block = []
+    skipping = []
+    for (kind, tag, data, _), start, end in zip(tokenizer.events, offsets, offsets[1:]):
+        raw = source[start:end]
+        if kind == "data" and not skipping:
+            block.append(_text_or_markup(raw, data))
+            continue
+
+        if tag in BLOCK_ELEMENTS and block and kind != "data":
+            yield block
+            block = []
+        block.append(raw)
+        if tag in SKIP_ELEMENTS and tag not in VOID_ELEMENTS:
+            if kind == "start":
+                skipping.append(tag)
+            elif kind == "end" and tag in skipping:
+                del skipping[len(skipping) - 1 - skipping[::-1].index(tag):]
+    if block:
+        yield block
+
+
+def escape_html(text):
+    return html.escape(text, quote=False)
+
+
+# Markdown
+
+FENCE_RE = re.compile(r'^\s{0,3}(`{3,}|~{3,})')
+BLOCK_PREFIX_RE = re.compile(r'^\s*(?:#{1,6}\s+|>\s?|[-*+]\s+(?:\[[ xX]\]\s+)?|\d{1,9}[.)]\s+)+')
+RULE_RE = re.compile(r'^\s{0,3}(?:[-*_=]\s*){3,}$|^\s*\|?\s*:?-{2,}:?\s*(?:\|\s*:?-{2,}:?\s*)*\|?\s*$')
+# Inline syntax kept verbatim: code spans, images, link targets, autolinks/HTML, emphasis, table pipes
+INLINE_MARKUP_RE = re.compile(
+    r'`+[^`]*?`+'
+    r'|!\[[^\]]*\]\([^)]*\)'
+    r'|\]\([^)]*\)|\]\[[^\]]*\]|\[|\]'
+    r'|<[^>\n]+>'
+    r'|\*{1,3}|(?<!\w)_{1,3}|_{1,3}(?!\w)|~~'
+    r'|\|'
+)
+
+
+def _decode_entities(text):
+    return ENTITY_RE.sub(lambda match: html.unescape(match.group(0)), text)
+
+
+def _inline_pieces(raw):
+    """Split a Markdown text run into markup strings and TextPieces"""
+    pieces = []
+    start = 0
+    for match in INLINE_MARKUP_RE.finditer(raw):
+        if match.start() > start:
+            text = raw[start:match.start()]
+            pieces.append(_text_or_markup(text, _decode_entities(text)))
+        pieces.append(match.group(0))
+        start = match.end()
+    if start < len(raw):
+        pieces.append(_text_or_markup(raw[start:], _decode_entities(raw[start:])))
+    return pieces
+
+
+def markdown_blocks(lines):
+    """Yield the blocks of a Markdown document from an iterable of lines"""
+    block = []
+    paragraph = []
+    fence = None
+    front_matter = False
+    previous_blank = True
+
+    def flush_paragraph():
+        if paragraph:
+            content = "".join(paragraph)
+            body = content.rstrip("\n")
+            block.extend(_inline_pieces(body))
+            block.append(content[len(body):])
+            paragraph.clear()
+
+    for number, line in enumerate(lines):
+        if fence is not None or front_matter:
+            block.append(line)
+            stripped = line.strip()
+            if front_matter and stripped in ('---', '...'):
+                front_matter = False
+                yield block
+                block = []
+            elif fence is not None and stripped.startswith(fence) and not stripped.strip(fence[0]):
+                fence = None
+                yield block
+                block = []
+            continue
+
+        opening = FENCE_RE.match(line)
+        if number == 0 and line.strip() == '---':
+            front_matter = True
+        if opening or front_matter or not line.strip() or RULE_RE.match(line) \
+                or (previous_blank and (line.startswith('    ') or line.startswith('\t'))):
+            flush_paragraph()
+            if block:
+                yield block
+                block = []
+            if opening:
+                fence = opening.group(1)
+            block.append(line)
+            previous_blank = not line.strip()
+            if not opening and not front_matter:
+                yield block
+                block = []
+            continue
+
+        prefix = BLOCK_PREFIX_RE.match(line)
+        hard_break = paragraph and (paragraph[-1].rstrip("\n").endswith(("  ", "\\")))
+        if prefix or hard_break or '|' in line:
+            flush_paragraph()
+            if block:
+                yield block
+                block = []
+        if prefix:
+            block.append(prefix.group(0))
+            line = line[prefix.end():]
+        paragraph.append(line)
+        previous_blank = False
+
+    flush_paragraph()
+    if block:
+        yield block
+
+
+def escape_markdown(text):
+    return text
+
+
+def markup_blocks(path):
+    """Blocks of an HTML or Markdown file and the escape function for its translations"""
+    if path.lower().endswith(HTML_EXTENSIONS):
+        with open(path, 'r', encoding='utf-8') as f:
+            return html_blocks(f.read()), escape_html
+
+    def lines():
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from f
+    return markdown_blocks(lines()), escape_markdown
@@ -0,0 +1,337 @@
+"""Translation memory with fuzzy lookup, independent of Qt.
+
+Every translated segment is kept per language pair in an append-only JSON
+Lines file. Lookups first try an exact match, then a MinHash index over word
+bigrams: similar sentences share at least one band of their signature, so only
+a handful of candidates are compared word by word. Band keys are stored with
+each entry, so loading a memory of a few hundred thousand entries is a plain
+file read and a lookup stays well under a millisecond.
+
+MemoryBackend wraps a backend: exact hits are reused, fuzzy hits above the
+threshold are reused or decoded again with a small beam, and only the rest
+reach the model. TMX files can be imported into and exported from the memory.
+"""
+import json
+import os
+import random
+import re
+import struct
+import threading
+import zlib
+from difflib import SequenceMatcher
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from resource.backends import TranslationBackend
+
+MEMORY_PATH = os.path.join("config", "translation_memory.jsonl")
+
+# What happens to a fuzzy match at or above the threshold
+FUZZY_ACTIONS = ("reuse", "retranslate")
+
+# Signature of NUM_BANDS bands with BAND_ROWS hashes each. Two sentences with a
+# word-bigram Jaccard similarity of 0.75 (one word changed in about fifteen)
+# share a band with a probability of 96%
+NUM_BANDS = 6
+BAND_ROWS = 3
+# Multiply-shift hashing: the high 32 bits of (a * h + b) mod 2**64, one (a, b) per row
+_MASK = (1 << 64) - 1
+_rng = random.Random(0x7e1051a)
+_COEFFICIENTS = [(_rng.randrange(1 << 64) | 1, _rng.randrange(1 << 64)) for _ in range(NUM_BANDS * BAND_ROWS)]
+
+# Candidates compared word by word at most per lookup
+MAX_CANDIDATES = 8
+
+WORD_RE = re.compile(r'\w+|[^\w\s]')
+
+# TMX language tags for the Argos codes that are not ISO 639-1
+TMX_LANGUAGES = {"zt": "zh-TW", "pb": "pt-BR"}
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+
+def _tokens(text):
+    return WORD_RE.findall(text.lower())
+
+
+def band_keys(tokens):
+    """MinHash band keys of a token list, stable across runs and Python versions"""
+    shingles = [" ".join(tokens[i:i + 2]) for i in range(max(1, len(tokens) - 1))]
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles]
+    mins = [min([((a * h + b) & _MASK) >> 32 for h in hashes]) for a, b in _COEFFICIENTS]
+    return [
+        (band << 32) | zlib.crc32(struct.pack('<3I', *mins[band * BAND_ROWS:(band + 1) * BAND_ROWS]))
+        for band in range(NUM_BANDS)
+    ]
+
+
+class _PairIndex:
+    """Entries and lookup structures of one language pair"""
+
+    __slots__ = ("sources", "targets", "exact", "bands")
+
+    def __init__(self):
+        self.sources = []
+        self.targets = []
+        self.exact = {}
+        # band key -> entry id, or a list of ids once several entries share the key
+        self.bands = {}
+
+    def add(self, source, target, keys):
+        entry = len(self.sources)
+        self.sources.append(source)
+        self.targets.append(target)
+        self.exact[" ".join(source.split())] = entry
+        for key in keys:
+            found = self.bands.get(key)
+            if found is None:
+                self.bands[key] = entry
+            elif isinstance(found, list):
+                found.append(entry)
+            else:
+                self.bands[key] = [found, entry]
+
+    def lookup(self, text, cutoff=0.0):
+        """(similarity 0..1, stored translation) of the closest entry at or above cutoff, (0.0, None) without one"""
+        entry = self.exact.get(" ".join(text.split()))
+        if entry is not None:
+            return 1.0, self.targets[entry]
+
+        tokens = _tokens(text)
+        if not tokens:
+            return 0.0, None
+        hits = {}
+        for key in band_keys(tokens):
+            found = self.bands.get(key)
+            if found is None:
+                continue
+            for candidate in (found if isinstance(found, list) else (found,)):
+                hits[candidate] = hits.get(candidate, 0) + 1
+        if not hits:
+            return 0.0, None
+
+        # Same filtering as difflib.get_close_matches: cheap upper bounds before the real ratio
+        matcher = SequenceMatcher(autojunk=False)
+        matcher.set_seq2(tokens)
+        best, best_score = None, cutoff
+        for candidate in sorted(hits, key=lambda c: (-hits[c], -c))[:MAX_CANDIDATES]:
+            matcher.set_seq1(_tokens(self.sources[candidate]))
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is None:
+            return 0.0, None
+        return best_score, self.targets[best]
+
+
+class TranslationMemory:
+    """Segments translated so far, per language pair, backed by an append-only JSON Lines file"""
+
+    def __init__(self, path=MEMORY_PATH):
+        self.path = path
+        self.pairs = {}
+        self._pending = []
+        self._loaded_size = 0
+        # Fan-out targets add to the same memory from several threads
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(index.sources) for index in self.pairs.values())
+
+    def refresh(self):
+        """Read what was appended to the file since the last call, e.g. by a TMX import"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size < self._loaded_size:
+            # Rewritten rather than appended to, start over
+            self.pairs = {}
+            self._loaded_size = 0
+        if size == self._loaded_size:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._loaded_size)
+            data = f.read()
+        # A line still being written by another process is picked up next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+                self._index(record["from"], record["to"]).add(record["source"], record["target"], record["bands"])
+            except (ValueError, KeyError, TypeError):
+                continue
+        self._loaded_size += end
+
+    def _index(self, from_code, to_code):
+        index = self.pairs.get((from_code, to_code))
+        if index is None:
+            index = self.pairs[(from_code, to_code)] = _PairIndex()
+        return index
+
+    def lookup(self, from_code, to_code, text, cutoff=0.0):
+        index = self.pairs.get((from_code, to_code))
+        if index is None:
+            return 0.0, None
+        return index.lookup(text, cutoff)
+
+    def add(self, from_code, to_code, source, target):
+        """Remember a translation; it is written to the file by flush()"""
+        if not source.strip() or not target.strip():
+            return
+        keys = band_keys(_tokens(source))
+        with self._lock:
+            self._index(from_code, to_code).add(source, target, keys)
+            self._pending.append({"from": from_code, "to": to_code, "source": source, "target": target, "bands": keys})
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                start = f.tell()
+                for record in self._pending:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                # Lines written by someone else in the meantime are still read by the next refresh()
+                if start == self._loaded_size:
+                    self._loaded_size = f.tell()
+            self._pending = []
+
+    def entries(self):
+        """Yield (from_code, to_code, source, target) of every stored entry, read from the file"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    yield record["from"], record["to"], record["source"], record["target"]
+                except (ValueError, KeyError):
+                    continue
+
+
+class MemoryBackend(TranslationBackend):
+    """Serves segments from a TranslationMemory and sends only the rest to the wrapped backend"""
+
+    def __init__(self, backend, memory, threshold=0.9, action="reuse"):
+        super().__init__(backend.from_code, backend.to_code)
+        self.backend = backend
+        self.memory = memory
+        self.threshold = threshold
+        self.action = action
+        self.stats = {"exact": 0, "fuzzy": 0, "retranslated": 0, "translated": 0}
+
+    def load(self):
+        # The model is loaded by the first segment the memory cannot serve
+        self.loaded = True
+
+    def translate_batch(self, texts):
+        self.backend.tracer = self.tracer
+        results = list(texts)
+        full = []
+        quick = []
+        with self.tracer.span("memory lookup", segments=len(texts)):
+            for position, text in enumerate(texts):
+                if not text.strip():
+                    continue
+                score, target = self.memory.lookup(self.from_code, self.to_code, text, self.threshold)
+                if score >= 1.0:
+                    results[position] = target
+                    self.stats["exact"] += 1
+                elif score >= self.threshold and self.action == "reuse":
+                    results[position] = target
+                    self.stats["fuzzy"] += 1
+                elif score >= self.threshold:
+                    quick.append(position)
+                else:
+                    full.append(position)
+
+        for positions, translate, stat in ((full, self.backend.translate_batch, "translated"),
+                                           (quick, self.backend.translate_quick, "retranslated")):
+            if not positions:
+                continue
+            for position, translation in zip(positions, translate([texts[p] for p in positions])):
+                results[position] = translation
+                self.memory.add(self.from_code, self.to_code, texts[position], translation)
+            self.stats[stat] += len(positions)
+        self.tracer.counter("memory", **self.stats)
+        return results
+
+    def summary(self):
+        total = sum(self.stats.values())
+        served = self.stats["exact"] + self.stats["fuzzy"]
+        return (f"translation memory: {served}/{total} segments served "
+                f"({self.stats['exact']} exact, {self.stats['fuzzy']} fuzzy), "
+                f"{self.stats['retranslated']} retranslated with a small beam")
+
+    def close(self):
+        self.memory.flush()
+        self.loaded = False
+
+
+def tmx_language(code):
+    return TMX_LANGUAGES.get(code, code)
+
+
+def argos_language(tag):
+    """Argos code of a TMX language tag such as en-US or pt-BR"""
+    tag = tag.replace("_", "-")
+    for code, tmx_tag in TMX_LANGUAGES.items():
+        if tag.lower() == tmx_tag.lower():
+            return code
+    return tag.split("-")[0].lower()
+
+
+def import_tmx(tmx_path, memory):
+    """Add every translation unit of a TMX file to memory, in all directions it covers; returns the count"""
+    added = 0
+    source_language = None
+    for _, element in ElementTree.iterparse(tmx_path, events=("end",)):
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "header":
+            source_language = element.get("srclang")
+        if tag != "tu":
+            continue
+
+        variants = []
+        for tuv in element:
+            if tuv.tag.rsplit("}", 1)[-1] != "tuv":
+                continue
+            language = tuv.get(XML_LANG) or tuv.get("lang")
+            seg = next((child for child in tuv if child.tag.rsplit("}", 1)[-1] == "seg"), None)
+            if language and seg is not None:
+                variants.append((argos_language(language), " ".join("".join(seg.itertext()).split())))
+        element.clear()
+
+        if source_language and source_language != "*all*":
+            sources = [v for v in variants if v[0] == argos_language(source_language)] or variants[:1]
+        else:
+            sources = variants
+        for from_code, source in sources:
+            for to_code, target in variants:
+                if to_code != from_code:
+                    memory.add(from_code, to_code, source, target)
+                    added += 1
+    memory.flush()
+    return added
+
+
+def export_tmx(memory, tmx_path):
+    """Write every entry of memory as a TMX 1.4 translation unit; returns the count"""
+    exported = 0
+    with open(tmx_path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<tmx version="1.4">\n')
+        f.write('  <header creationtool="Celosia" creationtoolversion="1" segtype="paragraph" o-tmf="jsonl" '
+                'adminlang="en" srclang="*all*" datatype="plaintext"/>\n  <body>\n')
+        for from_code, to_code, source, target in memory.entries():
+            f.write(f'    <tu>\n'
+                    f'      <tuv xml:lang="{tmx_language(from_code)}"><seg>{escape(source)}</seg></tuv>\n'
+                    f'      <tuv xml:lang="{tmx_language(to_code)}"><seg>{escape(target)}</seg></tuv>\n'
+                    f'    </tu>\n')
+            exported += 1
+        f.write('  </body>\n</tmx>\n')
+    return exported
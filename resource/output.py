@@ -0,0 +1,77 @@
+import glob
+import os
+import stat
+import tempfile
+
+# Where translated files go, see Config.outputPolicy
+OUTPUT_POLICIES = ["source", "folder", "ask"]
+
+
+def _current_umask():
+    # The umask can only be read by setting it; done once at import, before any worker threads
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Mode of a newly created output, as open() would give it; mkstemp's files are 0600
+NEW_FILE_MODE = 0o666 & ~_current_umask()
+
+
+def default_output_path(input_path, to_code, directory=None):
+    """<name>_translated_<to_code><ext>, next to the source unless directory is given"""
+    base_name, extension = os.path.splitext(os.path.basename(input_path))
+    directory = directory or os.path.dirname(os.path.abspath(input_path))
+    return os.path.join(directory, f"{base_name}_translated_{to_code}{extension}")
+
+
+class AtomicWriter:
+    """Collects output in a temporary file next to path and renames it into place.
+
+    The rename only happens when the with-block exits cleanly and discard() was
+    not called, so readers never see a half-written translation.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.temp_path = None
+        self.discarded = False
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(self.path)}.", suffix=".part", dir=directory
+        )
+        os.close(fd)
+        return self
+
+    def discard(self):
+        self.discarded = True
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and not self.discarded:
+            self._copy_mode()
+            os.replace(self.temp_path, self.path)
+        elif os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+        return False
+
+    def _copy_mode(self):
+        """Give the temp file the mode of the file it replaces, or the usual one for a new file"""
+        try:
+            mode = stat.S_IMODE(os.stat(self.path).st_mode)
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(self.temp_path, mode)
+
+
+def remove_partial_outputs(path):
+    """Delete temp files an AtomicWriter for path left behind in a killed process"""
+    path = os.path.abspath(path)
+    pattern = os.path.join(glob.escape(os.path.dirname(path)), f".{glob.escape(os.path.basename(path))}.*.part")
+    for temp_path in glob.glob(pattern):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
@@ -0,0 +1,178 @@
+"""Bounded three-stage pipeline: produce -> transform -> consume.
+
+Each stage runs in its own thread and hands items to the next one through a
+queue of at most `depth` items, so the parser, the model and the disk work at
+the same time while only a few batches are ever held in memory. The stage that
+is busy close to 100% of the time is the bottleneck; the queue in front of it
+stays full and the one behind it stays empty.
+"""
+import queue
+import threading
+import time
+
+from resource.tracing import NULL_TRACER
+
+# Batches that may wait between two stages
+QUEUE_DEPTH = 4
+
+_DONE = object()
+_POLL = 0.05
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+
+
+class QueueStats:
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.samples = 0
+        self.total_depth = 0
+        self.max_depth = 0
+
+    def sample(self, depth):
+        self.samples += 1
+        self.total_depth += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    @property
+    def mean_depth(self):
+        return self.total_depth / self.samples if self.samples else 0.0
+
+
+class Pipeline:
+    """Runs one produce/transform/consume chain, the consumer on the calling thread"""
+
+    def __init__(self, names=("parse", "translate", "write"), depth=QUEUE_DEPTH, should_abort=None,
+                 tracer=NULL_TRACER, admit=None):
+        self.depth = depth
+        self.should_abort = should_abort or (lambda: False)
+        # Called with in_flight() before each item is produced, may block to hold back intake
+        self.admit = admit
+        self.tracer = tracer
+        self.stages = [StageStats(name) for name in names]
+        self.queues = [QueueStats(f"{a} -> {b}", depth) for a, b in zip(names, names[1:])]
+        self.wall = 0.0
+        self._stop = threading.Event()
+        self._errors = []
+
+    def run(self, source, transform, consume):
+        """Feed the items of the source iterable through transform into consume.
+
+        Returns False if the job was aborted, re-raises the first stage error.
+        """
+        parsed = queue.Queue(self.depth)
+        translated = queue.Queue(self.depth)
+        threads = [
+            threading.Thread(target=self._guard, args=(self._produce, source, parsed), daemon=True),
+            threading.Thread(target=self._guard, args=(self._transform, transform, parsed, translated), daemon=True),
+        ]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        self._guard(self._consume, consume, translated)
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+        self.wall = time.perf_counter() - start
+
+        if self._errors:
+            raise self._errors[0]
+        return not self.should_abort()
+
+    def _guard(self, stage, *args):
+        try:
+            stage(*args)
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _produce(self, source, output):
+        stats = self.stages[0]
+        items = iter(source)
+        while not self._stopping():
+            if self.admit:
+                self.admit(self.in_flight)
+            began = time.perf_counter()
+            with self.tracer.span(stats.name):
+                item = next(items, _DONE)
+            stats.busy += time.perf_counter() - began
+            if item is _DONE:
+                break
+            stats.items += 1
+            if not self._put(output, item, self.queues[0]):
+                return
+        self._put(output, _DONE, self.queues[0])
+
+    def _transform(self, transform, source, output):
+        stats = self.stages[1]
+        while True:
+            item = self._get(source, self.queues[0])
+            if item is _DONE or self._stopping():
+                break
+            began = time.perf_counter()
+            with self.tracer.span(stats.name):
+                item = transform(item)
+            stats.busy += time.perf_counter() - began
+            stats.items += 1
+            if not self._put(output, item, self.queues[1]):
+                return
+        self._put(output, _DONE, self.queues[1])
+
+    def _consume(self, consume, source):
+        stats = self.stages[2]
+        while True:
+            item = self._get(source, self.queues[1])
+            if item is _DONE or self._stopping():
+                return
+            began = time.perf_counter()
+            with self.tracer.span(stats.name):
+                consume(item)
+            stats.busy += time.perf_counter() - began
+            stats.items += 1
+
+    def in_flight(self):
+        """Items produced but not consumed yet"""
+        return self.stages[0].items - self.stages[-1].items
+
+    def _stopping(self):
+        if self.should_abort():
+            self._stop.set()
+        return self._stop.is_set()
+
+    def _put(self, q, item, stats):
+        while True:
+            try:
+                q.put(item, timeout=_POLL)
+                break
+            except queue.Full:
+                if self._stopping():
+                    return False
+        stats.sample(q.qsize())
+        self.tracer.counter("queue depth", **{stats.name: q.qsize()})
+        return True
+
+    def _get(self, q, stats):
+        stats.sample(q.qsize())
+        while True:
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                if self._stopping():
+                    return _DONE
+
+    def summary(self):
+        """Per-stage utilization and queue depths, the busiest stage is the bottleneck"""
+        lines = [f"Pipeline ({self.wall * 1000:.1f} ms)"]
+        for stats in self.stages:
+            share = stats.busy / self.wall if self.wall else 0.0
+            lines.append(f"  {stats.name:<12}{stats.items:>6} items{stats.busy * 1000:>10.1f} ms busy{share:>8.1%}")
+        for stats in self.queues:
+            lines.append(f"  queue {stats.name:<20} mean depth {stats.mean_depth:.1f}, "
+                         f"max {stats.max_depth}/{stats.maxsize}")
+        return "\n".join(lines)
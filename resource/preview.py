@@ -0,0 +1,56 @@
+"""Throttled stream of finished segments for the live preview, independent of Qt.
+
+The job hands over every translated batch in document order. Sending each
+one across the pipe, and re-laying out the preview for it, would cost more
+than the batch itself on small segments, so pairs are collected and sent at
+most every PREVIEW_INTERVAL seconds. Only the first `limit` segments are
+previewed: they show whether the package and settings are right, the rest
+of the document is in the output file.
+"""
+import threading
+import time
+
+# Seconds between two preview messages; the first batch is sent at once
+PREVIEW_INTERVAL = 0.25
+PREVIEW_SEGMENTS = 500
+
+
+class PreviewRelay:
+    """Collects (source, translation) pairs and passes them to send(pairs) in throttled batches"""
+
+    def __init__(self, send, limit=PREVIEW_SEGMENTS, interval=PREVIEW_INTERVAL):
+        self.send = send
+        self.limit = limit
+        self.interval = interval
+        self.sent = 0
+        self._pairs = []
+        self._last = None
+        self._lock = threading.Lock()
+
+    def add(self, sources, translations):
+        with self._lock:
+            room = self.limit - self.sent - len(self._pairs)
+            if room <= 0:
+                return
+            for source, translation in zip(sources, translations):
+                # Blank lines and empty cells would only take up preview rows
+                if source.strip():
+                    self._pairs.append((source, translation))
+                    room -= 1
+                    if not room:
+                        break
+            now = time.monotonic()
+            if self._pairs and (self._last is None or now - self._last >= self.interval or not room):
+                self._flush(now)
+
+    def flush(self):
+        """Send what is left, call once the job is over"""
+        with self._lock:
+            if self._pairs:
+                self._flush(time.monotonic())
+
+    def _flush(self, now):
+        self.send(self._pairs)
+        self.sent += len(self._pairs)
+        self._pairs = []
+        self._last = now
@@ -0,0 +1,108 @@
+"""Compact storage for the segments of a whole document, independent of Qt.
+
+A list of a million short strings spends more on object headers, hashes and
+pointers than on the text itself. SegmentTable packs segments into a few
+large strings of BLOCK_SEGMENTS segments each, with one array of end offsets
+and one array of small-int locations (a paragraph index, a line number ...),
+so the per-segment overhead is 8 bytes. Segments are sliced out on access;
+the table supports len(), indexing, slicing and iteration like a list.
+"""
+from array import array
+from itertools import accumulate, islice, repeat
+
+# Segments packed into one string; appending stays linear and lookups need no search
+BLOCK_BITS = 12
+BLOCK_SEGMENTS = 1 << BLOCK_BITS
+
+
+class SegmentTable:
+    """Append-only sequence of strings with a location handle per string"""
+
+    __slots__ = ("_blocks", "_ends", "_pending", "locations")
+
+    def __init__(self, texts=()):
+        self._blocks = []
+        # End offset of every segment inside its block
+        self._ends = array('I')
+        self._pending = []
+        self.locations = array('I')
+        self.extend(texts)
+
+    def append(self, text, location=0):
+        pending = self._pending
+        ends = self._ends
+        ends.append((ends[-1] if pending else 0) + len(text))
+        self.locations.append(location)
+        pending.append(text)
+        if len(pending) == BLOCK_SEGMENTS:
+            self._blocks.append("".join(pending))
+            self._pending = []
+
+    def extend(self, texts, location=0):
+        """append() for many texts, filled a block at a time"""
+        texts = iter(texts)
+        while True:
+            batch = list(islice(texts, BLOCK_SEGMENTS - len(self._pending)))
+            if not batch:
+                return
+            ends = accumulate(map(len, batch), initial=self._ends[-1] if self._pending else 0)
+            next(ends)
+            self._ends.extend(ends)
+            self.locations.extend(repeat(location, len(batch)))
+            self._pending.extend(batch)
+            if len(self._pending) == BLOCK_SEGMENTS:
+                self._blocks.append("".join(self._pending))
+                self._pending = []
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __getitem__(self, index):
+        if index.__class__ is slice:
+            return [self[i] for i in range(*index.indices(len(self._ends)))]
+        if index < 0:
+            index += len(self._ends)
+        # The end offset lookup also raises IndexError when index is out of range
+        end = self._ends[index]
+        block = index >> BLOCK_BITS
+        if block == len(self._blocks):
+            return self._pending[index & (BLOCK_SEGMENTS - 1)]
+        start = self._ends[index - 1] if index & (BLOCK_SEGMENTS - 1) else 0
+        return self._blocks[block][start:end]
+
+    def __iter__(self):
+        for block, text in enumerate(self._blocks):
+            first = block * BLOCK_SEGMENTS
+            start = 0
+            for end in self._ends[first:first + BLOCK_SEGMENTS]:
+                yield text[start:end]
+                start = end
+        yield from self._pending
+
+    def unique(self):
+        """(index of the first occurrence of every distinct segment, index into those for every segment).
+
+        Only array indexes are returned, the distinct texts are never copied.
+        """
+        firsts = array('I')
+        positions = array('I')
+        # hash -> position in firsts, or a list of positions on a hash collision
+        seen = {}
+        for index, text in enumerate(self):
+            key = hash(text)
+            found = seen.get(key)
+            position = None
+            if found is not None:
+                candidates = found if isinstance(found, list) else (found,)
+                position = next((c for c in candidates if self[firsts[c]] == text), None)
+            if position is None:
+                position = len(firsts)
+                firsts.append(index)
+                if found is None:
+                    seen[key] = position
+                elif isinstance(found, list):
+                    found.append(position)
+                else:
+                    seen[key] = [found, position]
+            positions.append(position)
+        return firsts, positions
@@ -0,0 +1,440 @@
+"""Local HTTP/JSON translation service.
+
+    python -m resource.service --port 8765 [--backend argos|ctranslate2|fake]
+
+Endpoints (localhost only by default); POSTs need "Content-Type: application/json"
+and "Authorization: Bearer <token>", the token is printed at startup:
+    GET  /health
+    GET  /stats                      latency / throughput counters per endpoint
+    POST /translate                  {"from": "en", "to": "de", "text": "..."} or "texts": [...]
+    POST /translate/file             {"from": "en", "to": "de", "path": "...", "output": "..."}
+                                     "to": ["de", "fr"] translates into every language,
+                                     "output" is then a directory; "fields" picks the
+                                     CSV columns / JSON paths of a data file
+
+Files are only read and written under --root; without one, outputs stay in
+the input's folder. Requests carrying a browser Origin header are refused.
+
+Models stay loaded between requests. Concurrent requests for the same pair are
+merged into shared translate_batch calls by a MicroBatcher. At most --max-pairs
+pairs are kept; a new one replaces the least recently used pair that no request
+is using.
+"""
+import argparse
+import hmac
+import json
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import ExitStack, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from resource.backends import TranslationBackend, BackendError, create_backend
+from resource.devices import ensure_device_env
+from resource.jobs import DocumentJob, FanOutJob, JobError
+from resource.output import default_output_path
+
+DEFAULT_PORT = 8765
+TOKEN_ENV = "CELOSIA_SERVICE_TOKEN"
+# Language pairs with a loaded model and a batcher thread at the same time
+MAX_PAIRS = 4
+LANGUAGE_CODE_RE = re.compile(r'[a-z]{2,3}')
+
+
+class AccessDenied(Exception):
+    pass
+
+
+class MicroBatcher:
+    """Merges segments from concurrent callers into shared model batches.
+
+    The first request opens a window of `window` seconds; everything submitted
+    before it closes (up to max_batch segments) is translated in one call.
+    """
+
+    def __init__(self, backend, window=0.002, max_batch=64):
+        self.backend = backend
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.segments = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def translate(self, texts):
+        return self.submit(texts).result()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        pending = [first]
+        count = len(first[0])
+        deadline = time.monotonic() + self.window
+        while count < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Let the loop see the stop marker after this batch
+                self._queue.put(None)
+                break
+            pending.append(item)
+            count += len(item[0])
+        return pending
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            pending = self._collect(first)
+            texts = [text for texts, _ in pending for text in texts]
+            try:
+                results = self.backend.translate_batch(texts)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.segments += len(texts)
+            position = 0
+            for texts, future in pending:
+                future.set_result(results[position:position + len(texts)])
+                position += len(texts)
+
+
+class BatchedBackend(TranslationBackend):
+    """Routes a job's translate_batch calls through the shared MicroBatcher"""
+
+    def __init__(self, batcher):
+        super().__init__(batcher.backend.from_code, batcher.backend.to_code)
+        self.batcher = batcher
+        self.loaded = True
+
+    def translate_batch(self, texts):
+        return self.batcher.translate(texts)
+
+
+class EndpointStats:
+    def __init__(self, keep=1000):
+        self.requests = 0
+        self.errors = 0
+        self.segments = 0
+        self.total_latency = 0.0
+        self.latencies = deque(maxlen=keep)
+
+    def record(self, latency, segments, ok):
+        self.requests += 1
+        self.errors += not ok
+        self.segments += segments
+        self.total_latency += latency
+        self.latencies.append(latency)
+
+    def as_dict(self, uptime):
+        ordered = sorted(self.latencies)
+
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else 0.0
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "segments": self.segments,
+            "mean_ms": self.total_latency / self.requests * 1000 if self.requests else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "requests_per_s": self.requests / uptime if uptime else 0.0,
+            "segments_per_s": self.segments / uptime if uptime else 0.0,
+        }
+
+
+class TranslationService:
+    """Keeps one warm backend + MicroBatcher per language pair, for up to max_pairs pairs"""
+
+    def __init__(self, backend="argos", window=0.002, max_batch=64, root=None, max_pairs=MAX_PAIRS,
+                 **backend_options):
+        self.backend_name = backend
+        self.root = os.path.realpath(root) if root else None
+        self.backend_options = backend_options
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pairs = max_pairs
+        self.started = time.monotonic()
+        self.endpoints = {}
+        # Least recently used first, with the number of requests using each one
+        self._batchers = OrderedDict()
+        self._users = {}
+        self._lock = threading.Lock()
+        # Model loads are serialized separately so /stats never waits on one
+        self._load_lock = threading.Lock()
+
+    @contextmanager
+    def batcher(self, from_code, to_code):
+        """The pair's batcher, kept from being evicted until the block ends"""
+        for code in (from_code, to_code):
+            if not isinstance(code, str) or not LANGUAGE_CODE_RE.fullmatch(code):
+                raise ValueError(f"invalid language code {code!r}")
+        key = (from_code, to_code)
+        batcher = self._checkout(key)
+        try:
+            yield batcher
+        finally:
+            with self._lock:
+                self._users[key] -= 1
+
+    def _use(self, key):
+        with self._lock:
+            batcher = self._batchers.get(key)
+            if batcher:
+                self._batchers.move_to_end(key)
+                self._users[key] += 1
+            return batcher
+
+    def _checkout(self, key):
+        batcher = self._use(key)
+        if batcher:
+            return batcher
+
+        with self._load_lock:
+            batcher = self._use(key)
+            if batcher:
+                return batcher
+            self._evict_idle()
+            backend = create_backend(self.backend_name, *key, **self.backend_options)
+            backend.load()
+            batcher = MicroBatcher(backend, self.window, self.max_batch)
+            with self._lock:
+                self._batchers[key] = batcher
+                self._users[key] = 1
+            return batcher
+
+    def _evict_idle(self):
+        """Make room for one more pair by dropping the least recently used idle one"""
+        with self._lock:
+            if len(self._batchers) < self.max_pairs:
+                return
+            key = next((key for key in self._batchers if not self._users[key]), None)
+            if key is None:
+                raise BackendError(f"All {self.max_pairs} language pairs are in use, try again later")
+            batcher = self._batchers.pop(key)
+            del self._users[key]
+        batcher.stop()
+        batcher.backend.close()
+
+    def translate_texts(self, from_code, to_code, texts):
+        with self.batcher(from_code, to_code) as batcher:
+            return batcher.translate(texts)
+
+    def allowed_path(self, path, folder=None):
+        """Real path of path, AccessDenied when it resolves outside the root or folder"""
+        real = os.path.realpath(path)
+        for base in (self.root, folder):
+            if base and os.path.commonpath([real, base]) != base:
+                raise AccessDenied(f"{path} is outside {base}")
+        return real
+
+    def output_folder(self, path):
+        """Where outputs of path may go: anywhere under the root, else the input's folder"""
+        return None if self.root else os.path.dirname(path)
+
+    def translate_file(self, from_code, to_code, path, output=None, fields=None):
+        path = self.allowed_path(path)
+        output = self.allowed_path(output or default_output_path(path, to_code), self.output_folder(path))
+        with self.batcher(from_code, to_code) as batcher:
+            DocumentJob(path, output, BatchedBackend(batcher), fields=fields).run()
+        return output
+
+    def translate_file_fan_out(self, from_code, to_codes, path, directory=None, fields=None):
+        """Parse path once and write one translation per target, returns {to_code: output}"""
+        if len(set(to_codes)) > self.max_pairs:
+            raise ValueError(f"at most {self.max_pairs} target languages per request")
+        path = self.allowed_path(path)
+        directory = self.allowed_path(directory or os.path.dirname(path), self.output_folder(path))
+        outputs = {to_code: default_output_path(path, to_code, directory) for to_code in to_codes}
+        with ExitStack() as stack:
+            targets = [(outputs[to_code], BatchedBackend(stack.enter_context(self.batcher(from_code, to_code))))
+                       for to_code in to_codes]
+            results = FanOutJob(path, targets, max_workers=len(targets), fields=fields).run()
+        failed = [f"{os.path.basename(output)}: {error}" for output, error in results.items() if error]
+        if failed:
+            raise JobError("; ".join(failed))
+        return outputs
+
+    def record(self, endpoint, latency, segments, ok):
+        with self._lock:
+            self.endpoints.setdefault(endpoint, EndpointStats()).record(latency, segments, ok)
+
+    def stats(self):
+        uptime = time.monotonic() - self.started
+        with self._lock:
+            return {
+                "uptime_s": uptime,
+                "backend": self.backend_name,
+                "endpoints": {name: s.as_dict(uptime) for name, s in self.endpoints.items()},
+                "batchers": {
+                    f"{f}_{t}": {
+                        "batches": b.batches,
+                        "segments": b.segments,
+                        "mean_batch": b.segments / b.batches if b.batches else 0.0,
+                    }
+                    for (f, t), b in self._batchers.items()
+                },
+            }
+
+    def close(self):
+        with self._lock:
+            for batcher in self._batchers.values():
+                batcher.stop()
+                batcher.backend.close()
+            self._batchers.clear()
+            self._users.clear()
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    server_version = "celosia"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self.send_json(200, self.service.stats())
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        handlers = {
+            "/translate": self.handle_translate,
+            "/translate/file": self.handle_translate_file,
+        }
+        handler = handlers.get(self.path)
+        if handler is None:
+            self.send_json(404, {"error": "Not found"})
+            return
+        # A web page can POST here, but it cannot set the token header without a CORS preflight this server refuses
+        if self.headers.get("Origin"):
+            self.send_json(403, {"error": "Cross-origin requests are not allowed"})
+            return
+        if not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {self.server.token}"):
+            self.send_json(401, {"error": "Missing or wrong token"})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self.send_json(415, {"error": "Content-Type must be application/json"})
+            return
+
+        start = time.perf_counter()
+        segments = 0
+        ok = False
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            from_code, to_code = request["from"], request["to"]
+            segments, payload = handler(request, from_code, to_code)
+            ok = True
+            self.send_json(200, payload)
+        except (KeyError, TypeError, ValueError) as e:
+            self.send_json(400, {"error": f"Bad request: {str(e)}"})
+        except AccessDenied as e:
+            self.send_json(403, {"error": str(e)})
+        except (BackendError, JobError) as e:
+            self.send_json(422, {"error": str(e)})
+        except Exception as e:
+            self.send_json(500, {"error": str(e)})
+        finally:
+            self.service.record(self.path, time.perf_counter() - start, segments, ok)
+
+    def handle_translate(self, request, from_code, to_code):
+        if "texts" in request:
+            texts = request["texts"]
+            if not isinstance(texts, list):
+                raise TypeError("texts must be a list")
+            return len(texts), {"translations": self.service.translate_texts(from_code, to_code, texts)}
+        text = request["text"]
+        return 1, {"translation": self.service.translate_texts(from_code, to_code, [text])[0]}
+
+    def handle_translate_file(self, request, from_code, to_code):
+        if isinstance(to_code, list):
+            outputs = self.service.translate_file_fan_out(from_code, to_code, request["path"], request.get("output"),
+                                                          request.get("fields"))
+            return len(outputs), {"outputs": outputs}
+        output = self.service.translate_file(from_code, to_code, request["path"], request.get("output"),
+                                             request.get("fields"))
+        return 1, {"output": output}
+
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT, verbose=False, token=None):
+    """The server for service; POSTs need token, a random one when None"""
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    server.token = token or secrets.token_urlsafe(24)
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP translation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--backend", default="argos", choices=["argos", "ctranslate2", "fake"])
+    parser.add_argument("--window-ms", type=float, default=2.0, help="micro-batching window")
+    parser.add_argument("--max-batch", type=int, default=64, help="segments per model batch")
+    parser.add_argument("--root", help="directory files may be read from and written to")
+    parser.add_argument("--max-pairs", type=int, default=MAX_PAIRS, help="language pairs kept loaded at once")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                        help=f"bearer token for POST requests, defaults to ${TOKEN_ENV} or a random one")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.backend != "fake":
+        # Importing the config points Argos Translate at the application's models directory
+        import resource.config
+        ensure_device_env()
+
+    service = TranslationService(args.backend, args.window_ms / 1000, args.max_batch, args.root, args.max_pairs)
+    server = make_server(service, args.host, args.port, args.verbose, args.token)
+    print(f"Serving {args.backend} translations on http://{args.host}:{server.server_port}")
+    if not args.token:
+        print(f"Token: {server.token}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""SubRip (.srt) and WebVTT (.vtt) reading and writing, independent of Qt.
+
+Files are read as a stream of blank-line separated blocks. A cue block keeps
+its number/identifier and timing lines verbatim, only the text below the
+timing line is translated. Blocks without timing (the WEBVTT header, NOTE,
+STYLE and REGION blocks) are written back unchanged.
+"""
+import re
+
+SUBTITLE_EXTENSIONS = ('.srt', '.vtt')
+
+TIMING_MARK = '-->'
+
+# Cues merged into one segment at most when a sentence runs across cues
+MAX_MERGED_CUES = 3
+
+SENTENCE_END_RE = re.compile(r'[.!?…。！？♪]["\'»”’)\]]*$')
+
+# Styling around the whole cue text: <i>, <b>, <u>, <font ...>, <c.class> and {\an8}-like overrides
+LEADING_TAGS_RE = re.compile(r'^(?:\s*(?:<[a-zA-Z][^>]*>|\{\\[^}]*\}))+')
+TRAILING_TAGS_RE = re.compile(r'(?:</[a-zA-Z][^>]*>\s*)+$')
+
+
+class Block:
+    """One block of a subtitle file; header holds the lines up to the timing line"""
+
+    __slots__ = ("header", "lines", "trailing", "size")
+
+    def __init__(self, header, lines, size=0):
+        self.header = header
+        self.lines = lines
+        self.trailing = 0
+        self.size = size
+
+    @property
+    def is_cue(self):
+        return self.lines is not None
+
+    @property
+    def text(self):
+        """Cue text on one line, without the styling tags around it"""
+        if not self.is_cue:
+            return ""
+        _, text, _ = self.styled_text()
+        return text
+
+    def styled_text(self):
+        """(leading tags, plain text, trailing tags); tags inside the text are left alone"""
+        text = " ".join(line.strip() for line in self.lines if line.strip())
+        leading = LEADING_TAGS_RE.match(text)
+        prefix = leading.group(0) if leading else ""
+        trailing = TRAILING_TAGS_RE.search(text, len(prefix))
+        suffix = trailing.group(0) if trailing else ""
+        return prefix, text[len(prefix):len(text) - len(suffix)].strip(), suffix
+
+
+def _make_block(lines, size):
+    for index, line in enumerate(lines):
+        if TIMING_MARK in line:
+            return Block(lines[:index + 1], lines[index + 1:], size)
+    return Block(lines, None, size)
+
+
+def read_blocks(path):
+    """Yield the blocks of a subtitle file as it is read"""
+    lines = []
+    size = 0
+    pending = None
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for raw in f:
+            line = raw.rstrip('\n')
+            size += len(raw.encode('utf-8'))
+            if not line.strip():
+                if lines:
+                    pending = _make_block(lines, size)
+                    lines, size = [], 0
+                if pending is not None:
+                    pending.trailing += 1
+                continue
+            if pending is not None:
+                yield pending
+                pending = None
+            lines.append(line)
+    if lines:
+        pending = _make_block(lines, size)
+    if pending is not None:
+        yield pending
+
+
+def group_cues(blocks, merge=False):
+    """Yield lists of blocks that are translated as one segment.
+
+    Without merge every block is its own group. With merge, consecutive cues
+    whose text does not end a sentence are joined with the following ones,
+    up to MAX_MERGED_CUES, so the model sees whole sentences.
+    """
+    group = []
+    for block in blocks:
+        if not merge or not block.is_cue:
+            if group:
+                yield group
+                group = []
+            yield [block]
+            continue
+
+        group.append(block)
+        if len(group) >= MAX_MERGED_CUES or SENTENCE_END_RE.search(block.text):
+            yield group
+            group = []
+    if group:
+        yield group
+
+
+def group_text(group):
+    return " ".join(block.text for block in group if block.text)
+
+
+def split_translation(text, group):
+    """Spread the translation of a merged group over its cues, in proportion to their source words"""
+    cues = [block for block in group if block.is_cue]
+    if len(cues) <= 1:
+        return [text] * len(cues)
+
+    words = text.split()
+    weights = [max(1, len(block.text.split())) for block in cues]
+    total = sum(weights)
+    parts = []
+    start = 0
+    covered = 0
+    for index, weight in enumerate(weights):
+        covered += weight
+        end = len(words) if index == len(weights) - 1 else round(len(words) * covered / total)
+        parts.append(" ".join(words[start:end]))
+        start = end
+    return parts
+
+
+def wrap_lines(text, count):
+    """Break text into count lines of similar length, as the source cue had"""
+    words = text.split()
+    if count <= 1 or len(words) <= 1:
+        return [text]
+
+    target = len(text) / count
+    lines = []
+    current = []
+    for word in words:
+        if current and len(lines) < count - 1 and len(" ".join(current + [word])) > target:
+            lines.append(" ".join(current))
+            current = []
+        current.append(word)
+    lines.append(" ".join(current))
+    return lines
+
+
+def format_block(block, translation=None):
+    """The block as it goes to the output file, cue text replaced by translation"""
+    lines = block.header
+    if block.is_cue:
+        if translation:
+            prefix, _, suffix = block.styled_text()
+            wrapped = wrap_lines(translation, len(block.lines))
+            wrapped[0] = prefix + wrapped[0]
+            wrapped[-1] = wrapped[-1] + suffix
+            lines = lines + wrapped
+        else:
+            lines = lines + block.lines
+    return "\n".join(lines) + "\n" + "\n" * block.trailing
+
+
+def format_group(group, translation):
+    parts = iter(split_translation(translation, group))
+    return "".join(format_block(block, next(parts) if block.is_cue else None) for block in group)
@@ -0,0 +1,200 @@
+"""Row-by-row translation of CSV/TSV and JSON Lines data exports, independent of Qt.
+
+Only the chosen columns (CSV) or JSON paths (JSONL) are translated; every
+other value, the column order and the row order stay as they are. Rows are
+read and written as a stream, so memory does not grow with the file.
+
+Field syntax: a CSV column is given by its header name or 1-based number. A
+JSON path is dot separated, with [] standing for every item of a list, e.g.
+"title", "details.description" or "variants[].name". Without fields every
+text value is translated.
+"""
+import csv
+import json
+import re
+
+DATA_EXTENSIONS = ('.csv', '.tsv', '.jsonl', '.ndjson')
+
+# Rows held in one batch at most, also when they have few cells to translate
+MAX_BATCH_ROWS = 1024
+
+# Values that are codes, numbers, links or addresses rather than prose
+LETTER_RE = re.compile(r'[^\W\d_]')
+NOT_PROSE_RE = re.compile(r'^(?:https?://|www\.|\S+@\S+\.\S+$)')
+
+
+def parse_fields(value):
+    """Fields from a comma separated setting or a list"""
+    if isinstance(value, str):
+        value = value.split(",")
+    return [field.strip() for field in value if field.strip()]
+
+
+def is_translatable_value(value):
+    return isinstance(value, str) and bool(LETTER_RE.search(value)) and not NOT_PROSE_RE.match(value.strip())
+
+
+class CsvTable:
+    """Rows of a CSV/TSV file; a ref is (row list, column index)"""
+
+    def __init__(self, path, fields=None):
+        self.path = path
+        self.fields = parse_fields(fields or [])
+        self.dialect = None
+
+    def _sniff(self, f):
+        sample = f.read(64 * 1024)
+        f.seek(0)
+        if self.path.lower().endswith('.tsv'):
+            return csv.excel_tab
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            return csv.excel
+
+    def _columns(self, header):
+        if not self.fields:
+            return list(range(len(header)))
+        columns = []
+        for field in self.fields:
+            if field in header:
+                columns.append(header.index(field))
+            elif field.isdigit() and 0 < int(field) <= len(header):
+                columns.append(int(field) - 1)
+        return columns
+
+    def rows(self):
+        """Yield (approximate size in bytes, row, refs); the header row has no refs"""
+        with open(self.path, 'r', encoding='utf-8-sig', newline='') as f:
+            self.dialect = self._sniff(f)
+            reader = csv.reader(f, self.dialect)
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = self._columns(header)
+            yield len(",".join(header).encode('utf-8')) + 1, header, []
+            for row in reader:
+                refs = [(row, index) for index in columns if index < len(row) and is_translatable_value(row[index])]
+                yield len(",".join(row).encode('utf-8')) + 1, row, refs
+
+    def writer(self, f):
+        writer = csv.writer(f, self.dialect or csv.excel)
+        return writer.writerow
+
+
+def _json_refs(value, parts):
+    """(container, key) of every string under value that parts point at"""
+    if not parts:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if isinstance(item, str):
+                    yield value, key
+                else:
+                    yield from _json_refs(item, parts)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, str):
+                    yield value, index
+                else:
+                    yield from _json_refs(item, parts)
+        return
+
+    part, rest = parts[0], parts[1:]
+    each = part.endswith("[]")
+    key = part[:-2] if each else part
+    if not isinstance(value, dict) or key not in value:
+        return
+    if not each:
+        if not rest and isinstance(value[key], str):
+            yield value, key
+        elif rest:
+            yield from _json_refs(value[key], rest)
+        return
+    items = value[key]
+    if not isinstance(items, list):
+        return
+    for index, item in enumerate(items):
+        if not rest and isinstance(item, str):
+            yield items, index
+        elif rest:
+            yield from _json_refs(item, rest)
+
+
+class RawLine:
+    """A line of a JSON Lines file copied unchanged, told apart from a record that is a JSON string"""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class JsonLinesTable:
+    """Records of a JSON Lines file; a ref is (dict or list, key or index)"""
+
+    def __init__(self, path, fields=None):
+        self.path = path
+        self.paths = [field.split(".") for field in parse_fields(fields or [])]
+
+    def rows(self):
+        """Yield (size in bytes, record, refs); blank lines and lines that are not JSON come as a RawLine"""
+        with open(self.path, 'r', encoding='utf-8-sig') as f:
+            for number, line in enumerate(f, 1):
+                size = len(line.encode('utf-8'))
+                if not line.strip():
+                    yield size, RawLine(line.rstrip('\n')), []
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"Line {number} is not valid JSON, copied unchanged")
+                    yield size, RawLine(line.rstrip('\n')), []
+                    continue
+                if self.paths:
+                    refs = [ref for path in self.paths for ref in _json_refs(record, path)]
+                else:
+                    refs = list(_json_refs(record, []))
+                yield size, record, [(c, k) for c, k in refs if is_translatable_value(c[k])]
+
+    def writer(self, f):
+        def write(record):
+            f.write(record.text if isinstance(record, RawLine) else json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+        return write
+
+
+def open_table(path, fields=None):
+    if path.lower().endswith(('.csv', '.tsv')):
+        return CsvTable(path, fields)
+    return JsonLinesTable(path, fields)
+
+
+def row_batches(table, batch_cells):
+    """Yield (bytes read, rows, unique texts) with about batch_cells distinct values per batch.
+
+    Repeated values inside a batch (categories, statuses, boilerplate) reach
+    the model once.
+    """
+    done = 0
+    rows = []
+    texts = {}
+    for size, record, refs in table.rows():
+        done += size
+        rows.append((record, refs))
+        for container, key in refs:
+            texts.setdefault(container[key])
+        if len(texts) >= batch_cells or len(rows) >= MAX_BATCH_ROWS:
+            yield done, rows, list(texts)
+            rows = []
+            texts = {}
+    if rows:
+        yield done, rows, list(texts)
+
+
+def apply_row_translations(rows, texts, translated, write):
+    """Put the translations into the rows and write them out in order"""
+    mapping = dict(zip(texts, translated))
+    for record, refs in rows:
+        for container, key in refs:
+            container[key] = mapping.get(container[key], container[key]) or container[key]
+        write(record)
@@ -0,0 +1,132 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# CELOSIA_TRACE=1 turns tracing on, any other non-empty value is used as the output directory
+TRACE_ENV = "CELOSIA_TRACE"
+DEFAULT_TRACE_DIR = "traces"
+
+
+def trace_dir_from_env():
+    value = os.environ.get(TRACE_ENV, "").strip()
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return None
+    if value.lower() in ("1", "true", "yes", "on"):
+        return DEFAULT_TRACE_DIR
+    return value
+
+
+class Tracer:
+    """Collects timed spans of one job and exports them as Chrome trace events.
+
+    Disabled tracers keep the same API but record nothing, so call sites never
+    need to check whether tracing is on.
+    """
+
+    def __init__(self, name, enabled=False, output_dir=None):
+        env_dir = trace_dir_from_env()
+        self.name = name
+        self.enabled = enabled or env_dir is not None
+        self.output_dir = output_dir or env_dir or DEFAULT_TRACE_DIR
+        self.events = []
+        self.notes = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    @contextmanager
+    def span(self, name, **args):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.events.append({
+                "name": name,
+                "cat": self.name,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            })
+
+    def counter(self, name, **values):
+        """Record a sampled value, e.g. a queue depth, shown as a track in the trace viewer"""
+        if not self.enabled:
+            return
+        self.events.append({
+            "name": name,
+            "cat": self.name,
+            "ph": "C",
+            "ts": (time.perf_counter() - self._origin) * 1e6,
+            "pid": self._pid,
+            "args": values,
+        })
+
+    def note(self, text):
+        """Extra lines appended to the summary"""
+        if self.enabled:
+            self.notes.append(text)
+
+    def report(self, text):
+        """Print text whether or not tracing is on, and keep it for the summary when it is"""
+        print(text)
+        self.note(text)
+
+    def summary(self):
+        """Per-stage table: calls, total and mean time, share of the whole job"""
+        spans = [event for event in self.events if event["ph"] == "X"]
+        if not spans:
+            return f"Trace {self.name}: no spans recorded"
+
+        stages = {}
+        for event in spans:
+            calls, total = stages.get(event["name"], (0, 0.0))
+            stages[event["name"]] = (calls + 1, total + event["dur"] / 1000)
+
+        wall = (max(e["ts"] + e["dur"] for e in spans) - min(e["ts"] for e in spans)) / 1000
+        lines = [
+            f"Trace {self.name} ({wall:.1f} ms)",
+            f"{'stage':<24}{'calls':>7}{'total ms':>12}{'mean ms':>11}{'share':>8}",
+        ]
+        for stage, (calls, total) in sorted(stages.items(), key=lambda item: -item[1][1]):
+            share = total / wall if wall else 0
+            lines.append(f"{stage:<24}{calls:>7}{total:>12.1f}{total / calls:>11.1f}{share:>8.1%}")
+        return "\n".join(lines + self.notes)
+
+    def write_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        return path
+
+    def finish(self):
+        """Write the trace and its summary table, return the trace path (None when disabled)"""
+        if not self.enabled:
+            return None
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stem = re.sub(r"[^\w.-]+", "_", self.name).strip("_") or "trace"
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            path = os.path.join(self.output_dir, f"{stamp}-{stem}.json")
+            self.write_chrome_trace(path)
+
+            summary = self.summary()
+            with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+                f.write(summary + "\n")
+            print(summary)
+            return path
+        except Exception as e:
+            print(f"Error writing trace: {str(e)}")
+            return None
+
+
+NULL_TRACER = Tracer("null")
+NULL_TRACER.enabled = False
@@ -1,220 +1,158 @@
-import os
-import argostranslate.package
-import argostranslate.translate
-from docx import Document
-from docx.oxml.ns import qn
-from docx.text.paragraph import Paragraph
-from docx.text.run import Run
-from docx.oxml import OxmlElement, CT_R, CT_P
-from PyQt6.QtCore import QThread, pyqtSignal, QMutex
+from PyQt6.QtCore import QThread, pyqtSignal, QMutex, QTimer
 from qfluentwidgets import InfoBar
+from resource import jobspec
+from resource.engine import EngineProcess
+from resource.interactive import split_sentences, translate_pieces
+from resource.memory import MEMORY_PATH, TranslationMemory, import_tmx, export_tmx
+from resource.output import default_output_path, remove_partial_outputs
+
+# Language pairs remembered for preloading at startup, most recent first
+RECENT_PACKAGES = 4
 
 class TranslationWorker(QThread):
-    request_save_path = pyqtSignal(str, str)
+    """Hands one job to the engine process and relays its progress and result"""
     finished_signal = pyqtSignal(str, bool)
+    progress_signal = pyqtSignal(int, int)
+    preview_signal = pyqtSignal(list)
+
+    # How long a cancelled job may take to reach its next batch before the engine is killed
+    CANCEL_GRACE_MS = 500
 
-    def __init__(self, input_path, from_code, to_code):
+    def __init__(self, engine, job):
         super().__init__()
-        self.input_path = input_path
-        self.from_code = from_code
-        self.to_code = to_code
+        self.engine = engine
+        self.job = job
         self._mutex = QMutex()
         self._abort = False
-        self.save_path = ""
-        self.translated_content = ""
 
     def run(self):
         try:
-            if not os.path.exists(self.input_path):
-                self.finished_signal.emit("Input file not found", False)
-                return
-
-            # Read and parse the file
-            file_extension = os.path.splitext(self.input_path)[1].lower()
-            if file_extension == '.txt':
-                content = self._parse_txt(self.input_path)
-            elif file_extension == '.docx':
-                content = self._parse_docx(self.input_path)
-            else:
-                self.finished_signal.emit("Unsupported file format", False)
-                return
-
-            if not content:
-                self.finished_signal.emit("No content found to translate", False)
-                return
-
-            # Initialize translation
-            installed_languages = argostranslate.translate.get_installed_languages()
-            from_lang = next((lang for lang in installed_languages if lang.code == self.from_code), None)
-            to_lang = next((lang for lang in installed_languages if lang.code == self.to_code), None)
-
-            if not from_lang or not to_lang:
-                self.finished_signal.emit("Required language package not installed", False)
-                return
-
-            translation = from_lang.get_translation(to_lang)
-            if not translation:
-                self.finished_signal.emit("Translation between these languages not available", False)
-                return
-
-            # Translate content
-            self._mutex.lock()
-            if file_extension == '.txt':
-                translated_text = translation.translate(content)
-            if file_extension == '.docx':
-                translated_text = translation.translate(content)
-            self._mutex.unlock()
-
-            # Request save path
-            base_name = os.path.splitext(os.path.basename(self.input_path))[0]
-            default_name = f"{base_name}_translated_{self.to_code}{file_extension}"
-            self.request_save_path.emit(default_name, translated_text)
-
-            # Wait for save path or abort
-            while not self._abort and not self.save_path:
-                self.msleep(100)
-
-            if self._abort:
-                return
-
-            if self.save_path:
-                if file_extension == '.txt':
-                    with open(self.save_path, 'w', encoding='utf-8') as f:
-                        f.write(translated_text)
-                elif file_extension == '.docx':
-                    self._translate_docx(translated_text, self.save_path)
-
-                self.finished_signal.emit(self.save_path, True)
-            else:
-                self.finished_signal.emit("", False)
-
+            result, success = self.engine.run_job(self.job, self.progress_signal.emit, self.preview_signal.emit)
         except Exception as e:
-            self.finished_signal.emit(f"Error during translation or saving: {str(e)}", False)
+            result, success = f"Error during translation or saving: {str(e)}", False
+
+        if not self._abort:
+            self.finished_signal.emit(result, success)
+
+    def abort(self):
+        self._mutex.lock()
+        self._abort = True
+        self._mutex.unlock()
+        if self.isRunning():
+            self.engine.cancel()
+            if not self.wait(self.CANCEL_GRACE_MS):
+                # Stuck inside a decode: the only way out is a fresh engine
+                self.engine.kill()
+                self.wait()
+                for save_path in self.save_paths():
+                    remove_partial_outputs(save_path)
+
+    def save_paths(self):
+        return jobspec.output_paths(self.job)
+
 
-    def _parse_txt(self, path):
+class MemoryTransferThread(QThread):
+    """Imports a TMX file into the translation memory, or exports the memory to one"""
+    transferred = pyqtSignal(int, str)
+
+    def __init__(self, tmx_path, export=False, memory_path=MEMORY_PATH, parent=None):
+        super().__init__(parent)
+        self.tmx_path = tmx_path
+        self.export = export
+        self.memory_path = memory_path
+
+    def run(self):
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return f.read()
+            memory = TranslationMemory(self.memory_path)
+            if self.export:
+                count = export_tmx(memory, self.tmx_path)
+            else:
+                count = import_tmx(self.tmx_path, memory)
+            self.transferred.emit(count, "")
         except Exception as e:
-            print(f"Error reading .txt file: {str(e)}")
-            return ""
+            self.transferred.emit(0, str(e))
+
+
+class TextTranslationWorker(QThread):
+    """Translates one revision of the text panel in the engine"""
+    translated = pyqtSignal(int, str, str)
 
-    def _parse_docx(self, path):
+    def __init__(self, engine, spec, text, revision, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.spec = spec
+        self.text = text
+        self.revision = revision
+
+    def run(self):
+        pieces = split_sentences(self.text)
         try:
-            doc = Document(path)
-            self.original_doc = doc
-            self.translatable_paragraphs = []
-
-            texts_to_translate = []
-            for para in doc.paragraphs:
-                if self._has_translatable_text(para):
-                    self.translatable_paragraphs.append(para)
-                    texts_to_translate.append(para.text)
-            return '\n'.join(texts_to_translate)
+            translations, error = self.engine.translate_sentences(self.spec, pieces[::2])
         except Exception as e:
-            print(f"Error reading .docx file: {str(e)}")
-            return ""
-
-    def _has_translatable_text(self, para):
-        # Allow paragraphs that have at least one text run
-        return any(run.text.strip() for run in para.runs if not self._is_non_text_run(run))
-    
-    def _translate_docx(self, translated_text, save_path):
-        if not hasattr(self, 'original_doc') or not hasattr(self, 'translatable_paragraphs'):
-            return
+            translations, error = [], str(e)
+        self.translated.emit(self.revision, "" if error else translate_pieces(pieces, translations), error)
 
-        translated_lines = translated_text.split('\n')
-        
-        for para, trans_line in zip(self.translatable_paragraphs, translated_lines):
-            if not para.runs or not trans_line:
-                continue
-
-            # Separate translatable and non-translatable runs
-            translatable_runs = []
-            non_translatable_runs = []
-            for run in para.runs:
-                if self._is_translatable_run(run):
-                    translatable_runs.append(run)
-                else:
-                    non_translatable_runs.append(run)
-
-            # If we have translatable runs, replace their text with translation
-            if translatable_runs:
-                # Clear all translatable runs first
-                for run in translatable_runs:
-                    run.text = ""
-                
-                # Put all translated text in the first translatable run
-                translatable_runs[0].text = trans_line
-                
-                # Preserve non-translatable runs (hyperlinks, etc.)
-                # They maintain their original position and content
-
-        self.original_doc.save(save_path)
-
-    def _is_translatable_run(self, run):
-        """More accurate detection of translatable runs"""
-        if not run.text.strip():
-            return False
-            
-        xml = run._element.xml
-        # Explicitly skip these elements
-        skip_tags = {
-            '<w:hyperlink',  # Hyperlinks
-            '<w:instrText', # Field codes
-            '<w:fldChar',    # Field characters
-            '<w:drawing',    # Drawings
-            '<w:pict',       # Pictures
-            '<m:oMath',      # Math formulas
-            '<w:footnote',   # Footnotes
-            '<w:endnote',    # Endnotes
-            '<m:sup',        # Superscript
-            '<m:sub',        # subscript
-            '<m:frac',       # a fraction
-            '<m:msup',       # mathematical superscript
-            '<a:blip',       # bitmap image
-            '<a:shape',      # a shape
-            '<a:groupShape', # a group of shapes
-            '<a:line',       # a line shape
-        }
-        
-        return not any(tag in xml for tag in skip_tags)
-
-
-
-    def _is_non_text_run(self, run):
-        """Returns True if the run contains drawing or hyperlink content"""
-        xml = run._element.xml
-
-        skip_tags = {
-            '<w:hyperlink',  # Hyperlinks
-            '<w:instrText', # Field codes
-            '<w:fldChar',    # Field characters
-            '<w:drawing',    # Drawings
-            '<w:pict',       # Pictures
-            '<m:oMath',      # Math formulas
-            '<w:footnote',   # Footnotes
-            '<w:endnote',    # Endnotes
-            '<m:sup',        # Superscript
-            '<m:sub',        # subscript
-            '<m:frac',       # a fraction
-            '<m:msup',       # mathematical superscript
-            '<a:blip',       # bitmap image
-            '<a:shape',      # a shape
-            '<a:groupShape', # a group of shapes
-            '<a:line',       # a line shape
-        }
-
-        #return ('<w:drawing' in xml or '<w:pict' in xml or '<w:hyperlink' in xml or '<w:instrText' in xml)
-        return any(tag in xml for tag in skip_tags)
 
+class TextTranslator:
+    """Translate-as-you-type for the text panel.
 
+    Typing restarts a short timer and only a pause in typing sends the text.
+    One request is in flight at a time; text typed meanwhile is sent when it
+    returns, so the panel never falls behind by more than one pass.
+    """
 
-    def abort(self):
-        self._mutex.lock()
-        self._abort = True
-        self._mutex.unlock()
-        self.wait(500)
+    DEBOUNCE_MS = 300
+
+    def __init__(self, parent_window, cfg, file_translator):
+        self.parent = parent_window
+        self.cfg = cfg
+        self.file_translator = file_translator
+        self.text = ""
+        self.revision = 0
+        self.busy = False
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DEBOUNCE_MS)
+        self.timer.timeout.connect(self.translate_now)
+
+    def text_changed(self, text):
+        self.text = text
+        self.revision += 1
+        self.timer.start()
+
+    def translate_now(self):
+        if self.busy:
+            return
+        lang_pair = self.cfg.get(self.cfg.package).value
+        if lang_pair == 'None':
+            self.parent.on_text_translated("", "No translation package selected. Please select one in Settings.")
+            return
+        if not self.text.strip():
+            self.parent.on_text_translated("", "")
+            return
+
+        self.busy = True
+        # Parented to the window, so replacing it never destroys a thread that is still finishing
+        worker = TextTranslationWorker(
+            self.file_translator.engine, self.file_translator.preload_spec(lang_pair), self.text, self.revision,
+            parent=self.parent
+        )
+        worker.translated.connect(self.on_translated)
+        worker.finished.connect(worker.deleteLater)
+        self.worker = worker
+        worker.start()
+
+    def on_translated(self, revision, text, error):
+        self.busy = False
+        self.parent.on_text_translated(text, error)
+        if revision != self.revision:
+            # The text changed while this pass ran
+            self.translate_now()
+
+    def shutdown(self):
+        self.timer.stop()
+        if self.busy:
+            self.worker.wait()
 
 
 class FileTranslator:
@@ -222,6 +160,9 @@ class FileTranslator:
         self.parent = parent_window
         self.cfg = cfg
         self.current_file_path = None
+        self.engine = EngineProcess()
+        # Watched files get their own process, cancelling or killing a GUI job never hits them
+        self.watch_engine = None
 
     def start_translation_process(self, file_path):
         if self.cfg.get(self.cfg.package).value == 'None':
@@ -232,21 +173,87 @@ class FileTranslator:
             )
             return
 
+        # Settle the destination before any work starts
+        save_path = self.resolve_save_path(file_path)
+        if not save_path:
+            self.parent.return_to_filepicker()
+            return
+
         self.current_file_path = file_path
+        self.remember_package(self.cfg.get(self.cfg.package).value)
         self.parent.progressbar.start()
 
         if hasattr(self, 'translation_worker'):
             self.translation_worker.abort()
             self.translation_worker.deleteLater()
 
-        self.translate_file(file_path)
+        self.translate_file(file_path, save_path)
 
-    def translate_file(self, file_path):
-        """Start translation process"""
-        lang_pair = self.cfg.get(self.cfg.package).value
-        from_code, to_code = lang_pair.split('_')
+    def resolve_save_path(self, file_path):
+        """Output path according to the output policy, empty if the user cancelled"""
+        to_code = self.cfg.get(self.cfg.package).value.split('_')[1]
+        policy = self.cfg.get(self.cfg.outputPolicy)
+        folder = self.cfg.get(self.cfg.outputFolder)
 
-        self.translation_worker = TranslationWorker(file_path, from_code, to_code)
-        self.translation_worker.request_save_path.connect(self.parent.handle_translation_save_path)
+        if policy == 'source':
+            return default_output_path(file_path, to_code)
+        if policy == 'folder' and folder:
+            return default_output_path(file_path, to_code, folder)
+        return self.parent.ask_save_path(default_output_path(file_path, to_code, self.parent.last_directory))
+
+    def translate_file(self, file_path, save_path):
+        """Start translation process"""
+        self.translation_worker = TranslationWorker(self.engine, self.build_job(file_path, save_path))
         self.translation_worker.finished_signal.connect(self.parent.on_translation_done)
+        self.translation_worker.progress_signal.connect(self.parent.on_translation_progress)
+        self.translation_worker.preview_signal.connect(self.parent.on_translation_preview)
         self.translation_worker.start()
+
+    def translate_watched(self, file_path, output_folder):
+        """Translate a file from the watched folder with the selected package, blocks until done"""
+        to_code = self.cfg.get(self.cfg.package).value.split('_')[1]
+        job = self.build_job(file_path, default_output_path(file_path, to_code, output_folder))
+        if self.watch_engine is None:
+            self.watch_engine = EngineProcess()
+        result, success = self.watch_engine.run_job(job)
+        return result, success, jobspec.output_paths(job)
+
+    def build_job(self, file_path, save_path):
+        return jobspec.build_job(self.cfg, file_path, save_path)
+
+    def remember_package(self, lang_pair):
+        recent = [lang_pair] + [pair for pair in self.cfg.get(self.cfg.recentPackages) if pair != lang_pair]
+        self.cfg.set(self.cfg.recentPackages, recent[:RECENT_PACKAGES])
+
+    def preload_spec(self, lang_pair):
+        return jobspec.preload_spec(self.cfg, lang_pair)
+
+    def preload_selected(self):
+        """Load the selected package's model in the engine before any file is dropped"""
+        lang_pair = self.cfg.get(self.cfg.package).value
+        if self.cfg.get(self.cfg.preloadModels) and lang_pair != 'None':
+            self.engine.preload([self.preload_spec(lang_pair)])
+
+    def preload_recent(self):
+        """At startup: the selected package, then the most recently used ones while they fit the memory budget"""
+        if not self.cfg.get(self.cfg.preloadModels):
+            return
+        selected = self.cfg.get(self.cfg.package).value
+        pairs = [selected] if selected != 'None' else []
+        pairs += [pair for pair in self.cfg.get(self.cfg.recentPackages) if pair not in pairs]
+        budget = self.cfg.get(self.cfg.preloadBudget) * 1024 * 1024
+        if pairs and budget:
+            self.engine.preload([self.preload_spec(pair) for pair in pairs], budget)
+
+    def reconfigure(self):
+        self.engine.reconfigure(jobspec.compute_settings(self.cfg))
+        if self.watch_engine is not None:
+            self.watch_engine.reconfigure(jobspec.compute_settings(self.cfg))
+
+    def shutdown(self):
+        """Cancel any running job and stop the engine process"""
+        if hasattr(self, 'translation_worker'):
+            self.translation_worker.abort()
+        self.engine.shutdown()
+        if self.watch_engine is not None:
+            self.watch_engine.shutdown()
@@ -0,0 +1,79 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from PyQt6.QtCore import QObject, QTimer
+
+# CELOSIA_STALL_MS=<threshold> turns the watchdog on without touching the settings
+STALL_ENV = "CELOSIA_STALL_MS"
+
+
+def stall_threshold_from_env():
+    try:
+        return int(os.environ.get(STALL_ENV, "")) or None
+    except ValueError:
+        return None
+
+
+class EventLoopWatchdog(QObject):
+    """Measures Qt event-loop latency and reports stalls with the blocking stack.
+
+    A QTimer on the GUI thread records a heartbeat every interval. A plain
+    Python thread watches the heartbeat; once it is older than the threshold it
+    grabs the GUI thread's current Python stack, which is the code holding up
+    the event loop. The stall is printed when the loop comes back.
+    """
+
+    def __init__(self, threshold_ms=200, interval_ms=50, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.beats = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = []
+        self._gui_thread = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stack = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._monitor, name="event-loop-watchdog", daemon=True)
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._beat)
+
+    def start(self):
+        self._last_beat = time.perf_counter()
+        self._timer.start()
+        self._thread.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._stopped.set()
+
+    def _beat(self):
+        now = time.perf_counter()
+        gap = now - self._last_beat
+        lag = max(0.0, gap - self.interval)
+        self.beats += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+        stack, self._stack = self._stack, None
+        if stack is not None:
+            self.stalls.append((gap, stack))
+            print(f"Event loop stalled for {gap * 1000:.0f} ms in:\n{''.join(stack)}", file=sys.stderr)
+        self._last_beat = now
+
+    def _monitor(self):
+        while not self._stopped.wait(self.threshold / 4):
+            if self._stack is None and time.perf_counter() - self._last_beat > self.threshold:
+                frame = sys._current_frames().get(self._gui_thread)
+                if frame is not None:
+                    self._stack = traceback.format_stack(frame)
+
+    def summary(self):
+        mean = self.total_lag / self.beats * 1000 if self.beats else 0.0
+        return (f"Event loop: {self.beats} beats, mean lag {mean:.1f} ms, "
+                f"max lag {self.max_lag * 1000:.0f} ms, {len(self.stalls)} stall(s) "
+                f"over {self.threshold * 1000:.0f} ms")
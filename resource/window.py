@@ -0,0 +1,1461 @@
+import sys, os
+from PyQt6.QtGui import QColor, QIcon
+from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QStackedWidget, QFileDialog, QLabel, QTableWidgetItem, QHeaderView, QAbstractItemView
+from PyQt6.QtCore import Qt, pyqtSignal, QTranslator, QCoreApplication, QTimer, pyqtSlot
+#sys.stdout = open(os.devnull, 'w')
+from qfluentwidgets import setThemeColor, TransparentToolButton, FluentIcon, PushSettingCard, isDarkTheme, SettingCard, MessageBox, FluentTranslator, IndeterminateProgressBar, HeaderCardWidget, BodyLabel, IconWidget, InfoBarIcon, PushButton, SubtitleLabel, ComboBoxSettingCard, OptionsSettingCard, HyperlinkCard, ScrollArea, InfoBar, InfoBarPosition, StrongBodyLabel, Flyout, FlyoutAnimationType, TransparentPushButton, RangeSettingCard, SwitchSettingCard, MessageBoxBase, CheckBox, LineEdit, TableWidget, PlainTextEdit
+from winrt.windows.ui.viewmanagement import UISettings, UIColorType
+from resource.config import cfg, TranslationPackage, PACKAGE_PAIRS
+from resource.argos_utils import update_package, update_device, DeviceProbeThread, PackageIndexThread, PackageScanThread, PackageRemoverThread, BundleInstallThread
+from resource.translator import FileTranslator, TextTranslator, MemoryTransferThread
+from resource.tracing import Tracer
+from resource.watchdog import EventLoopWatchdog, stall_threshold_from_env
+from resource.hotfolder import HotFolder, default_watch_output
+import traceback, gc
+import tempfile
+
+if getattr(sys, 'frozen', False):
+    # Running as a PyInstaller bundle
+    base_dir = os.path.dirname(sys.executable)  # Points to build/
+    res_dir = os.path.join(sys.prefix)
+else:
+    # Running as a script, from the directory main.py is in
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    res_dir = base_dir
+
+class FileLabel(QLabel):
+    fileSelected = pyqtSignal(str)
+
+    def __init__(self, main_window):
+        super().__init__()
+        self.main_window = main_window
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.status_text = "Ready for translation"
+        self.current_file_label = None  # Will store the current QLabel showing file and status
+        self.setText(self.update_text_color())
+        self.setStyleSheet('''
+            QLabel{
+                border: 3px dashed #aaa;
+            }
+        ''')
+        self.setAcceptDrops(True)
+        self.deleted = False
+
+
+    def create_text(self, color, lang):
+        font_size = "16px"
+        if lang == 'RUSSIAN':
+            text = f'''
+            <p style="text-align: center; font-size: {font_size}; color: {color};">
+                <br><br> Перетащите сюда любой PDF, EPUB, TXT или DOCX файл <br>
+                <br>или<br><br>
+                <a href="" style="color: {color};"><strong>Нажмите в любом месте для выбора</strong></a>
+                <br>
+            </p>
+        '''
+        else:
+            text = f'''
+            <p style="text-align: center; font-size: {font_size}; color: {color};">
+                <br><br> Drag&Drop any PDF, EPUB, TXT or DOCX file<br>
+                <br>or<br><br>
+                <a href="" style="color: {color};"><strong>Click anywhere to browse</strong></a>
+                <br>
+            </p>
+        '''
+        return text
+
+    def update_text_color(self):
+        color = 'white' if isDarkTheme() else 'black'
+        lang = cfg.get(cfg.language).name
+        return self.create_text(color, lang)
+
+    def update_theme(self):
+        if not self.deleted:
+            self.setText(self.update_text_color())
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.open_file_dialog()
+
+    def open_file_dialog(self):
+        initial_dir = self.main_window.last_directory if self.main_window.last_directory else ""
+
+        self.file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            QCoreApplication.translate("MainWindow", "Select file"),
+            initial_dir,
+            QCoreApplication.translate("MainWindow",
+                "Text files (*.pdf *.epub *.docx *.txt);;"
+                "Subtitles (*.srt *.vtt);;"
+                "Data exports (*.csv *.tsv *.jsonl *.ndjson);;"
+                "Web pages (*.html *.htm *.xhtml *.md *.markdown);;"
+                "All Files (*)")
+        )
+        if self.file_path:
+            self.main_window.last_directory = os.path.dirname(self.file_path)
+            if self.is_document(self.file_path):
+                self.fileSelected.emit(self.file_path)
+                self.file_accepted(self.file_path)
+            elif self.is_not_supported_document(self.file_path):
+                InfoBar.error(
+                    title=QCoreApplication.translate("MainWindow", "Error"),
+                    content=QCoreApplication.translate("MainWindow", "This file format is not fully supported. Please convert it to .docx and try again"),
+                    orient=Qt.Orientation.Horizontal,
+                    isClosable=True,
+                    position=InfoBarPosition.BOTTOM,
+                    duration=4000,
+                    parent=self.main_window
+                )
+            else:
+                InfoBar.error(
+                    title=QCoreApplication.translate("MainWindow", "Error"),
+                    content=QCoreApplication.translate("MainWindow", "Dropped file is not supported"),
+                    orient=Qt.Orientation.Horizontal,
+                    isClosable=True,
+                    position=InfoBarPosition.BOTTOM,
+                    duration=4000,
+                    parent=self.main_window
+                )
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dragMoveEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        if event.mimeData().hasUrls():
+            for url in event.mimeData().urls():
+                self.file_path = url.toLocalFile()
+                if self.is_document(self.file_path):
+                    self.main_window.last_directory = os.path.dirname(self.file_path)
+
+                    self.fileSelected.emit(self.file_path)
+                    self.file_accepted(self.file_path)
+                elif self.is_not_supported_document(self.file_path):
+                    InfoBar.error(
+                        title=QCoreApplication.translate("MainWindow", "Error"),
+                        content=QCoreApplication.translate("MainWindow", "This file format is not fully supported. Please convert it to .docx and try again"),
+                        orient=Qt.Orientation.Horizontal,
+                        isClosable=True,
+                        position=InfoBarPosition.BOTTOM,
+                        duration=4000,
+                        parent=self.main_window
+                    )
+                else:
+                    InfoBar.error(
+                        title=QCoreApplication.translate("MainWindow", "Error"),
+                        content=QCoreApplication.translate("MainWindow", "Dropped file is not supported"),
+                        orient=Qt.Orientation.Horizontal,
+                        isClosable=True,
+                        position=InfoBarPosition.BOTTOM,
+                        duration=4000,
+                        parent=self.main_window
+                    )
+
+    def update_status_text(self, new_text):
+        """Update the status text and refresh the display"""
+        self.status_text = new_text
+        if self.current_file_label:  # Only update if we have an active file label
+            self.current_file_label.setText(f"<center><strong>{os.path.basename(self.current_file_label.file_path)}</strong><br><br>{new_text}</center>")
+
+    def file_accepted(self, file_path):
+        self.deleted = True
+        self.setStyleSheet("")
+        
+        # Create a styled label to replace this one
+        self.current_file_label = QLabel(f"<center><b>{os.path.basename(file_path)}</b><br><br>{self.status_text}</center>")
+        self.current_file_label.file_path = file_path  # Store the path as an attribute
+        self.current_file_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        
+        # Apply theme-appropriate styling
+        color = 'white' if isDarkTheme() else 'black'
+        self.current_file_label.setStyleSheet(f'''
+            QLabel {{
+                color: {color};
+                font-size: 16px;
+                padding: 20px;
+            }}
+        ''')
+        
+        # Get the parent layout and replace this widget
+        parent = self.parentWidget()
+        if parent:
+            layout = parent.layout()
+            if layout:
+                # Replace the widget at index 0
+                layout.replaceWidget(self, self.current_file_label)
+                self.current_file_label.show()  # Ensure the new label is shown
+                self.deleteLater()  # Delete the old FileLabel widget
+
+        self.main_window.back_button.show()
+        QTimer.singleShot(400, lambda: self.update_status_text("Translating..."))
+        QTimer.singleShot(400, lambda: self.main_window.start_translation_process(file_path))
+              
+
+    def is_document(self, file_path):
+        file_extensions = ['.pdf', '.epub', '.docx', '.txt', '.srt', '.vtt', '.csv', '.tsv', '.jsonl', '.ndjson',
+                           '.html', '.htm', '.xhtml', '.md', '.markdown']
+        _, ext = os.path.splitext(file_path)
+        return ext.lower() in file_extensions
+
+    def is_not_supported_document(self, file_path):
+        file_extensions = ['.doc', '.odt', '.rtf']
+        _, ext = os.path.splitext(file_path)
+        return ext.lower() in file_extensions
+
+class PreviewPane(TableWidget):
+    """Source and translation side by side, filled in as the engine streams finished segments"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setColumnCount(2)
+        self.setHorizontalHeaderLabels([
+            QCoreApplication.translate("MainWindow", "Source"),
+            QCoreApplication.translate("MainWindow", "Translation")
+        ])
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.verticalHeader().hide()
+        self.setWordWrap(True)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.hide()
+
+    def add_pairs(self, pairs):
+        # One layout pass per batch, not per row
+        self.setUpdatesEnabled(False)
+        first = self.rowCount()
+        self.setRowCount(first + len(pairs))
+        for row, (source, translation) in enumerate(pairs, first):
+            self.setItem(row, 0, QTableWidgetItem(source))
+            self.setItem(row, 1, QTableWidgetItem(translation))
+            self.resizeRowToContents(row)
+        self.setUpdatesEnabled(True)
+        self.show()
+
+    def clear_pairs(self):
+        self.setRowCount(0)
+        self.hide()
+
+class TextPanel(QWidget):
+    """Type or paste text on the left, its translation follows on the right"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.source_edit = PlainTextEdit()
+        self.source_edit.setPlaceholderText(QCoreApplication.translate("MainWindow", "Type or paste text to translate"))
+        self.target_edit = PlainTextEdit()
+        self.target_edit.setReadOnly(True)
+        layout.addWidget(self.source_edit)
+        layout.addWidget(self.target_edit)
+        self.hide()
+
+    def show_translation(self, text, error):
+        self.target_edit.setPlaceholderText(error)
+        self.target_edit.setPlainText(text)
+
+class FanOutDialog(MessageBoxBase):
+    """Pick the installed packages every file is also translated with"""
+    def __init__(self, pairs, languages, selected, parent=None):
+        super().__init__(parent)
+        self.viewLayout.addWidget(SubtitleLabel(QCoreApplication.translate("MainWindow", "Additional target languages")))
+        self.checkboxes = {}
+        for pair in pairs:
+            checkbox = CheckBox(languages.get(pair, pair))
+            checkbox.setChecked(pair in selected)
+            self.viewLayout.addWidget(checkbox)
+            self.checkboxes[pair] = checkbox
+        if not pairs:
+            self.viewLayout.addWidget(BodyLabel(QCoreApplication.translate("MainWindow", "No translation packages installed")))
+        self.widget.setMinimumWidth(360)
+
+    def selected_pairs(self):
+        return [pair for pair, checkbox in self.checkboxes.items() if checkbox.isChecked()]
+
+
+class DataFieldsDialog(MessageBoxBase):
+    """Edit the CSV columns / JSON paths translated in data files"""
+    def __init__(self, fields, parent=None):
+        super().__init__(parent)
+        self.viewLayout.addWidget(SubtitleLabel(QCoreApplication.translate("MainWindow", "Columns to translate")))
+        self.viewLayout.addWidget(BodyLabel(QCoreApplication.translate(
+            "MainWindow", "Comma separated CSV column names or numbers, or JSON paths such as details.description or variants[].name. Leave empty to translate every text value")))
+        self.fields_edit = LineEdit()
+        self.fields_edit.setText(fields)
+        self.fields_edit.setClearButtonEnabled(True)
+        self.viewLayout.addWidget(self.fields_edit)
+        self.widget.setMinimumWidth(420)
+
+    def fields(self):
+        return self.fields_edit.text().strip()
+
+
+class MainWindow(QMainWindow):
+    theme_changed = pyqtSignal()
+    device_changed = pyqtSignal()
+    package_changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.setWindowTitle(QCoreApplication.translate("MainWindow", "celosia"))
+        self.setWindowIcon(QIcon(os.path.join(res_dir, "resource", "assets", "icon.ico")))
+        self.setGeometry(100,100,999,446)
+        self.stacked_widget = QStackedWidget()
+        self.setCentralWidget(self.stacked_widget)
+        self.main_layout()
+        self.settings_layout()
+        self.setup_theme()
+        self.center()
+        self.model = None
+        self.last_directory = ""
+        self.installed_pairs = []
+        self.language_names = {}
+        self.setAcceptDrops(True)
+
+        self.theme_changed.connect(self.update_theme)
+        self.device_changed.connect(lambda: update_device(self))
+        self.package_changed.connect(lambda: update_package(self))
+
+        self.file_translator = FileTranslator(self, cfg)
+        self.text_translator = TextTranslator(self, cfg, self.file_translator)
+        self.text_panel.source_edit.textChanged.connect(
+            lambda: self.text_translator.text_changed(self.text_panel.source_edit.toPlainText()))
+
+        self.hot_folder = None
+        self.watchdog = None
+        stall_threshold = stall_threshold_from_env()
+        if stall_threshold or cfg.get(cfg.stallMonitor):
+            self.watchdog = EventLoopWatchdog(stall_threshold or cfg.get(cfg.stallThreshold), parent=self)
+            self.watchdog.start()
+
+        QTimer.singleShot(100, self.init_check)
+
+    def init_check(self):
+        # Probing the GPU imports ctranslate2, so it waits until the window is up
+        self.device_probe_thread = DeviceProbeThread(self)
+        self.device_probe_thread.probed.connect(self.on_devices_probed)
+        self.device_probe_thread.start()
+        self.package_index_thread = PackageIndexThread(self)
+        self.package_index_thread.refreshed.connect(self.on_package_index_refreshed)
+        self.package_index_thread.start()
+        # The engine starts in the background and loads the models of the last session
+        self.file_translator.preload_recent()
+        self.update_watch()
+
+    def on_package_index_refreshed(self, pairs):
+        if set(pairs) == set(PACKAGE_PAIRS):
+            return
+        InfoBar.info(
+            title=(QCoreApplication.translate("MainWindow", "Information")),
+            content=(QCoreApplication.translate("MainWindow", "The list of translation packages has changed. Restart the application to see it.")),
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM,
+            duration=4000,
+            parent=self
+        )
+
+    def on_devices_probed(self, device_count):
+        if device_count != 0:
+            return
+
+        self.card_setdevice.hide()
+        self.devices_title.hide()
+        if cfg.get(cfg.device).value == 'cuda':
+            InfoBar.info(
+                title=(QCoreApplication.translate("MainWindow", "Information")),
+                content=(QCoreApplication.translate("MainWindow", "<b>No NVIDIA graphics card detected</b>. Application will run on CPU.")),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=False,
+                position=InfoBarPosition.BOTTOM,
+                duration=4000,
+                parent=self
+            )
+            cfg.set(cfg.device, 'cpu')
+
+    def setup_theme(self):
+        main_color_hex = self.get_main_color_hex()
+        setThemeColor(main_color_hex)
+        if isDarkTheme():
+            theme_stylesheet = """
+                QWidget {
+                    background-color: #1e1e1e;  /* Dark background */
+                    border: none;
+                }
+                QFrame {
+                    background-color: transparent;
+                    border: none;
+                }
+            """
+        else:
+            theme_stylesheet = """
+                QWidget {
+                    background-color: #f0f0f0;  /* Light background */
+                    border: none;
+                }
+                QFrame {
+                    background-color: transparent;
+                    border: none;
+                }
+            """
+        self.filepicker.update_theme()
+        QApplication.instance().setStyleSheet(theme_stylesheet)
+
+    def get_main_color_hex(self):
+        color = UISettings().get_color_value(UIColorType.ACCENT)
+        return f'#{int((color.r)):02x}{int((color.g)):02x}{int((color.b )):02x}'
+
+    def update_theme(self):
+        self.setup_theme()
+
+    def restartinfo(self):
+        InfoBar.warning(
+            title=(QCoreApplication.translate("MainWindow", "Success")),
+            content=(QCoreApplication.translate("MainWindow", "Setting takes effect after restart")),
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP_RIGHT,
+            duration=2000,
+            parent=self.settings_win
+        )
+
+    def return_to_filepicker(self):
+        if hasattr(self, 'progressbar'):
+            self.progressbar.stop()
+        # Get the main widget (index 0 in stacked widget)
+        main_widget = self.stacked_widget.widget(0)
+        
+        # Find the layout in this widget
+        main_layout = main_widget.layout()
+        
+        # Remove all widgets from the layout except the last one (which contains the settings buttons)
+        item = main_layout.takeAt(0)
+        widget = item.widget()
+        if widget is not None:
+            widget.deleteLater()
+        
+        # Recreate the filepicker
+        self.filepicker = FileLabel(self)
+        main_layout.insertWidget(0, self.filepicker)
+        # Hide the back button
+        self.back_button.hide()
+        self.preview_pane.clear_pairs()
+
+    def center(self):
+        screen_geometry = self.screen().availableGeometry()
+        window_geometry = self.geometry()
+
+        x = (screen_geometry.width() - window_geometry.width()) // 2
+        y = (screen_geometry.height() - window_geometry.height()) // 2
+
+        self.move(x, y)
+
+    def update_argos_remove_button_state(self,enabled):
+        if hasattr(self, 'card_deleteargosmodel'):
+            self.card_deleteargosmodel.button.setEnabled(enabled)
+
+    def main_layout(self):
+        main_layout = QVBoxLayout()
+        self.filepicker = FileLabel(self)
+        main_layout.addWidget(self.filepicker)
+
+        self.preview_pane = PreviewPane()
+        main_layout.addWidget(self.preview_pane, 1)
+
+        self.text_panel = TextPanel()
+        main_layout.addWidget(self.text_panel, 1)
+
+        self.settings_button = TransparentToolButton(FluentIcon.SETTING)
+        self.text_button = TransparentToolButton(FluentIcon.EDIT)
+        self.text_button.setToolTip(QCoreApplication.translate("MainWindow", "Translate text"))
+
+        self.back_button = TransparentToolButton(FluentIcon.LEFT_ARROW)
+        self.back_button.hide()
+
+
+        settings_layout = QHBoxLayout()
+        settings_layout.addWidget(self.settings_button)
+        settings_layout.addWidget(self.text_button)
+        settings_layout.addWidget(self.back_button)
+        settings_layout.addStretch()
+        settings_layout.setContentsMargins(5, 5, 5, 5)
+
+        self.progressbar = IndeterminateProgressBar(start=False)
+        main_layout.addWidget(self.progressbar)
+
+        main_layout.addLayout(settings_layout)
+
+        #connect
+        self.settings_button.clicked.connect(self.show_settings_page)
+        self.back_button.clicked.connect(self.return_to_filepicker)
+        self.text_button.clicked.connect(self.toggle_text_panel)
+
+        main_widget = QWidget()
+        main_widget.setLayout(main_layout)
+        self.stacked_widget.addWidget(main_widget)
+
+    def settings_layout(self):
+        settings_layout = QVBoxLayout()
+
+        back_button_layout = QHBoxLayout()
+
+        back_button = TransparentToolButton(FluentIcon.LEFT_ARROW)
+        back_button.clicked.connect(self.show_main_page)
+
+        back_button_layout.addWidget(back_button, alignment=Qt.AlignmentFlag.AlignTop)
+        back_button_layout.setContentsMargins(5, 5, 5, 5)
+
+        settings_layout.addLayout(back_button_layout)
+
+        self.settings_title = SubtitleLabel(QCoreApplication.translate("MainWindow", "Settings"))
+        self.settings_title.setTextColor(QColor(0, 0, 0), QColor(255, 255, 255))
+
+        back_button_layout.addWidget(self.settings_title, alignment=Qt.AlignmentFlag.AlignTop)
+
+        card_layout = QVBoxLayout()
+        self.devices_title = StrongBodyLabel(QCoreApplication.translate("MainWindow", "Devices"))
+        self.devices_title.setTextColor(QColor(0, 0, 0), QColor(255, 255, 255))
+        card_layout.addWidget(self.devices_title, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_setdevice = ComboBoxSettingCard(
+            configItem=cfg.device,
+            icon=FluentIcon.DEVELOPER_TOOLS,
+            title=QCoreApplication.translate("MainWindow","Device"),
+            content=QCoreApplication.translate("MainWindow", "Select a device to use. Cuda will utilize GPU."),
+            texts=['cpu', 'cuda']
+        )
+
+        card_layout.addWidget(self.card_setdevice, alignment=Qt.AlignmentFlag.AlignTop)
+
+        cfg.device.valueChanged.connect(self.device_changed.emit)
+
+        self.modelsins_title = StrongBodyLabel(QCoreApplication.translate("MainWindow", "Model management"))
+        self.modelsins_title.setTextColor(QColor(0, 0, 0), QColor(255, 255, 255))
+        card_layout.addSpacing(20)
+        card_layout.addWidget(self.modelsins_title, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_settlpackage = ComboBoxSettingCard(
+            configItem=cfg.package,
+            icon=FluentIcon.CLOUD_DOWNLOAD,
+            title=QCoreApplication.translate("MainWindow","Argos Translate package"),
+            content=QCoreApplication.translate("MainWindow", "Change translation package"),
+            texts=["None", *PACKAGE_PAIRS]
+        )
+
+        card_layout.addWidget(self.card_settlpackage, alignment=Qt.AlignmentFlag.AlignTop)
+        cfg.package.valueChanged.connect(self.package_changed.emit)
+
+        self.card_preload = SwitchSettingCard(
+            FluentIcon.ROBOT,
+            QCoreApplication.translate("MainWindow", "Preload models"),
+            QCoreApplication.translate("MainWindow", "Load the model of the selected package in the background, so the first file does not wait for it"),
+            configItem=cfg.preloadModels
+        )
+        card_layout.addWidget(self.card_preload, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_preloadbudget = RangeSettingCard(
+            cfg.preloadBudget,
+            FluentIcon.PIE_SINGLE,
+            QCoreApplication.translate("MainWindow", "Startup preload memory, MB"),
+            QCoreApplication.translate("MainWindow", "At startup, the models of recently used packages are loaded while they fit in this much memory. 0 turns startup preloading off")
+        )
+        card_layout.addWidget(self.card_preloadbudget, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_setbackend = ComboBoxSettingCard(
+            configItem=cfg.backend,
+            icon=FluentIcon.SPEED_HIGH,
+            title=QCoreApplication.translate("MainWindow","Translation engine"),
+            content=QCoreApplication.translate("MainWindow", "Argos Translate or direct CTranslate2 decoding of the installed package"),
+            texts=['argos', 'ctranslate2']
+        )
+
+        card_layout.addWidget(self.card_setbackend, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_setbeamsize = RangeSettingCard(
+            cfg.beamSize,
+            FluentIcon.ALIGNMENT,
+            QCoreApplication.translate("MainWindow","Beam size"),
+            QCoreApplication.translate("MainWindow", "Larger beams are slower but can be more accurate. CTranslate2 engine only")
+        )
+
+        card_layout.addWidget(self.card_setbeamsize, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_refinebeam = RangeSettingCard(
+            cfg.refineBeam,
+            FluentIcon.ZOOM_IN,
+            QCoreApplication.translate("MainWindow","Two-pass refinement beam"),
+            QCoreApplication.translate("MainWindow", "Decode every sentence greedily first, then only the uncertain ones with this beam size. 0 uses the beam size above for every sentence. CTranslate2 engine only")
+        )
+
+        card_layout.addWidget(self.card_refinebeam, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_refinethreshold = RangeSettingCard(
+            cfg.refineThreshold,
+            FluentIcon.CERTIFICATE,
+            QCoreApplication.translate("MainWindow","Refinement confidence, %"),
+            QCoreApplication.translate("MainWindow", "Greedy sentences with a lower mean token probability are decoded again with the refinement beam")
+        )
+
+        card_layout.addWidget(self.card_refinethreshold, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_setthreads = RangeSettingCard(
+            cfg.computeThreads,
+            FluentIcon.IOT,
+            QCoreApplication.translate("MainWindow","CPU threads"),
+            QCoreApplication.translate("MainWindow", "Threads used to translate on the CPU. 0 picks automatically. CTranslate2 engine only")
+        )
+
+        card_layout.addWidget(self.card_setthreads, alignment=Qt.AlignmentFlag.AlignTop)
+        cfg.computeThreads.valueChanged.connect(self.device_changed.emit)
+
+        self.card_setcomputetype = ComboBoxSettingCard(
+            configItem=cfg.computeType,
+            icon=FluentIcon.ZIP_FOLDER,
+            title=QCoreApplication.translate("MainWindow","Quantization"),
+            content=QCoreApplication.translate("MainWindow", "Precision of the model weights. Lower precision is faster and smaller. CTranslate2 engine only"),
+            texts=['auto', 'int8', 'int8_float16', 'float16', 'float32']
+        )
+
+        card_layout.addWidget(self.card_setcomputetype, alignment=Qt.AlignmentFlag.AlignTop)
+        cfg.computeType.valueChanged.connect(self.device_changed.emit)
+
+        self.card_governorthreads = RangeSettingCard(
+            cfg.governorThreads,
+            FluentIcon.SPEED_MEDIUM,
+            QCoreApplication.translate("MainWindow","Thread limit"),
+            QCoreApplication.translate("MainWindow", "Most CPU threads translation may use, over all engines and languages. 0 is no limit")
+        )
+
+        card_layout.addWidget(self.card_governorthreads, alignment=Qt.AlignmentFlag.AlignTop)
+        cfg.governorThreads.valueChanged.connect(self.device_changed.emit)
+
+        self.card_governorniceness = RangeSettingCard(
+            cfg.governorNiceness,
+            FluentIcon.SPEED_OFF,
+            QCoreApplication.translate("MainWindow","Background priority"),
+            QCoreApplication.translate("MainWindow", "Higher values leave more CPU to other programs while translating. Lowering it takes effect after a restart")
+        )
+
+        card_layout.addWidget(self.card_governorniceness, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_governormemory = RangeSettingCard(
+            cfg.governorMemory,
+            FluentIcon.TILES,
+            QCoreApplication.translate("MainWindow","Memory limit, MB"),
+            QCoreApplication.translate("MainWindow", "Above this much memory, translation uses smaller batches and waits for running ones before reading more. 0 is no limit")
+        )
+
+        card_layout.addWidget(self.card_governormemory, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_setsegmenttokens = RangeSettingCard(
+            cfg.maxSegmentTokens,
+            FluentIcon.CUT,
+            QCoreApplication.translate("MainWindow","Long paragraph limit"),
+            QCoreApplication.translate("MainWindow", "Paragraphs longer than this many tokens are split at sentence or clause boundaries before translation. 0 turns splitting off")
+        )
+
+        card_layout.addWidget(self.card_setsegmenttokens, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_mergecues = SwitchSettingCard(
+            FluentIcon.CHAT,
+            QCoreApplication.translate("MainWindow", "Merge subtitle sentences"),
+            QCoreApplication.translate("MainWindow", "Translate a sentence split over several subtitle cues as one. Timing and numbering are never changed"),
+            configItem=cfg.mergeCues
+        )
+
+        card_layout.addWidget(self.card_mergecues, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_datafields = PushSettingCard(
+            QCoreApplication.translate("MainWindow", "Edit"),
+            FluentIcon.LAYOUT,
+            QCoreApplication.translate("MainWindow", "Data file columns"),
+            self.data_fields_summary()
+        )
+        self.card_datafields.clicked.connect(self.choose_data_fields)
+        card_layout.addWidget(self.card_datafields, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_fanout = PushSettingCard(
+            QCoreApplication.translate("MainWindow", "Choose"),
+            FluentIcon.LANGUAGE,
+            QCoreApplication.translate("MainWindow", "Additional target languages"),
+            self.fan_out_summary()
+        )
+        self.card_fanout.clicked.connect(self.choose_fan_out_packages)
+        card_layout.addWidget(self.card_fanout, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_fanoutworkers = RangeSettingCard(
+            cfg.fanOutWorkers,
+            FluentIcon.SPEED_MEDIUM,
+            QCoreApplication.translate("MainWindow", "Parallel target languages"),
+            QCoreApplication.translate("MainWindow", "How many target languages are translated at the same time. Each one keeps its own model in memory")
+        )
+        card_layout.addWidget(self.card_fanoutworkers, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_memory = SwitchSettingCard(
+            FluentIcon.HISTORY,
+            QCoreApplication.translate("MainWindow", "Translation memory"),
+            QCoreApplication.translate("MainWindow", "Remember translated sentences and reuse them when the same or a similar sentence comes up again"),
+            configItem=cfg.memoryEnabled
+        )
+        card_layout.addWidget(self.card_memory, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_memorythreshold = RangeSettingCard(
+            cfg.memoryThreshold,
+            FluentIcon.FILTER,
+            QCoreApplication.translate("MainWindow", "Fuzzy match threshold"),
+            QCoreApplication.translate("MainWindow", "How similar, in percent, a remembered sentence must be to count as a match")
+        )
+        card_layout.addWidget(self.card_memorythreshold, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_memoryaction = ComboBoxSettingCard(
+            configItem=cfg.memoryFuzzyAction,
+            icon=FluentIcon.SYNC,
+            title=QCoreApplication.translate("MainWindow", "Fuzzy matches"),
+            content=QCoreApplication.translate("MainWindow", "What to do with a sentence that is similar but not identical to a remembered one"),
+            texts=[
+                QCoreApplication.translate("MainWindow", "Reuse the remembered translation"),
+                QCoreApplication.translate("MainWindow", "Translate again, faster")
+            ]
+        )
+        card_layout.addWidget(self.card_memoryaction, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_memoryimport = PushSettingCard(
+            QCoreApplication.translate("MainWindow", "Import"),
+            FluentIcon.DOWNLOAD,
+            QCoreApplication.translate("MainWindow", "Import TMX"),
+            QCoreApplication.translate("MainWindow", "Add the translation units of a TMX file to the translation memory")
+        )
+        self.card_memoryimport.clicked.connect(self.import_memory)
+        card_layout.addWidget(self.card_memoryimport, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_memoryexport = PushSettingCard(
+            QCoreApplication.translate("MainWindow", "Export"),
+            FluentIcon.SHARE,
+            QCoreApplication.translate("MainWindow", "Export TMX"),
+            QCoreApplication.translate("MainWindow", "Save the translation memory as a TMX file for other translation tools")
+        )
+        self.card_memoryexport.clicked.connect(self.export_memory)
+        card_layout.addWidget(self.card_memoryexport, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.output_title = StrongBodyLabel(QCoreApplication.translate("MainWindow", "Output"))
+        self.output_title.setTextColor(QColor(0, 0, 0), QColor(255, 255, 255))
+        card_layout.addSpacing(20)
+        card_layout.addWidget(self.output_title, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_outputpolicy = ComboBoxSettingCard(
+            configItem=cfg.outputPolicy,
+            icon=FluentIcon.SAVE,
+            title=QCoreApplication.translate("MainWindow","Save translations"),
+            content=QCoreApplication.translate("MainWindow", "Where translated files are written. The location is settled before translation starts"),
+            texts=[
+                QCoreApplication.translate("MainWindow", "Next to the source file"),
+                QCoreApplication.translate("MainWindow", "To the output folder"),
+                QCoreApplication.translate("MainWindow", "Ask before translating")
+            ]
+        )
+
+        card_layout.addWidget(self.card_outputpolicy, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_outputfolder = PushSettingCard(
+            text=QCoreApplication.translate("MainWindow","Choose folder"),
+            icon=FluentIcon.FOLDER,
+            title=QCoreApplication.translate("MainWindow","Output folder"),
+            content=cfg.get(cfg.outputFolder) or QCoreApplication.translate("MainWindow", "Not set")
+        )
+
+        card_layout.addWidget(self.card_outputfolder, alignment=Qt.AlignmentFlag.AlignTop)
+        self.card_outputfolder.clicked.connect(self.choose_output_folder)
+
+        self.card_incremental = SwitchSettingCard(
+            FluentIcon.UPDATE,
+            QCoreApplication.translate("MainWindow", "Only translate what changed"),
+            QCoreApplication.translate("MainWindow", "Keep a small manifest next to each translation, so a new revision of the document only sends edited paragraphs to the model"),
+            configItem=cfg.incremental
+        )
+        card_layout.addWidget(self.card_incremental, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_watch = SwitchSettingCard(
+            FluentIcon.SYNC,
+            QCoreApplication.translate("MainWindow", "Watch folder"),
+            QCoreApplication.translate("MainWindow", "Translate every supported file dropped into the watched folder with the selected package"),
+            configItem=cfg.watchEnabled
+        )
+        card_layout.addWidget(self.card_watch, alignment=Qt.AlignmentFlag.AlignTop)
+        cfg.watchEnabled.valueChanged.connect(self.update_watch)
+
+        self.card_watchfolder = PushSettingCard(
+            text=QCoreApplication.translate("MainWindow","Choose folder"),
+            icon=FluentIcon.FOLDER_ADD,
+            title=QCoreApplication.translate("MainWindow","Watched folder"),
+            content=cfg.get(cfg.watchFolder) or QCoreApplication.translate("MainWindow", "Not set")
+        )
+
+        card_layout.addWidget(self.card_watchfolder, alignment=Qt.AlignmentFlag.AlignTop)
+        self.card_watchfolder.clicked.connect(lambda: self.choose_watch_folder(cfg.watchFolder, self.card_watchfolder))
+
+        self.card_watchoutput = PushSettingCard(
+            text=QCoreApplication.translate("MainWindow","Choose folder"),
+            icon=FluentIcon.SEND,
+            title=QCoreApplication.translate("MainWindow","Watch output folder"),
+            content=cfg.get(cfg.watchOutput) or QCoreApplication.translate("MainWindow", "A \"translated\" folder inside the watched folder")
+        )
+
+        card_layout.addWidget(self.card_watchoutput, alignment=Qt.AlignmentFlag.AlignTop)
+        self.card_watchoutput.clicked.connect(lambda: self.choose_watch_folder(cfg.watchOutput, self.card_watchoutput))
+
+        self.card_livepreview = SwitchSettingCard(
+            FluentIcon.VIEW,
+            QCoreApplication.translate("MainWindow", "Live preview"),
+            QCoreApplication.translate("MainWindow", "Show the source and its translation side by side while the document is being translated"),
+            configItem=cfg.livePreview
+        )
+        card_layout.addWidget(self.card_livepreview, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_previewsegments = RangeSettingCard(
+            cfg.previewSegments,
+            FluentIcon.DOCUMENT,
+            QCoreApplication.translate("MainWindow", "Preview length"),
+            QCoreApplication.translate("MainWindow", "How many paragraphs from the start of the document the preview shows")
+        )
+        card_layout.addWidget(self.card_previewsegments, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.lang_widget = QWidget()
+        self.lang_layout = QHBoxLayout()
+        self.lang_widget.setLayout(self.lang_layout)
+        self.lang_layout.addStretch()
+        card_layout.addWidget(self.lang_widget)
+        self.check_packages()
+
+        self.card_deleteargosmodel = PushSettingCard(
+            text=QCoreApplication.translate("MainWindow","Remove"),
+            icon=FluentIcon.BROOM,
+            title=QCoreApplication.translate("MainWindow","Remove Argos Translate package"),
+            content=QCoreApplication.translate("MainWindow", "Delete currently selected translation package. Will be removed: <b>{}</b>").format(cfg.get(cfg.package).value),
+        )
+
+        card_layout.addWidget(self.card_deleteargosmodel, alignment=Qt.AlignmentFlag.AlignTop)
+        self.card_deleteargosmodel.clicked.connect(self.packageremover)
+        if ((cfg.get(cfg.package).value == 'None')):
+            self.card_deleteargosmodel.button.setDisabled(True)
+
+        self.card_installbundles = PushSettingCard(
+            text=QCoreApplication.translate("MainWindow","Choose folder"),
+            icon=FluentIcon.FOLDER_ADD,
+            title=QCoreApplication.translate("MainWindow","Install packages from folder"),
+            content=QCoreApplication.translate("MainWindow", "Install every .argosmodel file of a folder without going online. Packages already installed at the same version are skipped")
+        )
+
+        card_layout.addWidget(self.card_installbundles, alignment=Qt.AlignmentFlag.AlignTop)
+        self.card_installbundles.clicked.connect(self.install_bundles)
+
+        self.miscellaneous_title = StrongBodyLabel(QCoreApplication.translate("MainWindow", "Miscellaneous"))
+        self.miscellaneous_title.setTextColor(QColor(0, 0, 0), QColor(255, 255, 255))
+        card_layout.addSpacing(20)
+        card_layout.addWidget(self.miscellaneous_title, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_setlanguage = ComboBoxSettingCard(
+            configItem=cfg.language,
+            icon=FluentIcon.LANGUAGE,
+            title=QCoreApplication.translate("MainWindow","Language"),
+            content=QCoreApplication.translate("MainWindow", "Change UI language"),
+            texts=["English", "Русский"]
+        )
+
+        card_layout.addWidget(self.card_setlanguage, alignment=Qt.AlignmentFlag.AlignTop)
+        cfg.language.valueChanged.connect(self.restartinfo)
+
+        self.card_theme = OptionsSettingCard(
+            cfg.themeMode,
+            FluentIcon.BRUSH,
+            QCoreApplication.translate("MainWindow","Application theme"),
+            QCoreApplication.translate("MainWindow", "Adjust how the application looks"),
+            [QCoreApplication.translate("MainWindow","Light"), QCoreApplication.translate("MainWindow","Dark"), QCoreApplication.translate("MainWindow","Follow System Settings")]
+        )
+
+        card_layout.addWidget(self.card_theme, alignment=Qt.AlignmentFlag.AlignTop)
+        self.card_theme.optionChanged.connect(self.theme_changed.emit)
+
+        self.card_zoom = OptionsSettingCard(
+            cfg.dpiScale,
+            FluentIcon.ZOOM,
+            QCoreApplication.translate("MainWindow","Interface zoom"),
+            QCoreApplication.translate("MainWindow","Change the size of widgets and fonts"),
+            texts=[
+                "100%", "125%", "150%", "175%", "200%",
+                QCoreApplication.translate("MainWindow","Follow System Settings")
+            ]
+        )
+
+        card_layout.addWidget(self.card_zoom, alignment=Qt.AlignmentFlag.AlignTop)
+        cfg.dpiScale.valueChanged.connect(self.restartinfo)
+
+        self.card_trace = SwitchSettingCard(
+            FluentIcon.STOP_WATCH,
+            QCoreApplication.translate("MainWindow","Performance tracing"),
+            QCoreApplication.translate("MainWindow","Write a Chrome trace and a timing summary for every job to the traces folder"),
+            configItem=cfg.traceEnabled
+        )
+
+        card_layout.addWidget(self.card_trace, alignment=Qt.AlignmentFlag.AlignTop)
+
+        self.card_stallmonitor = SwitchSettingCard(
+            FluentIcon.HEART,
+            QCoreApplication.translate("MainWindow","Responsiveness monitor"),
+            QCoreApplication.translate("MainWindow","Log every interface freeze longer than {} ms with the code that caused it").format(cfg.get(cfg.stallThreshold)),
+            configItem=cfg.stallMonitor
+        )
+
+        card_layout.addWidget(self.card_stallmonitor, alignment=Qt.AlignmentFlag.AlignTop)
+        cfg.stallMonitor.valueChanged.connect(self.restartinfo)
+
+        self.card_ab = HyperlinkCard(
+            url="https://github.com/icosane/celosia",
+            text="Github",
+            icon=FluentIcon.INFO,
+            title=QCoreApplication.translate("MainWindow", "About"),
+            content=QCoreApplication.translate("MainWindow", "Translate PDF and EPUB files locally")
+        )
+        card_layout.addWidget(self.card_ab,  alignment=Qt.AlignmentFlag.AlignTop )
+
+        self.scroll_area = ScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+
+        self.card_widget = QWidget()
+        self.card_widget.setLayout(card_layout)
+        card_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.scroll_area.setWidget(self.card_widget)
+        settings_layout.addWidget(self.scroll_area)
+
+        self.download_progressbar = IndeterminateProgressBar(start=False)
+        settings_layout.addWidget(self.download_progressbar )
+
+        settings_widget = QWidget()
+        settings_widget.setLayout(settings_layout)
+
+        self.stacked_widget.addWidget(settings_widget)
+
+    def show_settings_page(self):
+        self.stacked_widget.setCurrentIndex(1)  # Switch to the settings page
+
+    def show_main_page(self):
+        self.stacked_widget.setCurrentIndex(0)  # Switch back to the main page
+
+    def check_packages(self):
+        """Scan installed packages in the background, then rebuild the quick-select buttons"""
+        tracer = Tracer("check packages", enabled=cfg.get(cfg.traceEnabled))
+
+        languages = {
+            'en_ru': 'English → Russian',
+            'ru_en': 'Russian → English',
+            'de_en': 'German → English',
+            'fr_en': 'French → English',
+            'it_en': 'Italian → English',
+            'ja_en': 'Japanese → English',
+            'sq_en': 'Albanian → English',
+            'ar_en': 'Arabic → English',
+            'az_en': 'Azerbaijani → English',
+            'eu_en': 'Basque → English',
+            'bn_en': 'Bengali → English',
+            'bg_en': 'Bulgarian → English',
+            'ca_en': 'Catalan → English',
+            'zt_en': 'Chinese (Mandarin) → English',
+            'zh_en': 'Chinese → English',
+            'cs_en': 'Czech → English',
+            'da_en': 'Danish → English',
+            'nl_en': 'Dutch → English',
+            'en_sq': 'English → Albanian',
+            'en_ar': 'English → Arabic',
+            'en_az': 'English → Azerbaijani',
+            'en_eu': 'English → Basque',
+            'en_bn': 'English → Bengali',
+            'en_bg': 'English → Bulgarian',
+            'en_ca': 'English → Catalan',
+            'en_zh': 'English → Chinese',
+            'en_zt': 'English → Chinese (Mandarin)',
+            'en_cs': 'English → Czech',
+            'en_da': 'English → Danish',
+            'en_nl': 'English → Dutch',
+            'en_eo': 'English → Esperanto',
+            'en_et': 'English → Estonian',
+            'en_fi': 'English → Finnish',
+            'en_fr': 'English → French',
+            'en_gl': 'English → Galician',
+            'en_de': 'English → German',
+            'en_el': 'English → Greek',
+            'en_he': 'English → Hebrew',
+            'en_hi': 'English → Hindi',
+            'en_hu': 'English → Hungarian',
+            'en_id': 'English → Indonesian',
+            'en_ga': 'English → Irish',
+            'en_it': 'English → Italian',
+            'en_ja': 'English → Japanese',
+            'en_ko': 'English → Korean',
+            'en_lv': 'English → Latvian',
+            'en_lt': 'English → Lithuanian',
+            'en_ms': 'English → Malay',
+            'en_nb': 'English → Norwegian Bokmal',
+            'en_fa': 'English → Persian',
+            'en_pl': 'English → Polish',
+            'en_pt': 'English → Portuguese',
+            'en_pb': 'English → Portuguese (Brazil)',
+            'en_ro': 'English → Romanian',
+            'en_sk': 'English → Slovak',
+            'en_sl': 'English → Slovenian',
+            'en_es': 'English → Spanish',
+            'en_sv': 'English → Swedish',
+            'en_tl': 'English → Tagalog',
+            'en_th': 'English → Thai',
+            'en_tr': 'English → Turkish',
+            'en_uk': 'English → Ukrainian',
+            'en_ur': 'English → Urdu',
+            'eo_en': 'Esperanto → English',
+            'et_en': 'Estonian → English',
+            'fi_en': 'Finnish → English',
+            'gl_en': 'Galician → English',
+            'el_en': 'Greek → English',
+            'he_en': 'Hebrew → English',
+            'hi_en': 'Hindi → English',
+            'hu_en': 'Hungarian → English',
+            'id_en': 'Indonesian → English',
+            'ga_en': 'Irish → English',
+            'lv_en': 'Latvian → English',
+            'lt_en': 'Lithuanian → English',
+            'ms_en': 'Malay → English',
+            'nb_en': 'Norwegian Bokmal → English',
+            'fa_en': 'Persian → English',
+            'pl_en': 'Polish → English',
+            'pb_en': 'Portuguese (Brazil) → English',
+            'pt_en': 'Portuguese → English',
+            'es_pt': 'Spanish → Portuguese',
+            'ro_en': 'Romanian → English',
+            'sk_en': 'Slovak → English',
+            'sl_en': 'Slovenian → Spanish',
+            'es_en': 'Spanish → English',
+            'sv_en': 'Swedish → English',
+            'tl_en': 'Tagalog → English',
+            'th_en': 'Thai → English',
+            'tr_en': 'Turkish → English',
+            'uk_en': 'Ukrainian → English',
+            'ur_en': 'Urdu → English'
+        }
+        
+        translation_mapping = {pair: TranslationPackage(pair) for pair in PACKAGE_PAIRS}
+
+        packages_dir = os.path.join(base_dir, "models/argostranslate/data/argos-translate/packages")
+        self.package_scan_thread = PackageScanThread(packages_dir, list(PACKAGE_PAIRS), tracer, parent=self)
+        self.package_scan_thread.scanned.connect(
+            lambda available: self.show_installed_packages(available, languages, translation_mapping, tracer))
+        self.package_scan_thread.start()
+
+    def show_installed_packages(self, available, languages, translation_mapping, tracer):
+        for i in reversed(range(self.lang_layout.count())): 
+            widget = self.lang_layout.itemAt(i).widget()
+            if widget and widget.parent() is not None:
+                widget.deleteLater()
+
+        # Create buttons for available languages
+        with tracer.span("update buttons", count=len(available)):
+            for code in available:
+                lang_button = TransparentPushButton(languages.get(code, code))
+                lang_button.clicked.connect(lambda _, c=code: self.card_settlpackage.setValue(translation_mapping[c]))
+                self.lang_layout.addWidget(lang_button, alignment=Qt.AlignmentFlag.AlignTop)
+        
+        # Show/hide layout based on whether there are available languages
+        self.lang_widget.setVisible(len(available) > 0)
+        self.installed_pairs = list(available)
+        self.language_names = languages
+        tracer.finish()
+
+    def fan_out_summary(self):
+        pairs = cfg.get(cfg.fanOutPackages)
+        if not pairs:
+            return QCoreApplication.translate("MainWindow", "Also translate every file with these packages, the source is parsed only once")
+        return ", ".join(pairs)
+
+    def data_fields_summary(self):
+        return cfg.get(cfg.dataFields) or QCoreApplication.translate(
+            "MainWindow", "CSV columns or JSON paths to translate in data files. Currently: every text value")
+
+    def choose_data_fields(self):
+        dialog = DataFieldsDialog(cfg.get(cfg.dataFields), self)
+        if dialog.exec():
+            cfg.set(cfg.dataFields, dialog.fields())
+            self.card_datafields.setContent(self.data_fields_summary())
+
+    def choose_fan_out_packages(self):
+        dialog = FanOutDialog(self.installed_pairs, self.language_names, cfg.get(cfg.fanOutPackages), self)
+        if dialog.exec():
+            cfg.set(cfg.fanOutPackages, dialog.selected_pairs())
+            self.card_fanout.setContent(self.fan_out_summary())
+
+
+    def import_memory(self):
+        tmx_path, _ = QFileDialog.getOpenFileName(
+            self,
+            QCoreApplication.translate("MainWindow", "Import TMX"),
+            self.last_directory,
+            QCoreApplication.translate("MainWindow", "Translation memory (*.tmx);;All Files (*)")
+        )
+        if tmx_path:
+            self.transfer_memory(tmx_path, export=False)
+
+    def export_memory(self):
+        tmx_path, _ = QFileDialog.getSaveFileName(
+            self,
+            QCoreApplication.translate("MainWindow", "Export TMX"),
+            os.path.join(self.last_directory, "celosia.tmx"),
+            QCoreApplication.translate("MainWindow", "Translation memory (*.tmx)")
+        )
+        if tmx_path:
+            self.transfer_memory(tmx_path, export=True)
+
+    def transfer_memory(self, tmx_path, export):
+        self.card_memoryimport.button.setEnabled(False)
+        self.card_memoryexport.button.setEnabled(False)
+        self.memory_transfer_thread = MemoryTransferThread(tmx_path, export, parent=self)
+        self.memory_transfer_thread.transferred.connect(
+            lambda count, error: self.on_memory_transferred(count, error, export))
+        self.memory_transfer_thread.start()
+
+    def on_memory_transferred(self, count, error, export):
+        self.card_memoryimport.button.setEnabled(True)
+        self.card_memoryexport.button.setEnabled(True)
+        if error:
+            InfoBar.error(
+                title=QCoreApplication.translate("MainWindow", "Error"),
+                content=QCoreApplication.translate("MainWindow", "Translation memory transfer failed: {}").format(error),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=4000,
+                parent=self
+            )
+            return
+        if export:
+            content = QCoreApplication.translate("MainWindow", "Exported {} translation units").format(count)
+        else:
+            content = QCoreApplication.translate("MainWindow", "Imported {} translation units").format(count)
+        InfoBar.success(
+            title=QCoreApplication.translate("MainWindow", "Success"),
+            content=content,
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP_RIGHT,
+            duration=2000,
+            parent=self
+        )
+
+    def install_bundles(self):
+        directory = QFileDialog.getExistingDirectory(
+            self,
+            QCoreApplication.translate("MainWindow", "Choose folder"),
+            self.last_directory
+        )
+        if not directory:
+            return
+
+        self.card_installbundles.button.setEnabled(False)
+        self.bundle_install_thread = BundleInstallThread(directory, parent=self)
+        self.bundle_install_thread.installed.connect(self.on_bundles_installed)
+        self.bundle_install_thread.start()
+
+    def on_bundles_installed(self, results, error):
+        self.card_installbundles.button.setEnabled(True)
+        failed = [f"{os.path.basename(result.path)}: {result.detail}" for result in results if result.status == "failed"]
+        if error or failed:
+            InfoBar.error(
+                title=QCoreApplication.translate("MainWindow", "Error"),
+                content=error or "<br>".join(failed),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=6000,
+                parent=self
+            )
+        if error:
+            return
+
+        installed = [result.code for result in results if result.status == "installed"]
+        skipped = sum(result.status == "skipped" for result in results)
+        InfoBar.success(
+            title=QCoreApplication.translate("MainWindow", "Success"),
+            content=QCoreApplication.translate("MainWindow", "{} packages installed, {} already installed").format(len(installed), skipped),
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP_RIGHT,
+            duration=4000,
+            parent=self
+        )
+        if installed:
+            # One rescan for the whole folder
+            self.check_packages()
+            if cfg.get(cfg.package).value in installed:
+                self.file_translator.preload_selected()
+
+    def packageremover(self):
+        language_pair = cfg.get(cfg.package).value
+
+        package_patterns = [
+            os.path.join(
+                base_dir,
+                "models/argostranslate/data/argos-translate/packages",
+                f"translate-{language_pair}-*"
+            ),
+            os.path.join(
+                base_dir,
+                "models/argostranslate/data/argos-translate/packages",
+                f"{language_pair}"
+            )
+        ]
+
+
+        # Remove .argosmodel file
+        model_file = os.path.join(
+            base_dir,
+            "models/argostranslate/cache/argos-translate/downloads",
+            f"translate-{language_pair}.argosmodel"
+        )
+
+        # Deleting a model is slow, keep it off the GUI thread
+        self.update_argos_remove_button_state(False)
+        self.package_remover_thread = PackageRemoverThread(package_patterns, model_file, parent=self)
+        self.package_remover_thread.removed.connect(self.on_package_removed)
+        self.package_remover_thread.start()
+
+    def on_package_removed(self, removed, error):
+        if error:
+            self.update_argos_remove_button_state(True)
+            InfoBar.error(
+                title=QCoreApplication.translate("MainWindow", "Error"),
+                content=QCoreApplication.translate("MainWindow", "Failed to remove translation package: {}").format(error),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=2000,
+                parent=self
+            )
+        # Only update config if we actually removed something
+        elif removed:
+            cfg.set(cfg.package, 'None')
+            self.check_packages()
+
+            InfoBar.success(
+                title=QCoreApplication.translate("MainWindow", "Success"),
+                content=QCoreApplication.translate("MainWindow", "Translation package removed successfully"),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=2000,
+                parent=self
+            )
+        else:
+            self.update_argos_remove_button_state(True)
+            InfoBar.warning(
+                title=QCoreApplication.translate("MainWindow", "Warning"),
+                content=QCoreApplication.translate("MainWindow", "No translation package found to remove"),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=2000,
+                parent=self
+            )
+
+    def closeEvent(self, event):
+        if self.watchdog:
+            self.watchdog.stop()
+            print(self.watchdog.summary())
+
+        if self.hot_folder:
+            self.hot_folder.stop()
+
+        # Models live in the engine process, stopping it gives all of their memory back
+        self.file_translator.shutdown()
+        self.text_translator.shutdown()
+
+        for widget in QApplication.topLevelWidgets():
+            widget.close()
+
+        super().closeEvent(event)
+
+    @pyqtSlot(str)
+    def start_translation_process(self, file_path):
+        """Delegate to the file translator"""
+        self.file_translator.start_translation_process(file_path)
+
+    def ask_save_path(self, default_path):
+        """Ask where to write the translation, returns an empty string on cancel"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            QCoreApplication.translate('MainWindow',"Save Translated File"),
+            default_path,
+            QCoreApplication.translate('MainWindow',"All Files (*)")
+        )
+
+        if file_path:
+            self.last_directory = os.path.dirname(file_path)
+        return file_path
+
+    def choose_output_folder(self):
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            QCoreApplication.translate("MainWindow", "Choose output folder"),
+            cfg.get(cfg.outputFolder) or self.last_directory
+        )
+        if folder:
+            cfg.set(cfg.outputFolder, folder)
+            self.card_outputfolder.setContent(folder)
+
+    def choose_watch_folder(self, item, card):
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            QCoreApplication.translate("MainWindow", "Choose folder"),
+            cfg.get(item) or self.last_directory
+        )
+        if folder:
+            cfg.set(item, folder)
+            card.setContent(folder)
+            self.update_watch()
+
+    def update_watch(self):
+        """Start, restart or stop watching the folder according to the settings"""
+        if self.hot_folder:
+            self.hot_folder.stop()
+            self.hot_folder.deleteLater()
+            self.hot_folder = None
+
+        folder = cfg.get(cfg.watchFolder)
+        if not cfg.get(cfg.watchEnabled) or not folder:
+            return
+        if cfg.get(cfg.package).value == 'None':
+            InfoBar.warning(
+                title=QCoreApplication.translate("MainWindow", "Warning"),
+                content=QCoreApplication.translate("MainWindow", "No translation package selected. Please select one in Settings."),
+                parent=self
+            )
+            return
+
+        self.hot_folder = HotFolder(folder, cfg.get(cfg.watchOutput) or default_watch_output(folder),
+                                    self.file_translator.translate_watched, parent=self)
+        self.hot_folder.finished.connect(self.on_watched_file_done)
+        if not self.hot_folder.start():
+            InfoBar.error(
+                title=QCoreApplication.translate("MainWindow", "Error"),
+                content=QCoreApplication.translate("MainWindow", "Cannot watch {}").format(folder),
+                parent=self
+            )
+
+    def on_watched_file_done(self, path, result, success):
+        if success:
+            InfoBar.success(
+                title=os.path.basename(path),
+                content=QCoreApplication.translate("MainWindow", "Translated to {}").format(result),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=3000,
+                parent=self
+            )
+        else:
+            InfoBar.error(
+                title=os.path.basename(path),
+                content=result,
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=4000,
+                parent=self
+            )
+
+    def on_translation_progress(self, done, total):
+        if total:
+            self.filepicker.update_status_text(
+                QCoreApplication.translate('MainWindow', "Translating... {}%").format(done * 100 // total))
+
+    def toggle_text_panel(self):
+        if self.text_panel.isVisible():
+            self.text_panel.hide()
+            return
+        self.text_panel.show()
+        self.text_panel.source_edit.setFocus()
+        # Typing starts against a warm model
+        self.file_translator.preload_selected()
+
+    def on_text_translated(self, text, error):
+        self.text_panel.show_translation(text, error)
+
+    def on_translation_preview(self, pairs):
+        self.preview_pane.add_pairs(pairs)
+
+    def on_translation_done(self, result, success):
+        self.progressbar.stop()
+
+        if success:
+            self.return_to_filepicker()
+            InfoBar.success(
+                title=QCoreApplication.translate('MainWindow',"Success"),
+                content=QCoreApplication.translate('MainWindow', "Translation saved to <b>{}</b>").format(result),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM,
+                duration=4000,
+                parent=self
+            )
+        elif result:  # Error message
+            self.return_to_filepicker()
+            InfoBar.error(
+                title=QCoreApplication.translate('MainWindow',"Error"),
+                content=result,
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM,
+                duration=4000,
+                parent=self
+            )
+
+        if hasattr(self.file_translator, 'translation_worker'):
+            self.file_translator.translation_worker.abort()
+
+    def on_package_download_finished(self, status):
+        if status == "start":
+            self.download_progressbar.start()
+            InfoBar.info(
+                title=QCoreApplication.translate("MainWindow", "Information"),
+                content=QCoreApplication.translate("MainWindow", "Downloading {} package").format(cfg.get(cfg.package).value),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=4000,
+                parent=self
+            )
+            self.update_argos_remove_button_state(False)
+        elif status == "installed":
+            self.update_argos_remove_button_state(True)
+            self.file_translator.preload_selected()
+        elif status == "success":
+            self.download_progressbar.stop()
+            InfoBar.success(
+                title=QCoreApplication.translate("MainWindow", "Success"),
+                content=QCoreApplication.translate("MainWindow", "Package installed successfully!"),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=4000,
+                parent=self
+            )
+            self.update_argos_remove_button_state(True)
+            self.check_packages()
+            self.file_translator.preload_selected()
+        elif status.startswith("error"):
+            InfoBar.error(
+                title=QCoreApplication.translate("MainWindow", "Error"),
+                content=status,
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=4000,
+                parent=self
+            )
+            self.update_argos_remove_button_state(False)
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from resource.backends import FakeBackend
+from resource.jobs import DocumentJob, JobError
+
+
+def test_read_error_fails_job_and_keeps_no_partial_output(tmp_path):
+    source = tmp_path / "bad.txt"
+    source.write_bytes(b"".join(b"good line %d\n" % i for i in range(50000)) + b"\xff\n" + b"tail\n" * 400)
+    output = tmp_path / "out.txt"
+
+    with pytest.raises(JobError, match="Error reading .txt file"):
+        DocumentJob(str(source), str(output), FakeBackend("en", "xx")).run()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["bad.txt"]
+
+
+def test_read_error_fails_whole_file_parse(tmp_path):
+    source = tmp_path / "bad.txt"
+    source.write_bytes(b"good\n\xff\n")
+    with pytest.raises(JobError):
+        DocumentJob(str(source), str(tmp_path / "out.txt"), FakeBackend("en", "xx")).load_segments()
+
+
+def translate_twice(tmp_path, name, content, **options):
+    """FakeBackend reverses every word, so a second pass over the output gives back the source"""
+    source = tmp_path / name
+    source.write_text(content, encoding="utf-8")
+    once, twice = tmp_path / f"once_{name}", tmp_path / f"twice_{name}"
+    assert DocumentJob(str(source), str(once), FakeBackend("en", "xx"), **options).run()
+    assert DocumentJob(str(once), str(twice), FakeBackend("xx", "en"), **options).run()
+    return once.read_text(encoding="utf-8"), twice.read_text(encoding="utf-8")
+
+
+SRT = """1
+00:00:01,000 --> 00:00:02,500
+<i>Hello there,</i>
+general Kenobi.
+
+2
+00:00:03,000 --> 00:00:04,000
+You are a bold one.
+
+"""
+
+
+def test_subtitles_round_trip_keeps_cues_and_timing(tmp_path):
+    once, twice = translate_twice(tmp_path, "movie.srt", SRT)
+    assert "00:00:01,000 --> 00:00:02,500" in once
+    assert "olleH" in once
+    assert twice == SRT
+
+
+JSONL = "\n".join([
+    json.dumps({"id": 1, "text": "hello world", "tags": ["red apple", 3]}, ensure_ascii=False),
+    "",
+    "not json at all",
+    json.dumps("a plain string record"),
+    json.dumps({"id": 2, "nested": {"title": "Good morning"}}, ensure_ascii=False),
+]) + "\n"
+
+
+def test_jsonl_round_trip_keeps_raw_lines_and_string_records(tmp_path):
+    once, twice = translate_twice(tmp_path, "data.jsonl", JSONL)
+    lines = once.split("\n")
+    assert json.loads(lines[0]) == {"id": 1, "text": "olleh dlrow", "tags": ["der elppa", 3]}
+    assert lines[1:3] == ["", "not json at all"]
+    # A bare string has no field to translate, it is still written back as a JSON string
+    assert lines[3] == json.dumps("a plain string record")
+    assert twice == JSONL
@@ -0,0 +1,45 @@
+from resource.backends import FakeBackend
+from resource.jobs import DocumentJob
+from resource.manifest import ManifestBackend, manifest_path
+
+
+def translate(source, output):
+    model = FakeBackend("en", "xx")
+    backend = ManifestBackend(model, str(output))
+    assert DocumentJob(str(source), str(output), backend).run()
+    backend.save()
+    return model, backend
+
+
+def test_unchanged_document_never_reaches_the_model(tmp_path):
+    source, output = tmp_path / "doc.txt", tmp_path / "doc_xx.txt"
+    source.write_text("first line\nsecond line\nthird line\n", encoding="utf-8")
+    translate(source, output)
+    first = output.read_text(encoding="utf-8")
+
+    model, backend = translate(source, output)
+    assert not model.loaded and model.calls == 0
+    assert backend.stats == {"unchanged": 3, "translated": 0}
+    assert output.read_text(encoding="utf-8") == first
+
+
+def test_only_edited_segments_are_translated_again(tmp_path):
+    source, output = tmp_path / "doc.txt", tmp_path / "doc_xx.txt"
+    source.write_text("first line\nsecond line\nthird line\n", encoding="utf-8")
+    translate(source, output)
+
+    source.write_text("new top line\nfirst line\nsecond line edited\nthird line\n", encoding="utf-8")
+    _, backend = translate(source, output)
+    assert backend.stats == {"unchanged": 2, "translated": 2}
+    assert backend.removed() == 1
+    assert output.read_text(encoding="utf-8") == "wen pot enil\ntsrif enil\ndnoces enil detide\ndriht enil\n"
+
+
+def test_other_settings_ignore_the_manifest(tmp_path):
+    source, output = tmp_path / "doc.txt", tmp_path / "doc_xx.txt"
+    source.write_text("first line\n", encoding="utf-8")
+    translate(source, output)
+    assert manifest_path(str(output)) == str(tmp_path / ".doc_xx.txt.manifest.json")
+
+    backend = ManifestBackend(FakeBackend("en", "xx", beam_size=2), str(output))
+    assert backend.previous == {}
@@ -0,0 +1,41 @@
+import pytest
+
+from resource.markup import block_texts, escape_html, format_block, html_blocks
+
+SOURCE = '<p>Hello <b>bold</b> world and <i>more</i>.</p>'
+
+
+def translatable_block(source):
+    return next(block for block in html_blocks(source) if block_texts(block))
+
+
+def test_unchanged_placeholders_give_back_the_source():
+    blocks = list(html_blocks(SOURCE))
+    texts = [block_texts(block) for block in blocks]
+    assert texts[0] == ['Hello <x1>bold<x2> world and <x3>more']
+    assert "".join(format_block(block, text, escape_html) for block, text in zip(blocks, texts)) == SOURCE
+
+
+@pytest.mark.parametrize("translation", [
+    'Hallo <x1>fett<x2> Welt und <x3>mehr',
+    'Hallo <X1>fett<X2> Welt und <X3>mehr',
+    'Hallo < x1 >fett<x 2/> Welt und </x3>mehr',
+])
+def test_placeholder_variants_are_restored(translation):
+    assert format_block(translatable_block(SOURCE), [translation], escape_html) == \
+        '<p>Hallo <b>fett</b> Welt und <i>mehr</i>.'
+
+
+def test_dropped_placeholder_keeps_tags_in_order():
+    result = format_block(translatable_block(SOURCE), ['Hallo fett<x2> Welt und <x3>mehr'], escape_html)
+    assert result == '<p>Hallo fett<b></b> Welt und <i>mehr</i>.'
+
+
+def test_moved_placeholders_keep_every_tag_once():
+    result = format_block(translatable_block(SOURCE), ['Hallo <x3>mehr und <x1>fett<x2>'], escape_html)
+    assert result == '<p>Hallo <b></b><i>mehr und fett</i>.'
+
+
+def test_translated_text_is_escaped():
+    result = format_block(translatable_block('<p>A <b>b</b> c</p>'), ['x < y <x1>&<x2> z'], escape_html)
+    assert result == '<p>x &lt; y <b>&amp;</b> z'
@@ -0,0 +1,39 @@
+from resource.memory import TranslationMemory
+
+SOURCE = "The quick brown fox jumps over the lazy dog near the river bank today"
+
+
+def test_exact_match_ignores_spacing(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "memory.jsonl"))
+    memory.add("en", "de", SOURCE, "Der schnelle braune Fuchs")
+    assert memory.lookup("en", "de", "  " + SOURCE.replace(" ", "  ")) == (1.0, "Der schnelle braune Fuchs")
+
+
+def test_near_duplicate_is_found_through_minhash_bands(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "memory.jsonl"))
+    memory.add("en", "de", SOURCE, "Der schnelle braune Fuchs")
+    memory.add("en", "de", "Completely unrelated sentence about invoices and taxes", "Rechnungen")
+
+    score, target = memory.lookup("en", "de", SOURCE.replace("today", "tonight"), cutoff=0.8)
+    assert 0.8 <= score < 1.0
+    assert target == "Der schnelle braune Fuchs"
+
+
+def test_unrelated_text_and_other_pairs_miss(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "memory.jsonl"))
+    memory.add("en", "de", SOURCE, "Der schnelle braune Fuchs")
+    assert memory.lookup("en", "de", "Nothing in common with anything stored", cutoff=0.5) == (0.0, None)
+    assert memory.lookup("en", "fr", SOURCE) == (0.0, None)
+
+
+def test_flushed_entries_are_read_back(tmp_path):
+    path = str(tmp_path / "memory.jsonl")
+    memory = TranslationMemory(path)
+    memory.add("en", "de", SOURCE, "Der schnelle braune Fuchs")
+    memory.flush()
+
+    reloaded = TranslationMemory(path)
+    reloaded.refresh()
+    assert len(reloaded) == 1
+    score, target = reloaded.lookup("en", "de", SOURCE.replace("quick", "fast"), cutoff=0.8)
+    assert target == "Der schnelle braune Fuchs"
@@ -0,0 +1,52 @@
+import random
+import threading
+import time
+
+import pytest
+
+from resource.pipeline import Pipeline
+
+
+def test_items_reach_the_consumer_in_source_order():
+    delays = random.Random(0)
+    consumed = []
+
+    def transform(item):
+        time.sleep(delays.random() / 1000)
+        return item * 2
+
+    pipeline = Pipeline(depth=2)
+    assert pipeline.run(range(200), transform, consumed.append)
+    assert consumed == [item * 2 for item in range(200)]
+    assert [stats.items for stats in pipeline.stages] == [200, 200, 200]
+    assert all(stats.max_depth <= 2 for stats in pipeline.queues)
+
+
+def test_abort_stops_every_stage_and_returns_false():
+    consumed = []
+    abort = threading.Event()
+
+    def consume(item):
+        consumed.append(item)
+        if len(consumed) == 10:
+            abort.set()
+
+    pipeline = Pipeline(depth=2, should_abort=abort.is_set)
+    assert pipeline.run(iter(range(10000)), lambda item: item, consume) is False
+    assert consumed == list(range(len(consumed)))
+    # Only what was already queued can still arrive after the abort
+    assert len(consumed) < 20
+    assert pipeline.stages[0].items < 20
+
+
+def test_first_stage_error_is_raised_to_the_caller():
+    def transform(item):
+        if item == 5:
+            raise ValueError("bad item")
+        return item
+
+    consumed = []
+    with pytest.raises(ValueError, match="bad item"):
+        Pipeline(depth=2).run(range(100), transform, consumed.append)
+    assert consumed == list(range(len(consumed)))
+    assert len(consumed) <= 5
@@ -0,0 +1,82 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from resource.service import TranslationService, make_server
+
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def server():
+    service = TranslationService("fake", max_pairs=2)
+    server = make_server(service, port=0, token=TOKEN)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def request(server, path, payload=None, headers=None):
+    """(status, decoded JSON body) of a GET, or of a POST when payload is given"""
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(f"http://127.0.0.1:{server.server_port}{path}", data=data, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def authorized(token=TOKEN, **extra):
+    return {"Content-Type": "application/json", "Authorization": f"Bearer {token}", **extra}
+
+
+PAYLOAD = {"from": "en", "to": "xx", "text": "hello world"}
+
+
+def test_health_needs_no_token(server):
+    assert request(server, "/health") == (200, {"status": "ok"})
+
+
+def test_translate_with_token(server):
+    assert request(server, "/translate", PAYLOAD, authorized()) == (200, {"translation": "olleh dlrow"})
+
+
+@pytest.mark.parametrize("headers", [
+    {"Content-Type": "application/json"},
+    authorized(token="wrong"),
+    authorized(token=""),
+])
+def test_missing_or_wrong_token_is_refused(server, headers):
+    status, body = request(server, "/translate", PAYLOAD, headers)
+    assert status == 401
+    assert "translation" not in body
+
+
+def test_browser_origin_is_refused_even_with_token(server):
+    status, _ = request(server, "/translate", PAYLOAD, authorized(Origin="http://example.com"))
+    assert status == 403
+
+
+def test_other_content_types_are_refused(server):
+    status, _ = request(server, "/translate", PAYLOAD, authorized(**{"Content-Type": "text/plain"}))
+    assert status == 415
+
+
+def test_invalid_language_code_is_a_bad_request(server):
+    status, _ = request(server, "/translate", {**PAYLOAD, "to": "../x"}, authorized())
+    assert status == 400
+
+
+def test_least_recently_used_idle_pair_is_evicted(server):
+    for to_code in ("de", "fr", "es"):
+        status, _ = request(server, "/translate", {**PAYLOAD, "to": to_code}, authorized())
+        assert status == 200
+    _, stats = request(server, "/stats")
+    assert sorted(stats["batchers"]) == ["en_es", "en_fr"]